@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Compaction des petits fichiers Parquet d'un préfixe MinIO
+
+Les ajouts quotidiens (generate_test_csvs.py --append-days) et les uploads
+partitionnés remplissent chaque dossier dt=YYYY-MM-DD/ de petits objets :
+le coût de listing S3 et de planification des splits Trino croît alors avec
+le nombre de fichiers, pas avec le volume. Ce script regroupe, partition
+par partition, les fichiers plus petits que --small-size en fichiers
+d'environ --target-size (128 à 512 Mo).
+
+Remplacement : les fichiers fusionnés sont d'abord écrits sous un nom
+caché (_compacting-*, ignoré par Hive/Trino), puis, une fois tous prêts,
+copiés côté serveur sous leur nom définitif et les originaux supprimés par
+une seule requête DeleteObjects par partition : les lecteurs ne voient
+jamais de partition incomplète, et au pire un court instant de doublons.
+
+    python examples/compact_minio_prefix.py --table sales_data
+    python examples/compact_minio_prefix.py --bucket web-data --prefix website_traffic/ --dry-run
+"""
+
+import argparse
+import io
+import posixpath
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from minio_s3 import (DEFAULT_ENDPOINT, MultipartWriter, boto3, delete_keys, get_client, list_objects)
+from setup_hive_schemas import LAKE_TABLES, run_trino
+
+MB = 1024 * 1024
+
+
+def plan_compaction(objects, small_size, target_size):
+    """Regroupe les petits fichiers Parquet de chaque partition.
+
+    objects : {clé: (taille, ETag)}. Retourne {dossier de partition: [groupes
+    de clés]}, chaque groupe (au moins 2 fichiers) totalisant au plus
+    target_size, dans l'ordre des clés.
+    """
+    by_partition = {}
+    for key, (size, _) in sorted(objects.items()):
+        name = posixpath.basename(key)
+        if key.endswith('.parquet') and size < small_size and not name.startswith(('_', '.')):
+            by_partition.setdefault(posixpath.dirname(key), []).append((key, size))
+
+    plan = {}
+    for directory, files in by_partition.items():
+        groups, current, current_size = [], [], 0
+        for key, size in files:
+            if current and current_size + size > target_size:
+                groups.append(current)
+                current, current_size = [], 0
+            current.append(key)
+            current_size += size
+        groups.append(current)
+        groups = [group for group in groups if len(group) > 1]
+        if groups:
+            plan[directory] = groups
+    return plan
+
+
+def merge_group(client, bucket, keys, target_key, compression, row_group_size):
+    """Fusionne les fichiers Parquet keys en un objet target_key, un fichier source à la fois.
+
+    Les lignes des petits fichiers sont accumulées jusqu'à row_group_size
+    avant d'être écrites : le fichier fusionné a des row groups pleins, pas
+    un petit row group par fichier source.
+    """
+    writer, n_rows, pending, n_pending = None, 0, [], 0
+    with MultipartWriter(client, bucket, target_key) as sink:
+        for key in keys:
+            table = pq.read_table(io.BytesIO(client.get_object(Bucket=bucket, Key=key)['Body'].read()))
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema, compression=compression)
+            pending.append(table.cast(writer.schema))
+            n_pending += len(table)
+            n_rows += len(table)
+            if n_pending >= row_group_size:
+                buffered = pa.concat_tables(pending)
+                full = n_pending - n_pending % row_group_size
+                writer.write_table(buffered.slice(0, full), row_group_size=row_group_size)
+                pending, n_pending = [buffered.slice(full)], n_pending - full
+        if n_pending:
+            writer.write_table(pa.concat_tables(pending), row_group_size=row_group_size)
+        writer.close()
+    return n_rows
+
+
+def compact_partition(client, bucket, directory, groups, compression, row_group_size):
+    """Compacte une partition : fichiers fusionnés cachés, puis copie et suppression groupée.
+
+    Si une copie échoue, les fichiers fusionnés déjà rendus visibles sont
+    supprimés : les originaux restent seuls et aucune ligne n'est comptée deux fois.
+    """
+    stamp = time.strftime('%Y%m%d%H%M%S')
+    staged, published = [], []
+    try:
+        for i, keys in enumerate(groups):
+            hidden = f"{directory}/_compacting-{stamp}-{i:05d}.parquet"
+            merge_group(client, bucket, keys, hidden, compression, row_group_size)
+            staged.append(hidden)
+
+        # Bascule : tous les fichiers fusionnés deviennent visibles, puis les originaux disparaissent
+        try:
+            for hidden in staged:
+                final = hidden.replace('/_compacting-', '/compacted-')
+                client.copy_object(Bucket=bucket, Key=final, CopySource={'Bucket': bucket, 'Key': hidden})
+                published.append(final)
+        except Exception:
+            delete_keys(client, bucket, published)
+            raise
+        delete_keys(client, bucket, [key for keys in groups for key in keys])
+    finally:
+        delete_keys(client, bucket, staged)
+
+
+def reference_query_time(query):
+    """Durée d'exécution de la requête de référence sur Trino (None si elle échoue)"""
+    started = time.time()
+    if not run_trino(query, check=True):
+        return None
+    return time.time() - started
+
+
+def describe(objects):
+    """Nombre et volume des fichiers d'un listing"""
+    return len(objects), sum(size for size, _ in objects.values()) / MB
+
+
+def parse_args():
+    """Options de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Compaction des petits fichiers Parquet d'un préfixe MinIO")
+    parser.add_argument('--table', choices=list(LAKE_TABLES),
+                        help="Table de LAKE_TABLES à compacter (fixe --bucket, --prefix et la requête de référence)")
+    parser.add_argument('--bucket', help="Bucket MinIO")
+    parser.add_argument('--prefix', help="Préfixe à compacter (ex: sales_data/)")
+    parser.add_argument('--small-size', type=int, default=64,
+                        help="Taille en Mo sous laquelle un fichier est compacté (défaut: 64)")
+    parser.add_argument('--target-size', type=int, default=256,
+                        help="Taille visée des fichiers fusionnés en Mo (défaut: 256)")
+    parser.add_argument('--compression', choices=['snappy', 'zstd'], default='zstd',
+                        help="Compression des fichiers fusionnés (défaut: zstd)")
+    parser.add_argument('--row-group-size', type=int, default=1_000_000,
+                        help="Lignes max par row group (défaut: 1000000)")
+    parser.add_argument('--reference-query',
+                        help="Requête Trino chronométrée avant et après (défaut avec --table: COUNT(*) de la table)")
+    parser.add_argument('--endpoint', default=DEFAULT_ENDPOINT,
+                        help=f"Endpoint S3 de MinIO (défaut: {DEFAULT_ENDPOINT})")
+    parser.add_argument('--dry-run', action='store_true', help="Affiche le plan sans rien modifier")
+    args = parser.parse_args()
+
+    if args.table:
+        spec = LAKE_TABLES[args.table]
+        args.bucket = args.bucket or spec['bucket']
+        args.prefix = args.prefix or f"{args.table}/"
+        if args.reference_query is None:
+            args.reference_query = f"SELECT COUNT(*) FROM hive.{spec['schema']}.{args.table}"
+    if not args.bucket or args.prefix is None:
+        parser.error("--table ou --bucket et --prefix sont requis")
+    if args.small_size > args.target_size:
+        parser.error("--small-size doit être inférieur à --target-size")
+    return args
+
+
+def main():
+    """Fonction principale"""
+    args = parse_args()
+
+    print("🚀 COMPACTION DES PETITS FICHIERS")
+    print("=" * 50)
+
+    if pa is None or boto3 is None:
+        print("❌ pyarrow et boto3 sont requis: pip install pyarrow boto3")
+        return
+
+    client = get_client(args.endpoint)
+    before = list_objects(client, args.bucket, args.prefix)
+    plan = plan_compaction(before, args.small_size * MB, args.target_size * MB)
+    n_files, size_mb = describe(before)
+    n_merged = sum(len(keys) for groups in plan.values() for keys in groups)
+    n_outputs = sum(len(groups) for groups in plan.values())
+    print(f"📂 s3://{args.bucket}/{args.prefix}: {n_files} fichier(s), {size_mb:.1f} Mo")
+    print(f"📋 {len(plan)} partition(s) à compacter: {n_merged} fichier(s) → {n_outputs}")
+
+    if args.dry_run or not plan:
+        return
+
+    before_time = reference_query_time(args.reference_query) if args.reference_query else None
+
+    started = time.time()
+    for directory, groups in plan.items():
+        compact_partition(client, args.bucket, directory, groups, args.compression, args.row_group_size)
+        print(f"   ✅ {directory}/: {sum(len(keys) for keys in groups)} fichier(s) → {len(groups)}")
+    elapsed = time.time() - started
+
+    after = list_objects(client, args.bucket, args.prefix)
+    after_time = reference_query_time(args.reference_query) if args.reference_query else None
+
+    print(f"\n🎉 COMPACTION TERMINÉE en {elapsed:.1f}s!")
+    print("=" * 50)
+    print(f"   Fichiers: {n_files} → {describe(after)[0]} ({size_mb:.1f} Mo → {describe(after)[1]:.1f} Mo)")
+    if before_time is not None and after_time is not None:
+        print(f"   Requête de référence: {before_time:.2f}s → {after_time:.2f}s")
+        print(f"   ({args.reference_query})")
+    elif args.reference_query:
+        print("   ⚠️  Requête de référence non mesurée (Trino inaccessible)")
+
+
+if __name__ == "__main__":
+    main()
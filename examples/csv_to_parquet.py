@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Conversion des CSV de test en Parquet typé et compressé
+
+Chaque CSV est lu en streaming par blocs (pyarrow.csv.open_csv) avec les
+types des colonnes déclarés dans LAKE_TABLES (setup_hive_schemas.py), puis
+écrit en Parquet sous <dataset>/dt=YYYY-MM-DD/part-00000.parquet pour les
+datasets datés, <dataset>/part-00000.parquet sinon : la disposition lue par
+les tables colonnaires Hive. La mémoire reste bornée à quelques blocs quelle
+que soit la taille du CSV.
+
+    python examples/csv_to_parquet.py --source-dir examples --output-dir examples/lake
+"""
+
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    from pyarrow import csv
+except ImportError:
+    pa = None
+
+from generate_test_csvs import arrow_schema
+from setup_hive_schemas import LAKE_TABLES
+
+DEFAULT_BLOCK_SIZE = 64 * 1024 * 1024
+
+
+def dt_groups(batch, source):
+    """Découpe un bloc par jour de la colonne source : [(YYYY-MM-DD, sous-bloc)]"""
+    days = batch.column(source).combine_chunks()
+    if not pa.types.is_timestamp(days.type):
+        days = days.cast(pa.timestamp('s'))
+    days = pc.strftime(days, format='%Y-%m-%d').dictionary_encode()
+    codes = days.indices.to_numpy(zero_copy_only=False)
+    # Tri stable par jour : chaque jour devient une tranche contiguë
+    order = np.argsort(codes, kind='stable')
+    grouped = batch.take(pa.array(order))
+    bounds = np.searchsorted(codes[order], np.arange(len(days.dictionary) + 1))
+    return [(day, grouped.slice(bounds[i], bounds[i + 1] - bounds[i]))
+            for i, day in enumerate(days.dictionary.to_pylist())]
+
+
+def convert_csv(table, csv_path, output_dir, compression='zstd', block_size=DEFAULT_BLOCK_SIZE):
+    """Convertit un CSV en Parquet partitionné par dt, bloc par bloc.
+
+    Retourne (lignes, octets Parquet écrits, liste des fichiers écrits).
+    """
+    schema = arrow_schema(table)
+    source = LAKE_TABLES[table]['partition_source']
+    reader = csv.open_csv(
+        csv_path,
+        read_options=csv.ReadOptions(block_size=block_size),
+        convert_options=csv.ConvertOptions(column_types=dict(zip(schema.names, schema.types)),
+                                           include_columns=schema.names),
+    )
+
+    # Repartir d'un dossier vide : d'anciennes partitions fausseraient la table
+    shutil.rmtree(os.path.join(output_dir, table), ignore_errors=True)
+    # Un writer par partition dt ; un CSV généré est trié par jour, peu sont actifs à la fois
+    writers, files, n_rows = {}, [], 0
+    try:
+        for batch in reader:
+            batch = pa.Table.from_batches([batch]).select(schema.names).cast(schema)
+            for day, piece in (dt_groups(batch, source) if source else [(None, batch)]):
+                if day not in writers:
+                    directory = os.path.join(output_dir, table) if day is None \
+                        else os.path.join(output_dir, table, f"dt={day}")
+                    os.makedirs(directory, exist_ok=True)
+                    files.append(os.path.join(directory, 'part-00000.parquet'))
+                    writers[day] = pq.ParquetWriter(files[-1], schema, compression=compression)
+                writers[day].write_table(piece)
+                n_rows += len(piece)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return n_rows, sum(os.path.getsize(path) for path in files), files
+
+
+def convert_all(source_dir, output_dir, compression='zstd', block_size=DEFAULT_BLOCK_SIZE):
+    """Convertit tous les CSV <dataset>.csv présents dans source_dir ; retourne les datasets convertis"""
+    print(f"\n🔄 Conversion des CSV en Parquet ({compression}) dans {output_dir}/...")
+    converted = []
+    for table in LAKE_TABLES:
+        csv_path = os.path.join(source_dir, f"{table}.csv")
+        if not os.path.isfile(csv_path):
+            continue
+        started = time.time()
+        n_rows, n_bytes, files = convert_csv(table, csv_path, output_dir, compression, block_size)
+        csv_bytes = os.path.getsize(csv_path)
+        print(f"   ✅ {table}: {n_rows} lignes, {csv_bytes / 1024 / 1024:.1f} Mo CSV → "
+              f"{n_bytes / 1024 / 1024:.1f} Mo Parquet (x{csv_bytes / max(n_bytes, 1):.1f}) "
+              f"en {len(files)} fichier(s), {time.time() - started:.2f}s")
+        converted.append(table)
+    return converted
+
+
+def parse_args():
+    """Options de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Conversion des CSV de test en Parquet partitionné")
+    parser.add_argument('--source-dir', default='examples', help="Dossier des CSV (défaut: examples)")
+    parser.add_argument('--output-dir', default='examples/lake',
+                        help="Dossier des fichiers Parquet (défaut: examples/lake)")
+    parser.add_argument('--compression', choices=['snappy', 'zstd'], default='zstd',
+                        help="Compression Parquet (défaut: zstd)")
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE // (1024 * 1024),
+                        help=f"Taille des blocs CSV lus en Mo (défaut: {DEFAULT_BLOCK_SIZE // (1024 * 1024)})")
+    return parser.parse_args()
+
+
+def main():
+    """Fonction principale"""
+    args = parse_args()
+
+    if pa is None:
+        print("❌ pyarrow est requis: pip install pyarrow")
+        return
+
+    print("🚀 CONVERSION CSV → PARQUET")
+    print("=" * 50)
+    if not convert_all(args.source_dir, args.output_dir, args.compression, args.block_size * 1024 * 1024):
+        print(f"❌ Aucun CSV dans {args.source_dir}/")
+        print("\n💡 Exécutez d'abord: python examples/generate_test_csvs.py")
+        return
+
+    print("\n💡 Créez les tables Parquet: python examples/setup_hive_schemas.py --format parquet")
+
+
+if __name__ == "__main__":
+    main()
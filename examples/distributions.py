@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Distributions non uniformes pour le générateur de données de test
+
+Le trafic de production est très asymétrique : quelques clients, produits
+ou pages concentrent l'essentiel des lignes. Ces tirages vectorisés
+reproduisent cette asymétrie (loi de Zipf, clés chaudes) et la
+saisonnalité temporelle, pour retrouver dans Trino les jointures
+déséquilibrées et les tâches trainardes observées en production.
+
+Spécification d'une colonne (option --skew COLONNE=SPEC) :
+    uniform                 tirage uniforme (défaut)
+    zipf:S                  loi de Zipf d'exposant S (ex: zipf:1.2)
+    hot:F:P                 une fraction F des clés reçoit une part P des tirages
+                            (ex: hot:0.01:0.5 = 1% des clés font 50% des lignes)
+"""
+
+import argparse
+from math import gcd
+
+import numpy as np
+
+# Au-delà de ce nombre de clés, la loi de Zipf est tirée par inversion de la
+# fonction de répartition continue plutôt qu'avec la table de probabilités exacte
+EXACT_ZIPF_MAX_KEYS = 10000
+
+
+def parse_distribution(text):
+    """Analyse une spécification 'uniform', 'zipf:S' ou 'hot:F:P'"""
+    kind, *values = text.split(':')
+    try:
+        values = [float(value) for value in values]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valeurs numériques attendues: {text}")
+
+    if kind == 'uniform' and not values:
+        return None
+    if kind == 'zipf' and len(values) == 1 and values[0] > 0:
+        return {'kind': 'zipf', 'exponent': values[0]}
+    if kind == 'hot' and len(values) == 2 and 0 < values[0] <= 1 and 0 <= values[1] <= 1:
+        return {'kind': 'hot', 'key_fraction': values[0], 'share': values[1]}
+    raise argparse.ArgumentTypeError(f"distribution invalide: {text} (uniform, zipf:S ou hot:F:P)")
+
+
+def parse_skew(text):
+    """Analyse une option --skew COLONNE=SPEC"""
+    column, sep, spec = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"format attendu COLONNE=SPEC: {text}")
+    return column, parse_distribution(spec)
+
+
+def draw_codes(rng, n, n_keys, spec=None):
+    """Tire n codes dans [0, n_keys) ; le code 0 est la clé la plus fréquente"""
+    if spec is None:
+        return rng.integers(0, n_keys, n)
+
+    if spec['kind'] == 'hot':
+        n_hot = min(n_keys, max(1, int(round(spec['key_fraction'] * n_keys))))
+        if n_hot == n_keys:
+            return rng.integers(0, n_keys, n)
+        hot = rng.random(n) < spec['share']
+        return np.where(hot, rng.integers(0, n_hot, n), rng.integers(n_hot, n_keys, n))
+
+    exponent = spec['exponent']
+    if n_keys <= EXACT_ZIPF_MAX_KEYS:
+        weights = 1.0 / np.arange(1, n_keys + 1) ** exponent
+        return rng.choice(n_keys, n, p=weights / weights.sum())
+
+    # Inversion de la loi de puissance continue sur [1, n_keys + 1)
+    u = rng.random(n)
+    if exponent == 1.0:
+        x = (n_keys + 1.0) ** u
+    else:
+        x = ((n_keys + 1.0) ** (1 - exponent) - 1) * u + 1
+        x = x ** (1 / (1 - exponent))
+    return np.minimum(x.astype(np.int64), n_keys) - 1
+
+
+def draw_ids(rng, n, n_ids, spec=None):
+    """Tire n IDs dans [1, n_ids].
+
+    Les rangs asymétriques sont dispersés sur l'espace d'IDs par une
+    permutation affine : les clés chaudes ne sont pas les premiers IDs.
+    """
+    ranks = draw_codes(rng, n, n_ids, spec)
+    if spec is None:
+        return ranks + 1
+    stride = _coprime_stride(n_ids)
+    return (ranks * stride) % n_ids + 1
+
+
+def _coprime_stride(n):
+    """Pas premier avec n, pour une permutation affine de [0, n)"""
+    stride = max(1, int(n * 0.6180339887)) | 1
+    while gcd(stride, n) != 1:
+        stride += 1
+    return stride
+
+
+def day_weights(days, seasonality=0.0, weekend_factor=1.0, peak_day=335):
+    """Poids relatifs des jours days (tableau datetime64[D]).
+
+    seasonality : amplitude d'une variation annuelle sinusoïdale culminant au
+    jour de l'année peak_day (début décembre par défaut) ;
+    weekend_factor : multiplicateur appliqué aux samedis et dimanches.
+    """
+    day_of_year = (days - days.astype('datetime64[Y]')).astype(np.int64)
+    weights = 1.0 + seasonality * np.cos(2 * np.pi * (day_of_year - peak_day) / 365.25)
+    # 1970-01-01 était un jeudi : (jours + 3) % 7 donne 0 = lundi
+    weekday = (days.astype(np.int64) + 3) % 7
+    weights = np.where(weekday >= 5, weights * weekend_factor, weights)
+    return np.clip(weights, 0.0, None)
@@ -2,340 +2,921 @@
 """
 Générateur de CSV de test pour le Data Mesh
 Génère différents types de données pour tester le workflow complet
+
+Les colonnes sont construites en entier avec NumPy (tirages catégoriels,
+prix indexés par produit, dates en arithmétique datetime64) : le même
+schéma passe de quelques milliers à plusieurs centaines de millions de
+lignes via --scale-factor. Chaque dataset est découpé en partitions
+disjointes (plages de jours ou d'IDs) d'au plus --chunk-size lignes,
+générées en parallèle sur --workers processus avec une graine dérivée de
+la partition, puis écrites dans l'ordre : la mémoire reste bornée et, pour
+une même graine, la sortie est identique octet pour octet quel que soit le
+nombre de workers.
+
+    python examples/generate_test_csvs.py --scale-factor 10000 --seed 42
+
+Une génération complète enregistre son état (graine, échelle, dernier jour
+et prochain ID par dataset) dans .generator_state.json ; --append-days N
+ajoute ensuite les N jours suivants des ventes, du trafic web et des données
+financières en nouveaux fichiers dt=YYYY-MM-DD/, sans réécrire l'existant.
+L'ajout reprend le format Parquet/ORC de la génération complète (les tables
+*_csv ne lisent qu'un fichier par dataset) :
+
+    python examples/generate_test_csvs.py --append-days 1 --format parquet
+
+Avec --to-minio, les fichiers sont streamés directement dans les buckets
+MinIO par upload multipart (--parts-in-flight parts en parallèle), sans
+copie locale ni passage par upload_csvs_to_minio.py.
 """
 
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import random
+import argparse
+import io
+import json
 import os
+import shutil
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from distributions import day_weights, draw_codes, parse_skew
+from key_space import COMPANIES, FIRST_NAMES, LAST_NAMES, build_emails, get_key_space
+from minio_s3 import (DEFAULT_ENDPOINT, DEFAULT_PART_SIZE, DEFAULT_PARTS_IN_FLIGHT, MIN_PART_SIZE,
+                      MultipartWriter, boto3, delete_prefix, ensure_bucket, get_client)
+from setup_hive_schemas import LAKE_TABLES, register_partitions
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Formats colonnaires indisponibles (pip install pyarrow)
+    pa = None
+
+# Nombre de lignes par dataset pour --scale-factor 1
+BASE_ROWS = {
+    'sales_data': 1000,
+    'customers_data': 200,
+    'marketing_campaigns': 50,
+    'website_traffic': 5000,
+    'financial_data': 365 * 5,
+    'marketing_leads': 1000,
+}
+
+START_DATE = np.datetime64('2024-01-01', 'D')
+
+# Datasets prolongés jour par jour par --append-days, et fichier d'état associé
+APPEND_DATASETS = ['sales_data', 'website_traffic', 'financial_data']
+STATE_FILENAME = '.generator_state.json'
+
+# Référentiels - ventes
+PRODUCTS = np.array(['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Headphones', 'Webcam', 'Tablet', 'Phone'])
+PRODUCT_PRICE_MIN = np.array([800, 10, 20, 150, 30, 40, 200, 300], dtype=np.float64)
+PRODUCT_PRICE_MAX = np.array([2000, 50, 100, 500, 200, 150, 800, 1200], dtype=np.float64)
+REGIONS = np.array(['North', 'South', 'East', 'West', 'Central'])
+SALES_REPS = np.array(['Alice Johnson', 'Bob Smith', 'Carol Davis', 'David Wilson', 'Eva Brown'])
+SALES_CATEGORIES = np.array(['Electronics', 'Accessories', 'Computing', 'Mobile'])
+OPEN_STATUSES = np.array(['Pending', 'Processing', 'Shipped'])
+CLOSED_STATUSES = np.array(['Completed', 'Cancelled'])
+PAYMENT_METHODS = np.array(['Credit Card', 'PayPal', 'Bank Transfer', 'Cash'])
+
+# Référentiels - clients
+# (prénoms, noms et entreprises : voir key_space.py)
+INDUSTRIES = np.array(['Technology', 'Finance', 'Healthcare', 'Education', 'Manufacturing', 'Retail',
+                       'Consulting', 'Media', 'Government', 'Non-profit'])
+CUSTOMER_COUNTRIES = np.array(['USA', 'Canada', 'UK', 'Germany', 'France', 'Spain', 'Italy', 'Netherlands',
+                               'Australia', 'Japan', 'Brazil', 'Mexico', 'India', 'China', 'South Korea'])
+COMPANY_SIZES = np.array(['Small (1-50)', 'Medium (51-200)', 'Large (201-1000)', 'Enterprise (1000+)'])
+
+# Référentiels - marketing
+CAMPAIGN_NAMES = np.array([
+    'Spring Product Launch', 'Summer Social Media Blitz', 'Q4 Enterprise Outreach',
+    'Black Friday Sale', 'Cyber Monday Special', 'Holiday Shopping Spree',
+    'New Year Promotion', 'Valentine\'s Day Offer', 'Back to School Campaign',
+    'Tech Innovation Showcase', 'Customer Retention Program', 'Brand Awareness Drive'
+])
+CHANNELS = np.array(['Email', 'Social Media', 'Webinar', 'Google Ads', 'Facebook Ads', 'LinkedIn', 'Direct Mail'])
+CHANNEL_BUDGET_MIN = np.array([1000, 2000, 500, 3000, 2000, 1000, 500], dtype=np.float64)
+CHANNEL_BUDGET_MAX = np.array([5000, 8000, 2000, 15000, 10000, 5000, 3000], dtype=np.float64)
+CAMPAIGN_STATUSES = np.array(['Active', 'Completed', 'Paused', 'Draft'])
+LEAD_SOURCES = np.array(['Website', 'Referral', 'Campaign', 'Partner'])
+OPEN_LEAD_STAGES = np.array(['New', 'Contacted', 'Qualified', 'Lost'])
+
+# Référentiels - trafic web
+PAGES = np.array(['/home', '/products', '/about', '/contact', '/blog', '/pricing', '/features', '/support'])
+PAGE_DURATION_MIN = np.array([30, 60, 30, 45, 120, 90, 60, 180])
+PAGE_DURATION_MAX = np.array([300, 600, 180, 300, 900, 600, 480, 1200])
+SOURCES = np.array(['Google', 'Facebook', 'LinkedIn', 'Twitter', 'Direct', 'Email', 'Referral'])
+SOURCE_BOUNCE_RATES = np.array([0.4, 0.3, 0.2, 0.35, 0.25, 0.15, 0.3])
+DEVICES = np.array(['Desktop', 'Mobile', 'Tablet'])
+TRAFFIC_COUNTRIES = np.array(['USA', 'Canada', 'UK', 'Germany', 'France', 'Spain', 'Italy', 'Netherlands'])
+
+# Référentiels - finance
+ACCOUNTS = np.array(['Sales Revenue', 'Marketing Expenses', 'R&D Costs', 'Administrative', 'Operations'])
+ACCOUNT_AMOUNT_MIN = np.array([50000, 10000, 10000, 1000, 1000], dtype=np.float64)
+ACCOUNT_AMOUNT_MAX = np.array([200000, 80000, 80000, 50000, 50000], dtype=np.float64)
+FINANCIAL_CATEGORIES = np.array(['Revenue', 'Expense', 'Asset', 'Liability', 'Equity'])
+DEPARTMENTS = np.array(['Sales', 'Marketing', 'R&D', 'Admin', 'Operations'])
+# Variation saisonnière par mois (index 0 = janvier) : Q4 plus actif, été plus calme
+MONTH_SEASONALITY = np.array([1.0, 1.0, 1.0, 1.0, 1.0, 0.8, 0.8, 0.8, 1.0, 1.0, 1.3, 1.3])
+
+
+def scaled_rows(dataset, scale_factor):
+    """Nombre de lignes d'un dataset pour un facteur d'échelle donné"""
+    return max(1, int(round(BASE_ROWS[dataset] * scale_factor)))
+
+
+def categorical(rng, values, n, spec=None):
+    """Tire n valeurs dans un référentiel selon la distribution spec (stockage compact en codes)"""
+    codes = draw_codes(rng, n, len(values), spec)
+    return pd.Categorical.from_codes(codes, categories=values)
+
+
+def format_ids(prefix, ids, width):
+    """Formate un tableau d'entiers en identifiants texte ('ORD-000001')"""
+    return np.char.add(prefix, np.char.zfill(ids.astype('U'), width))
+
+
+def random_days(rng, n, n_days, start=START_DATE):
+    """Dates aléatoires dans [start, start + n_days) en datetime64[D]"""
+    return start + rng.integers(0, n_days, n).astype('timedelta64[D]')
+
+
+def day_dates(day, n):
+    """Tableau de n dates égales au jour d'index day (depuis START_DATE)"""
+    return np.full(n, START_DATE + np.timedelta64(day, 'D'))
+
+
+def generate_sales_data(rng, start, n_records, day, n_customers, seed, match_rate, skew):
+    """Génère des données de ventes réalistes (lignes start .. start + n_records du jour day).
+
+    Les customer_id sont tirés dans l'espace de clés partagé ; une fraction
+    1 - match_rate référence des clients absents de customers_data. skew
+    associe à certaines colonnes une distribution non uniforme.
+    """
+    product_idx = draw_codes(rng, n_records, len(PRODUCTS), skew.get('product_name'))
+
+    # Prix basé sur le produit
+    unit_price = np.round(rng.uniform(PRODUCT_PRICE_MIN[product_idx], PRODUCT_PRICE_MAX[product_idx]), 2)
+
+    # Quantité et remise (0-20%)
+    quantity = rng.integers(1, 6, n_records)
+    discount = np.round(rng.uniform(0, 0.2, n_records), 2)
+    total_amount = np.round(unit_price * quantity * (1 - discount), 2)
+
+    order_date = day_dates(day, n_records)
+
+    # Statut basé sur la date
+    recent = order_date > np.datetime64(datetime.now() - timedelta(days=30), 'D')
+    status = np.where(
+        recent,
+        OPEN_STATUSES[rng.integers(0, len(OPEN_STATUSES), n_records)],
+        CLOSED_STATUSES[rng.integers(0, len(CLOSED_STATUSES), n_records)],
+    )
+
+    return pd.DataFrame({
+        'order_id': format_ids('ORD-', np.arange(start + 1, start + n_records + 1), 6),
+        'customer_id': get_key_space(n_customers, seed).sample_customer_ids(
+            rng, n_records, match_rate, skew.get('customer_id')),
+        'product_name': pd.Categorical.from_codes(product_idx, categories=PRODUCTS),
+        'category': categorical(rng, SALES_CATEGORIES, n_records),
+        'region': categorical(rng, REGIONS, n_records, skew.get('region')),
+        'sales_rep': categorical(rng, SALES_REPS, n_records, skew.get('sales_rep')),
+        'order_date': order_date,
+        'unit_price': unit_price,
+        'quantity': quantity,
+        'discount': discount,
+        'total_amount': total_amount,
+        'status': status,
+        'payment_method': categorical(rng, PAYMENT_METHODS, n_records),
+    })
+
+
+def generate_customer_data(rng, start, n_records, n_customers, seed):
+    """Génère des données clients (lignes start .. start + n_records).
+
+    Identité et email viennent de l'espace de clés partagé, comme pour les
+    ventes et les leads qui référencent ces clients.
+    """
+    customer_id = np.arange(start + 1, start + n_records + 1)
+    key_space = get_key_space(n_customers, seed)
+    codes = key_space.identity(customer_id)
+    first_name = FIRST_NAMES[codes['first']]
+    last_name = LAST_NAMES[codes['last']]
+
+    # Téléphone
+    phone = np.char.add(
+        np.char.add('+1-', rng.integers(100, 1000, n_records).astype('U')),
+        np.char.add(
+            np.char.add('-', rng.integers(100, 1000, n_records).astype('U')),
+            np.char.add('-', rng.integers(1000, 10000, n_records).astype('U')),
+        ),
+    )
+
+    return pd.DataFrame({
+        'customer_id': customer_id,
+        'first_name': first_name,
+        'last_name': last_name,
+        'full_name': np.char.add(np.char.add(first_name, ' '), last_name),
+        'email': key_space.emails(customer_id),
+        'phone': phone,
+        'company': pd.Categorical.from_codes(codes['company'], categories=COMPANIES),
+        'industry': categorical(rng, INDUSTRIES, n_records),
+        'country': categorical(rng, CUSTOMER_COUNTRIES, n_records),
+        'company_size': categorical(rng, COMPANY_SIZES, n_records),
+        'created_date': random_days(rng, n_records, 366, start=np.datetime64('2023-01-01', 'D')),
+        'is_active': rng.random(n_records) < 0.75,  # 75% actifs
+    })
+
+
+def generate_marketing_campaigns(rng, start, n_records):
+    """Génère des données de campagnes marketing (lignes start .. start + n_records)"""
+    channel_idx = rng.integers(0, len(CHANNELS), n_records)
+    status_idx = rng.integers(0, len(CAMPAIGN_STATUSES), n_records)
+
+    # Budget basé sur le canal
+    budget = np.round(rng.uniform(CHANNEL_BUDGET_MIN[channel_idx], CHANNEL_BUDGET_MAX[channel_idx]), 2)
+
+    # Dates
+    start_date = random_days(rng, n_records, 201)
+    end_date = start_date + rng.integers(7, 91, n_records).astype('timedelta64[D]')
+
+    # Métriques : volumes plus élevés si la campagne est terminée
+    completed = CAMPAIGN_STATUSES[status_idx] == 'Completed'
+    impressions = np.where(completed, rng.integers(10000, 100001, n_records), rng.integers(1000, 50001, n_records))
+    clicks = np.where(completed, rng.integers(100, 5001, n_records), rng.integers(50, 2501, n_records))
+    conversions = np.where(completed, rng.integers(10, 501, n_records), rng.integers(5, 251, n_records))
+
+    return pd.DataFrame({
+        'campaign_id': format_ids('CAMP-', np.arange(start + 1, start + n_records + 1), 3),
+        'campaign_name': categorical(rng, CAMPAIGN_NAMES, n_records),
+        'channel': pd.Categorical.from_codes(channel_idx, categories=CHANNELS),
+        'status': pd.Categorical.from_codes(status_idx, categories=CAMPAIGN_STATUSES),
+        'start_date': start_date,
+        'end_date': end_date,
+        'budget': budget,
+        'impressions': impressions,
+        'clicks': clicks,
+        'conversions': conversions,
+        'ctr': np.round(clicks / impressions * 100, 2),
+        'conversion_rate': np.round(conversions / clicks * 100, 2),
+        'cost_per_click': np.round(budget / clicks, 2),
+        'roi': np.round(rng.uniform(1.5, 4.0, n_records), 2),
+    })
+
+
+def generate_marketing_leads(rng, start, n_records, day, n_customers, n_campaigns, seed, match_rate):
+    """Génère des leads marketing (lignes start .. start + n_records créées le jour day).
+
+    Une fraction match_rate des leads reprend l'email d'un client de
+    l'espace de clés (lead converti) ; les autres ont un email de prospect
+    qui ne correspond à aucun client.
+    """
+    lead_number = np.arange(start + 1, start + n_records + 1)
+    matched = rng.random(n_records) < match_rate
+
+    # Prospects : identité tirée au hasard, suffixe d'email hors de l'espace client
+    first_codes = rng.integers(0, len(FIRST_NAMES), n_records)
+    last_codes = rng.integers(0, len(LAST_NAMES), n_records)
+    company_codes = rng.integers(0, len(COMPANIES), n_records)
+    email = build_emails(first_codes, last_codes, company_codes, np.char.add('p', lead_number.astype('U')))
+
+    # Leads convertis : identité et email du client correspondant
+    key_space = get_key_space(n_customers, seed)
+    customer_ids = key_space.sample_customer_ids(rng, int(matched.sum()))
+    codes = key_space.identity(customer_ids)
+    first_codes[matched] = codes['first']
+    last_codes[matched] = codes['last']
+    company_codes[matched] = codes['company']
+    email = email.astype(object)
+    email[matched] = key_space.emails(customer_ids)
+
+    stage = OPEN_LEAD_STAGES[rng.integers(0, len(OPEN_LEAD_STAGES), n_records)].astype(object)
+    stage[matched] = 'Converted'
+
+    return pd.DataFrame({
+        'lead_id': format_ids('LEAD-', lead_number, 6),
+        'first_name': FIRST_NAMES[first_codes],
+        'last_name': LAST_NAMES[last_codes],
+        'email': email,
+        'company': pd.Categorical.from_codes(company_codes, categories=COMPANIES),
+        'lead_source': categorical(rng, LEAD_SOURCES, n_records),
+        'lead_stage': stage,
+        'campaign_id': format_ids('CAMP-', rng.integers(1, n_campaigns + 1, n_records), 3),
+        'created_date': day_dates(day, n_records),
+    })
+
+
+def generate_website_traffic(rng, start, n_records, day, skew):
+    """Génère des données de trafic web (lignes start .. start + n_records du jour day)"""
+    page_idx = draw_codes(rng, n_records, len(PAGES), skew.get('page'))
+    source_idx = draw_codes(rng, n_records, len(SOURCES), skew.get('source'))
+
+    # Heure aléatoire dans la journée (résolution minute)
+    minutes = rng.integers(0, 24 * 60, n_records).astype('timedelta64[m]')
+    timestamp = day_dates(day, n_records).astype('datetime64[m]') + minutes
+
+    # Durée de session basée sur la page
+    session_duration = rng.integers(PAGE_DURATION_MIN[page_idx], PAGE_DURATION_MAX[page_idx] + 1)
+
+    # Bounce rate basé sur la source
+    is_bounce = rng.random(n_records) < SOURCE_BOUNCE_RATES[source_idx]
+
+    return pd.DataFrame({
+        'session_id': format_ids('SESS-', np.arange(start + 1, start + n_records + 1), 6),
+        'timestamp': timestamp,
+        'page': pd.Categorical.from_codes(page_idx, categories=PAGES),
+        'source': pd.Categorical.from_codes(source_idx, categories=SOURCES),
+        'device': categorical(rng, DEVICES, n_records),
+        'country': categorical(rng, TRAFFIC_COUNTRIES, n_records),
+        'session_duration': session_duration,
+        'is_bounce': is_bounce,
+        'page_views': np.where(is_bounce, 1, rng.integers(1, 11, n_records)),
+    })
+
+
+def generate_financial_data(rng, start, n_records, day):
+    """Génère des données financières (lignes start .. start + n_records du jour day, comptes en rotation)"""
+    account_idx = np.arange(start, start + n_records) % len(ACCOUNTS)
+    date = day_dates(day, n_records)
+
+    # Montant basé sur le type de compte, avec variation saisonnière
+    month = date.astype('datetime64[M]').astype(np.int64) % 12
+    amount = rng.uniform(ACCOUNT_AMOUNT_MIN[account_idx], ACCOUNT_AMOUNT_MAX[account_idx])
+    amount = np.round(amount, 2) * MONTH_SEASONALITY[month]
+
+    return pd.DataFrame({
+        'date': date,
+        'account': pd.Categorical.from_codes(account_idx, categories=ACCOUNTS),
+        'category': categorical(rng, FINANCIAL_CATEGORIES, n_records),
+        'amount': amount,
+        'currency': 'USD',
+        'department': categorical(rng, DEPARTMENTS, n_records),
+    })
+
+
+# Datasets générés : fonction, fichier, nombre de jours couverts (None = dataset
+# d'entités découpé par plage d'IDs), format des dates dans le CSV, répartition
+# saisonnière des lignes par jour et colonnes acceptant une distribution --skew
+DATASETS = {
+    'sales_data': {
+        'label': "📊 Génération des données de ventes...",
+        'generate': generate_sales_data,
+        'filename': 'sales_data.csv',
+        'days': 366,
+        'date_format': '%Y-%m-%d',
+        'seasonal': True,
+        'skew_columns': ['customer_id', 'product_name', 'region', 'sales_rep'],
+    },
+    'customers_data': {
+        'label': "👥 Génération des données clients...",
+        'generate': generate_customer_data,
+        'filename': 'customers_data.csv',
+        'days': None,
+        'date_format': '%Y-%m-%d',
+        'seasonal': False,
+        'skew_columns': [],
+    },
+    'marketing_campaigns': {
+        'label': "📢 Génération des données de campagnes marketing...",
+        'generate': generate_marketing_campaigns,
+        'filename': 'marketing_campaigns.csv',
+        'days': None,
+        'date_format': '%Y-%m-%d',
+        'seasonal': False,
+        'skew_columns': [],
+    },
+    'website_traffic': {
+        'label': "🌐 Génération des données de trafic web...",
+        'generate': generate_website_traffic,
+        'filename': 'website_traffic.csv',
+        'days': 366,
+        'date_format': '%Y-%m-%d %H:%M:%S',
+        'seasonal': True,
+        'skew_columns': ['page', 'source'],
+    },
+    'financial_data': {
+        'label': "💰 Génération des données financières...",
+        'generate': generate_financial_data,
+        'filename': 'financial_data.csv',
+        'days': 365,
+        'date_format': '%Y-%m-%d',
+        'seasonal': False,
+        'skew_columns': [],
+    },
+    'marketing_leads': {
+        'label': "🎯 Génération des leads marketing...",
+        'generate': generate_marketing_leads,
+        'filename': 'marketing_leads.csv',
+        'days': 366,
+        'date_format': '%Y-%m-%d',
+        'seasonal': True,
+        'skew_columns': [],
+    },
+}
+
+
+def rows_per_day(n_records, n_days, weights=None):
+    """Répartit n_records lignes sur n_days jours, proportionnellement aux poids (uniforme par défaut)"""
+    if weights is None:
+        bounds = np.linspace(0, n_records, n_days + 1)
+    else:
+        bounds = np.concatenate([[0.0], np.cumsum(weights) / np.sum(weights) * n_records])
+    return np.diff(bounds.round().astype(np.int64))
+
+
+def plan_partitions(day_rows, chunk_size, first_day=0, first_row=0):
+    """Découpe un dataset daté en partitions disjointes d'au plus chunk_size lignes.
+
+    day_rows donne le nombre de lignes des jours first_day, first_day + 1, ...
+    Une partition est une liste de tranches (jour, sous-index, début, nombre) :
+    des jours consécutifs entiers, ou une tranche d'un seul jour quand celui-ci
+    dépasse chunk_size. Chaque tranche a sa propre graine, dérivée de sa
+    position : le contenu ne dépend pas du nombre de workers.
+    """
+    partitions, current, current_rows, start = [], [], 0, first_row
+    for day, n_rows in enumerate(day_rows, start=first_day):
+        for sub, offset in enumerate(range(0, n_rows, chunk_size)):
+            count = min(chunk_size, n_rows - offset)
+            if current and current_rows + count > chunk_size:
+                partitions.append(current)
+                current, current_rows = [], 0
+            current.append((day, sub, start, count))
+            current_rows += count
+            start += count
+    if current:
+        partitions.append(current)
+    return partitions
+
+
+def plan_id_partitions(n_records, chunk_size):
+    """Découpe un dataset d'entités en plages d'IDs d'au plus chunk_size lignes"""
+    return [[(None, i, start, min(chunk_size, n_records - start))]
+            for i, start in enumerate(range(0, n_records, chunk_size))]
+
+
+def seasonal_weights(name, first_day, n_days, options):
+    """Poids saisonniers des jours first_day .. first_day + n_days d'un dataset (None si uniforme)"""
+    if not DATASETS[name]['seasonal'] or (not options['seasonality'] and options['weekend_factor'] == 1.0):
+        return None
+    days = START_DATE + np.arange(first_day, first_day + n_days).astype('timedelta64[D]')
+    return day_weights(days, options['seasonality'], options['weekend_factor'])
+
+
+def dataset_partitions(name, n_records, options, chunk_size):
+    """Partitions d'une génération complète d'un dataset"""
+    n_days = DATASETS[name]['days']
+    if n_days is None:
+        return plan_id_partitions(n_records, chunk_size)
+    day_rows = rows_per_day(n_records, n_days, seasonal_weights(name, 0, n_days, options))
+    return plan_partitions(day_rows, chunk_size)
+
+
+def append_partitions(name, n_records, options, chunk_size, first_day, first_row, n_days):
+    """Partitions des n_days jours suivant first_day, au rythme quotidien de la génération complète"""
+    year_days = DATASETS[name]['days']
+    rate = np.full(n_days, n_records / year_days)
+    weights = seasonal_weights(name, first_day, n_days, options)
+    if weights is not None:
+        rate *= weights / seasonal_weights(name, 0, year_days, options).mean()
+    bounds = np.concatenate([[0.0], np.cumsum(rate)]).round().astype(np.int64)
+    return plan_partitions(np.diff(bounds), chunk_size, first_day, first_row)
+
+
+def slice_rng(seed, name, day, sub):
+    """Générateur aléatoire propre à une tranche (jour, sous-index) d'un dataset"""
+    dataset_key = list(DATASETS).index(name)
+    spawn_key = (dataset_key, sub) if day is None else (dataset_key, day, sub)
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=spawn_key))
+
+
+def generate_partition(name, slices, seed, params):
+    """Construit le DataFrame d'une partition à partir de ses tranches"""
+    generate = DATASETS[name]['generate']
+    frames = []
+    for day, sub, start, count in slices:
+        day_params = params if day is None else dict(params, day=day)
+        frames.append(generate(slice_rng(seed, name, day, sub), start, count, **day_params))
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def reset_peak_memory():
+    """Remet à zéro le pic RSS du processus (Linux uniquement, sans effet ailleurs)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_memory_mb():
+    """Pic de mémoire résidente (RSS) du processus en Mo"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en Ko sous Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def render_partition(task):
+    """Génère une partition et la sérialise en CSV (exécuté dans un worker).
+
+    Retourne (octets CSV, nombre de lignes, pic mémoire du worker en Mo).
+    """
+    name, index, slices, seed, params, _options = task
+    reset_peak_memory()
+    df = generate_partition(name, slices, seed, params)
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, header=(index == 0), date_format=DATASETS[name]['date_format'])
+    return buffer.getvalue(), len(df), peak_memory_mb()
+
+
+def ordered_map(fn, tasks, workers):
+    """Applique fn aux tâches sur un pool de processus et rend les résultats dans l'ordre.
+
+    Au plus 2 * workers résultats sont en vol : la mémoire reste bornée même
+    si l'écriture est plus lente que la génération.
+    """
+    if workers <= 1:
+        yield from map(fn, tasks)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(fn, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def arrow_schema(name):
+    """Schéma Arrow d'un dataset, dérivé des types Trino déclarés dans LAKE_TABLES"""
+    arrow_types = {
+        'VARCHAR': pa.string(),
+        'BIGINT': pa.int64(),
+        'DOUBLE': pa.float64(),
+        'BOOLEAN': pa.bool_(),
+        'DATE': pa.date32(),
+        'TIMESTAMP': pa.timestamp('ms'),
+    }
+    return pa.schema([(column, arrow_types[sql_type]) for column, sql_type in LAKE_TABLES[name]['columns']])
+
+
+def s3_client(options):
+    """Client MinIO du processus courant (un pool de connexions par worker)"""
+    s3 = options['s3']
+    return get_client(s3['endpoint'], max(10, s3['parts_in_flight']))
+
+
+def output_location(name, relpath, options):
+    """Emplacement affiché de relpath : chemin local ou s3://<bucket>/relpath"""
+    if options['s3'] is None:
+        return os.path.join(options['output_dir'], relpath)
+    return f"s3://{LAKE_TABLES[name]['bucket']}/{relpath}"
+
+
+def open_output(name, relpath, options):
+    """Ouvre relpath en écriture binaire : fichier sous output_dir, ou objet streamé dans MinIO.
+
+    Vers MinIO, l'objet est écrit dans le bucket du dataset (LAKE_TABLES)
+    par upload multipart, sans passer par le disque local.
+    """
+    if options['s3'] is None:
+        path = os.path.join(options['output_dir'], relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return open(path, 'wb')
+    return MultipartWriter(s3_client(options), LAKE_TABLES[name]['bucket'], relpath,
+                           options['s3']['part_size'], options['s3']['parts_in_flight'])
+
+
+def clear_dataset(name, options):
+    """Supprime les fichiers partitionnés d'une génération précédente (dossier local ou préfixe MinIO)"""
+    if options['s3'] is None:
+        shutil.rmtree(os.path.join(options['output_dir'], name), ignore_errors=True)
+    else:
+        delete_prefix(s3_client(options), LAKE_TABLES[name]['bucket'], f"{name}/")
+
+
+def write_table_file(df, name, f, options):
+    """Écrit un DataFrame en CSV, Parquet ou ORC dans le fichier binaire f.
+
+    En Parquet/ORC, les colonnes sont typées selon LAKE_TABLES.
+    """
+    if options['format'] == 'csv':
+        df.to_csv(f, index=False, date_format=DATASETS[name]['date_format'])
+        return
+
+    schema = arrow_schema(name)
+    table = pa.Table.from_pandas(df[schema.names], preserve_index=False).cast(schema)
+    if options['format'] == 'parquet':
+        pq.write_table(table, f, compression=options['compression'],
+                       row_group_size=options['row_group_size'])
+    else:
+        from pyarrow import orc
+        orc.write_table(table, f, compression=options['compression'])
+
+
+def write_partition_files(task):
+    """Génère une partition et l'écrit en fichiers partitionnés (exécuté dans un worker).
+
+    Les datasets datés sont rangés sous <dataset>/dt=YYYY-MM-DD/, un fichier
+    par jour de la partition ; les autres sous <dataset>/. Retourne
+    (octets écrits, nombre de lignes, pic mémoire du worker en Mo).
+    """
+    name, index, slices, seed, params, options = task
+    reset_peak_memory()
+    filename = f"part-{index:05d}.{options['format']}"
+
+    n_bytes, n_rows = 0, 0
+    # Une partition contient au plus une tranche par jour : une tranche = un fichier
+    for day_slice in slices:
+        df = generate_partition(name, [day_slice], seed, params)
+        day = day_slice[0]
+        directory = name if day is None else f"{name}/dt={START_DATE + day}"
+        with open_output(name, f"{directory}/{filename}", options) as f:
+            write_table_file(df, name, f, options)
+            n_bytes += f.tell()
+        n_rows += len(df)
+    return n_bytes, n_rows, peak_memory_mb()
+
+
+def write_dataset(name, partitions, options, seed, workers, params):
+    """Génère un dataset partition par partition et l'écrit.
+
+    En CSV, un seul fichier écrit dans l'ordre des partitions ; en
+    Parquet/ORC, des fichiers dt=YYYY-MM-DD/.
+    Avec options['s3'], les fichiers sont streamés dans MinIO.
+    """
+    spec = DATASETS[name]
+    tasks = ((name, i, slices, seed, params, options) for i, slices in enumerate(partitions))
+    if options['s3'] is not None:
+        ensure_bucket(s3_client(options), LAKE_TABLES[name]['bucket'])
+
+    reset_peak_memory()
+    n_rows, n_bytes, worker_peak = 0, 0, 0.0
+    if options['format'] == 'csv':
+        target = output_location(name, spec['filename'], options)
+        with open_output(name, spec['filename'], options) as f:
+            for data, rows, peak in ordered_map(render_partition, tasks, workers):
+                f.write(data)
+                n_rows += rows
+                n_bytes += len(data)
+                worker_peak = max(worker_peak, peak)
+    else:
+        target = f"{output_location(name, name, options)}/ ({options['format']})"
+        if not options['append']:
+            # Repartir d'un dossier vide : d'anciens fichiers part-* fausseraient la table
+            clear_dataset(name, options)
+        for written, rows, peak in ordered_map(write_partition_files, tasks, workers):
+            n_rows += rows
+            n_bytes += written
+            worker_peak = max(worker_peak, peak)
+
+    peak = max(peak_memory_mb(), worker_peak)
+    print(f"✅ {target} généré: {n_rows} enregistrements, {n_bytes / 1024 / 1024:.1f} Mo "
+          f"({len(partitions)} partitions, pic mémoire: {peak:.0f} Mo)")
+
+    # Tables colonnaires dans MinIO : déclarer au metastore les seuls jours écrits
+    if options['s3'] is not None and options['register'] and options['format'] != 'csv' and spec['days']:
+        register_partitions(name, {str(START_DATE + day) for slices in partitions for day, *_ in slices})
+    return n_rows
+
+
+def state_path(output_dir):
+    """Fichier d'état de la génération incrémentale"""
+    return os.path.join(output_dir, STATE_FILENAME)
+
+
+def load_state(output_dir):
+    """Charge l'état (dernier jour généré et prochain ID par dataset), None s'il n'existe pas"""
+    try:
+        with open(state_path(output_dir)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_state(output_dir, state):
+    """Enregistre l'état de façon atomique (un arrêt brutal ne laisse pas de fichier tronqué)"""
+    path = state_path(output_dir)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def dataset_state(last_day, next_row):
+    """Entrée d'état d'un dataset : dernier jour généré et marque haute des IDs"""
+    return {'last_date': str(START_DATE + np.timedelta64(last_day, 'D')), 'next_row': int(next_row)}
+
+
+def parse_args():
+    """Analyse les arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Génère les CSV de test du Data Mesh")
+    parser.add_argument('--scale-factor', type=float, default=1.0,
+                        help="Multiplicateur du nombre de lignes (1 = 1000 ventes, 10000 = 10M ventes)")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Graine du générateur aléatoire (résultats reproductibles)")
+    parser.add_argument('--output-dir', default='examples',
+                        help="Dossier de sortie des CSV (défaut: examples)")
+    parser.add_argument('--chunk-size', type=int, default=1_000_000,
+                        help="Lignes max par partition générée (borne la mémoire, défaut: 1000000)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Nombre de processus de génération (défaut: nombre de coeurs)")
+    parser.add_argument('--order-match-rate', type=float, default=1.0,
+                        help="Part des ventes dont le customer_id existe dans customers_data (défaut: 1.0)")
+    parser.add_argument('--lead-match-rate', type=float, default=0.3,
+                        help="Part des leads dont l'email correspond à un client (défaut: 0.3)")
+    parser.add_argument('--skew', type=parse_skew, action='append', default=[], metavar='COLONNE=SPEC',
+                        help="Distribution d'une colonne: uniform, zipf:S ou hot:F:P "
+                             "(ex: customer_id=zipf:1.1, page=hot:0.25:0.8) ; répétable")
+    parser.add_argument('--seasonality', type=float, default=0.0,
+                        help="Amplitude de la saisonnalité annuelle des volumes quotidiens, pic en décembre (ex: 0.4)")
+    parser.add_argument('--weekend-factor', type=float, default=1.0,
+                        help="Multiplicateur du volume des samedis et dimanches (ex: 0.5)")
+    parser.add_argument('--append-days', type=int, default=0, metavar='N',
+                        help="Mode incrémental: ajoute les N jours suivant le dernier jour généré "
+                             "(ventes, trafic, finance) en nouveaux fichiers dt=YYYY-MM-DD/ ; "
+                             "même --format parquet/orc que la génération complète")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'orc'], default='csv',
+                        help="Format de sortie ; parquet/orc sont partitionnés en dt=YYYY-MM-DD/ (défaut: csv)")
+    parser.add_argument('--to-minio', action='store_true',
+                        help="Streame les fichiers directement dans les buckets MinIO (upload multipart, "
+                             "sans copie locale)")
+    parser.add_argument('--no-register', action='store_true',
+                        help="Avec --to-minio, ne pas enregistrer les nouvelles partitions dt= dans le metastore Hive")
+    parser.add_argument('--s3-endpoint', default=DEFAULT_ENDPOINT,
+                        help=f"Endpoint S3 de MinIO (défaut: {DEFAULT_ENDPOINT})")
+    parser.add_argument('--part-size', type=int, default=DEFAULT_PART_SIZE // (1024 * 1024),
+                        help=f"Taille des parts d'upload en Mo, minimum {MIN_PART_SIZE // (1024 * 1024)} "
+                             f"(défaut: {DEFAULT_PART_SIZE // (1024 * 1024)})")
+    parser.add_argument('--parts-in-flight', type=int, default=DEFAULT_PARTS_IN_FLIGHT,
+                        help=f"Parts envoyées en parallèle par fichier (défaut: {DEFAULT_PARTS_IN_FLIGHT})")
+    parser.add_argument('--compression', choices=['snappy', 'zstd'], default='snappy',
+                        help="Compression des fichiers Parquet/ORC (défaut: snappy)")
+    parser.add_argument('--row-group-size', type=int, default=1_000_000,
+                        help="Lignes max par row group Parquet (défaut: 1000000)")
+    args = parser.parse_args()
+
+    skew_columns = {column for spec in DATASETS.values() for column in spec['skew_columns']}
+    for column, _ in args.skew:
+        if column not in skew_columns:
+            parser.error(f"--skew: colonne inconnue '{column}' (choix: {', '.join(sorted(skew_columns))})")
+    if args.part_size * 1024 * 1024 < MIN_PART_SIZE or args.parts_in_flight < 1:
+        parser.error(f"--part-size doit valoir au moins {MIN_PART_SIZE // (1024 * 1024)} Mo "
+                     "et --parts-in-flight au moins 1")
+    if args.append_days < 0:
+        parser.error("--append-days doit être positif")
+    if args.append_days and args.format == 'csv':
+        # Les fichiers dt= iraient sous le préfixe des tables colonnaires, aucune table *_csv ne les lirait
+        parser.error("--append-days nécessite --format parquet ou orc")
+    if not 0 <= args.seasonality < 1:
+        parser.error("--seasonality doit être dans [0, 1)")
+    return args
+
+
+def append_generation(state, rows, options, seed, args, params):
+    """Ajoute les args.append_days jours suivants aux datasets datés, à partir de l'état.
+
+    Les lignes prolongent les IDs (marque haute next_row) et les graines
+    restent indexées par jour absolu : ajouter 2 fois 5 jours produit les
+    mêmes lignes qu'ajouter 10 jours d'un coup. L'état est enregistré après
+    chaque dataset.
+    """
+    for name in APPEND_DATASETS:
+        entry = state['datasets'][name]
+        first_day = int((np.datetime64(entry['last_date'], 'D') - START_DATE).astype(np.int64)) + 1
+        print(f"{DATASETS[name]['label']} (à partir du {START_DATE + np.timedelta64(first_day, 'D')})")
+        partitions = append_partitions(name, rows[name], options, args.chunk_size,
+                                       first_day, entry['next_row'], args.append_days)
+        write_dataset(name, partitions, options, seed, args.workers, params.get(name, {}))
+
+        next_row = entry['next_row'] + sum(count for slices in partitions for *_, count in slices)
+        state['datasets'][name] = dataset_state(first_day + args.append_days - 1, next_row)
+        save_state(args.output_dir, state)
 
-def generate_sales_data():
-    """Génère des données de ventes réalistes"""
-    print("📊 Génération des données de ventes...")
-    
-    # Paramètres
-    n_records = 1000
-    start_date = datetime(2024, 1, 1)
-    
-    # Données de base
-    products = ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Headphones', 'Webcam', 'Tablet', 'Phone']
-    regions = ['North', 'South', 'East', 'West', 'Central']
-    sales_reps = ['Alice Johnson', 'Bob Smith', 'Carol Davis', 'David Wilson', 'Eva Brown']
-    categories = ['Electronics', 'Accessories', 'Computing', 'Mobile']
-    
-    # Génération des données
-    data = []
-    for i in range(n_records):
-        product = random.choice(products)
-        region = random.choice(regions)
-        sales_rep = random.choice(sales_reps)
-        category = random.choice(categories)
-        
-        # Prix basé sur le produit
-        base_prices = {
-            'Laptop': (800, 2000), 'Mouse': (10, 50), 'Keyboard': (20, 100),
-            'Monitor': (150, 500), 'Headphones': (30, 200), 'Webcam': (40, 150),
-            'Tablet': (200, 800), 'Phone': (300, 1200)
-        }
-        min_price, max_price = base_prices[product]
-        unit_price = round(random.uniform(min_price, max_price), 2)
-        
-        # Quantité et remise
-        quantity = random.randint(1, 5)
-        discount = round(random.uniform(0, 0.2), 2)  # 0-20% de remise
-        total_amount = round(unit_price * quantity * (1 - discount), 2)
-        
-        # Date aléatoire
-        random_days = random.randint(0, 365)
-        order_date = start_date + timedelta(days=random_days)
-        
-        # Statut basé sur la date
-        if order_date > datetime.now() - timedelta(days=30):
-            status = random.choice(['Pending', 'Processing', 'Shipped'])
-        else:
-            status = random.choice(['Completed', 'Cancelled'])
-        
-        data.append({
-            'order_id': f'ORD-{i+1:06d}',
-            'customer_id': random.randint(1, 200),
-            'product_name': product,
-            'category': category,
-            'region': region,
-            'sales_rep': sales_rep,
-            'order_date': order_date.strftime('%Y-%m-%d'),
-            'unit_price': unit_price,
-            'quantity': quantity,
-            'discount': discount,
-            'total_amount': total_amount,
-            'status': status,
-            'payment_method': random.choice(['Credit Card', 'PayPal', 'Bank Transfer', 'Cash'])
-        })
-    
-    df = pd.DataFrame(data)
-    df.to_csv('examples/sales_data.csv', index=False)
-    print(f"✅ sales_data.csv généré: {len(df)} enregistrements")
-    return df
-
-def generate_customer_data():
-    """Génère des données clients"""
-    print("👥 Génération des données clients...")
-    
-    # Noms et prénoms
-    first_names = ['Alice', 'Bob', 'Carol', 'David', 'Eva', 'Frank', 'Grace', 'Henry', 
-                   'Ivy', 'Jack', 'Kate', 'Liam', 'Mia', 'Noah', 'Olivia', 'Paul',
-                   'Quinn', 'Rachel', 'Sam', 'Tina', 'Uma', 'Victor', 'Wendy', 'Xavier', 'Yara', 'Zoe']
-    
-    last_names = ['Johnson', 'Smith', 'Davis', 'Wilson', 'Brown', 'Jones', 'Garcia', 'Miller',
-                  'Martinez', 'Anderson', 'Taylor', 'Thomas', 'Hernandez', 'Moore', 'Martin',
-                  'Jackson', 'Thompson', 'White', 'Lopez', 'Lee', 'Gonzalez', 'Harris', 'Clark']
-    
-    companies = ['TechCorp', 'DataSoft', 'CloudSys', 'InfoTech', 'Digital Solutions', 'ByteWorks',
-                 'CodeCraft', 'DataFlow', 'TechNova', 'CloudBase', 'InfoStream', 'DataCore']
-    
-    industries = ['Technology', 'Finance', 'Healthcare', 'Education', 'Manufacturing', 'Retail',
-                  'Consulting', 'Media', 'Government', 'Non-profit']
-    
-    countries = ['USA', 'Canada', 'UK', 'Germany', 'France', 'Spain', 'Italy', 'Netherlands',
-                 'Australia', 'Japan', 'Brazil', 'Mexico', 'India', 'China', 'South Korea']
-    
-    data = []
-    for i in range(200):
-        first_name = random.choice(first_names)
-        last_name = random.choice(last_names)
-        company = random.choice(companies)
-        industry = random.choice(industries)
-        country = random.choice(countries)
-        
-        # Email basé sur le nom
-        email = f"{first_name.lower()}.{last_name.lower()}@{company.lower().replace(' ', '')}.com"
-        
-        # Téléphone
-        phone = f"+1-{random.randint(100, 999)}-{random.randint(100, 999)}-{random.randint(1000, 9999)}"
-        
-        # Taille d'entreprise
-        company_size = random.choice(['Small (1-50)', 'Medium (51-200)', 'Large (201-1000)', 'Enterprise (1000+)'])
-        
-        # Date de création
-        created_date = datetime(2023, 1, 1) + timedelta(days=random.randint(0, 365))
-        
-        data.append({
-            'customer_id': i + 1,
-            'first_name': first_name,
-            'last_name': last_name,
-            'full_name': f"{first_name} {last_name}",
-            'email': email,
-            'phone': phone,
-            'company': company,
-            'industry': industry,
-            'country': country,
-            'company_size': company_size,
-            'created_date': created_date.strftime('%Y-%m-%d'),
-            'is_active': random.choice([True, True, True, False])  # 75% actifs
-        })
-    
-    df = pd.DataFrame(data)
-    df.to_csv('examples/customers_data.csv', index=False)
-    print(f"✅ customers_data.csv généré: {len(df)} enregistrements")
-    return df
-
-def generate_marketing_campaigns():
-    """Génère des données de campagnes marketing"""
-    print("📢 Génération des données de campagnes marketing...")
-    
-    campaign_names = [
-        'Spring Product Launch', 'Summer Social Media Blitz', 'Q4 Enterprise Outreach',
-        'Black Friday Sale', 'Cyber Monday Special', 'Holiday Shopping Spree',
-        'New Year Promotion', 'Valentine\'s Day Offer', 'Back to School Campaign',
-        'Tech Innovation Showcase', 'Customer Retention Program', 'Brand Awareness Drive'
-    ]
-    
-    channels = ['Email', 'Social Media', 'Webinar', 'Google Ads', 'Facebook Ads', 'LinkedIn', 'Direct Mail']
-    statuses = ['Active', 'Completed', 'Paused', 'Draft']
-    
-    data = []
-    for i in range(50):
-        campaign_name = random.choice(campaign_names)
-        channel = random.choice(channels)
-        status = random.choice(statuses)
-        
-        # Budget basé sur le canal
-        budget_ranges = {
-            'Email': (1000, 5000), 'Social Media': (2000, 8000), 'Webinar': (500, 2000),
-            'Google Ads': (3000, 15000), 'Facebook Ads': (2000, 10000), 'LinkedIn': (1000, 5000),
-            'Direct Mail': (500, 3000)
-        }
-        min_budget, max_budget = budget_ranges[channel]
-        budget = round(random.uniform(min_budget, max_budget), 2)
-        
-        # Dates
-        start_date = datetime(2024, 1, 1) + timedelta(days=random.randint(0, 200))
-        duration_days = random.randint(7, 90)
-        end_date = start_date + timedelta(days=duration_days)
-        
-        # Métriques (si la campagne est terminée)
-        if status == 'Completed':
-            impressions = random.randint(10000, 100000)
-            clicks = random.randint(100, 5000)
-            conversions = random.randint(10, 500)
-            ctr = round(clicks / impressions * 100, 2)
-            conversion_rate = round(conversions / clicks * 100, 2)
-            cost_per_click = round(budget / clicks, 2)
-        else:
-            impressions = random.randint(1000, 50000)
-            clicks = random.randint(50, 2500)
-            conversions = random.randint(5, 250)
-            ctr = round(clicks / impressions * 100, 2)
-            conversion_rate = round(conversions / clicks * 100, 2)
-            cost_per_click = round(budget / clicks, 2)
-        
-        data.append({
-            'campaign_id': f'CAMP-{i+1:03d}',
-            'campaign_name': campaign_name,
-            'channel': channel,
-            'status': status,
-            'start_date': start_date.strftime('%Y-%m-%d'),
-            'end_date': end_date.strftime('%Y-%m-%d'),
-            'budget': budget,
-            'impressions': impressions,
-            'clicks': clicks,
-            'conversions': conversions,
-            'ctr': ctr,
-            'conversion_rate': conversion_rate,
-            'cost_per_click': cost_per_click,
-            'roi': round(random.uniform(1.5, 4.0), 2)
-        })
-    
-    df = pd.DataFrame(data)
-    df.to_csv('examples/marketing_campaigns.csv', index=False)
-    print(f"✅ marketing_campaigns.csv généré: {len(df)} enregistrements")
-    return df
-
-def generate_website_traffic():
-    """Génère des données de trafic web"""
-    print("🌐 Génération des données de trafic web...")
-    
-    pages = ['/home', '/products', '/about', '/contact', '/blog', '/pricing', '/features', '/support']
-    sources = ['Google', 'Facebook', 'LinkedIn', 'Twitter', 'Direct', 'Email', 'Referral']
-    devices = ['Desktop', 'Mobile', 'Tablet']
-    countries = ['USA', 'Canada', 'UK', 'Germany', 'France', 'Spain', 'Italy', 'Netherlands']
-    
-    data = []
-    for i in range(5000):
-        page = random.choice(pages)
-        source = random.choice(sources)
-        device = random.choice(devices)
-        country = random.choice(countries)
-        
-        # Date et heure
-        date = datetime(2024, 1, 1) + timedelta(days=random.randint(0, 365))
-        hour = random.randint(0, 23)
-        minute = random.randint(0, 59)
-        timestamp = date.replace(hour=hour, minute=minute)
-        
-        # Durée de session basée sur la page
-        session_durations = {
-            '/home': (30, 300), '/products': (60, 600), '/about': (30, 180),
-            '/contact': (45, 300), '/blog': (120, 900), '/pricing': (90, 600),
-            '/features': (60, 480), '/support': (180, 1200)
-        }
-        min_duration, max_duration = session_durations[page]
-        session_duration = random.randint(min_duration, max_duration)
-        
-        # Bounce rate basé sur la source
-        bounce_rates = {
-            'Google': 0.4, 'Facebook': 0.3, 'LinkedIn': 0.2, 'Twitter': 0.35,
-            'Direct': 0.25, 'Email': 0.15, 'Referral': 0.3
-        }
-        is_bounce = random.random() < bounce_rates[source]
-        
-        data.append({
-            'session_id': f'SESS-{i+1:06d}',
-            'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'page': page,
-            'source': source,
-            'device': device,
-            'country': country,
-            'session_duration': session_duration,
-            'is_bounce': is_bounce,
-            'page_views': random.randint(1, 10) if not is_bounce else 1
-        })
-    
-    df = pd.DataFrame(data)
-    df.to_csv('examples/website_traffic.csv', index=False)
-    print(f"✅ website_traffic.csv généré: {len(df)} enregistrements")
-    return df
-
-def generate_financial_data():
-    """Génère des données financières"""
-    print("💰 Génération des données financières...")
-    
-    accounts = ['Sales Revenue', 'Marketing Expenses', 'R&D Costs', 'Administrative', 'Operations']
-    categories = ['Revenue', 'Expense', 'Asset', 'Liability', 'Equity']
-    
-    data = []
-    for i in range(365):  # Une année de données
-        date = datetime(2024, 1, 1) + timedelta(days=i)
-        
-        for account in accounts:
-            # Montant basé sur le type de compte
-            if 'Revenue' in account:
-                amount = round(random.uniform(50000, 200000), 2)
-            elif 'Expense' in account or 'Cost' in account:
-                amount = round(random.uniform(10000, 80000), 2)
-            else:
-                amount = round(random.uniform(1000, 50000), 2)
-            
-            # Variation saisonnière
-            if date.month in [11, 12]:  # Q4 - plus d'activité
-                amount *= 1.3
-            elif date.month in [6, 7, 8]:  # Été - moins d'activité
-                amount *= 0.8
-            
-            data.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'account': account,
-                'category': random.choice(categories),
-                'amount': amount,
-                'currency': 'USD',
-                'department': random.choice(['Sales', 'Marketing', 'R&D', 'Admin', 'Operations'])
-            })
-    
-    df = pd.DataFrame(data)
-    df.to_csv('examples/financial_data.csv', index=False)
-    print(f"✅ financial_data.csv généré: {len(df)} enregistrements")
-    return df
 
 def main():
     """Génère tous les CSV de test"""
+    args = parse_args()
+
+    if args.format != 'csv' and pa is None:
+        print(f"❌ Le format {args.format} nécessite pyarrow: pip install pyarrow")
+        return
+    if args.to_minio and boto3 is None:
+        print("❌ --to-minio nécessite boto3: pip install boto3")
+        return
+
+    state = None
+    if args.append_days:
+        # Le mode ajout prolonge la génération précédente : même graine, même échelle, même format
+        state = load_state(args.output_dir)
+        if state is None:
+            print(f"❌ Aucun état dans {state_path(args.output_dir)}: lancez d'abord une génération complète")
+            return
+        if state.get('format') != args.format:
+            print(f"❌ La génération complète est au format {state.get('format', 'inconnu')}: "
+                  f"relancez l'ajout avec ce --format ou régénérez en {args.format}")
+            return
+        seed, scale_factor = state['seed'], state['scale_factor']
+    else:
+        # Sans graine explicite, en tirer une et l'afficher pour pouvoir rejouer la génération
+        seed = args.seed if args.seed is not None else int(np.random.SeedSequence().entropy % (2 ** 32))
+        scale_factor = args.scale_factor
+
     print("🚀 GÉNÉRATION DES CSV DE TEST POUR DATA MESH")
     print("=" * 60)
-    
-    # Créer le dossier examples s'il n'existe pas
-    os.makedirs('examples', exist_ok=True)
-    
+    print(f"📐 Facteur d'échelle: {scale_factor:g} | graine: {seed} | workers: {args.workers}")
+
+    # Créer le dossier de sortie s'il n'existe pas
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    rows = {name: scaled_rows(name, scale_factor) for name in BASE_ROWS}
+    # Ventes, clients et leads partagent le même espace de clés clients
+    key_space = {'n_customers': rows['customers_data'], 'seed': seed}
+    skew = dict(args.skew)
+    params = {
+        'sales_data': dict(key_space, match_rate=args.order_match_rate,
+                           skew={c: skew[c] for c in DATASETS['sales_data']['skew_columns'] if c in skew}),
+        'website_traffic': {'skew': {c: skew[c] for c in DATASETS['website_traffic']['skew_columns'] if c in skew}},
+        'customers_data': key_space,
+        'marketing_leads': dict(key_space, n_campaigns=rows['marketing_campaigns'],
+                                match_rate=args.lead_match_rate),
+    }
+    options = {
+        'output_dir': args.output_dir,
+        'format': args.format,
+        'compression': args.compression,
+        'row_group_size': args.row_group_size,
+        'seasonality': args.seasonality,
+        'weekend_factor': args.weekend_factor,
+        'append': bool(args.append_days),
+        'register': not args.no_register,
+        's3': {
+            'endpoint': args.s3_endpoint,
+            'part_size': args.part_size * 1024 * 1024,
+            'parts_in_flight': args.parts_in_flight,
+        } if args.to_minio else None,
+    }
+    started = time.time()
+
+    if state is not None:
+        append_generation(state, rows, options, seed, args, params)
+        print(f"\n🎉 AJOUT DE {args.append_days} JOUR(S) TERMINÉ en {time.time() - started:.1f}s!")
+        return
+
     # Générer tous les datasets
-    sales_df = generate_sales_data()
-    customers_df = generate_customer_data()
-    campaigns_df = generate_marketing_campaigns()
-    traffic_df = generate_website_traffic()
-    financial_df = generate_financial_data()
-    
-    print("\n🎉 GÉNÉRATION TERMINÉE!")
+    for name, spec in DATASETS.items():
+        print(spec['label'])
+        partitions = dataset_partitions(name, rows[name], options, args.chunk_size)
+        write_dataset(name, partitions, options, seed, args.workers, params.get(name, {}))
+
+    # Point de départ des futurs --append-days
+    save_state(args.output_dir, {
+        'seed': seed,
+        'scale_factor': scale_factor,
+        'format': args.format,
+        'datasets': {name: dataset_state(DATASETS[name]['days'] - 1, rows[name]) for name in APPEND_DATASETS},
+    })
+
+    print(f"\n🎉 GÉNÉRATION TERMINÉE en {time.time() - started:.1f}s!")
     print("=" * 60)
-    print("📁 Fichiers générés dans le dossier 'examples/':")
-    print("   📊 sales_data.csv - Données de ventes (1000 enregistrements)")
-    print("   👥 customers_data.csv - Données clients (200 enregistrements)")
-    print("   📢 marketing_campaigns.csv - Campagnes marketing (50 enregistrements)")
-    print("   🌐 website_traffic.csv - Trafic web (5000 enregistrements)")
-    print("   💰 financial_data.csv - Données financières (1825 enregistrements)")
-    
+    if args.to_minio:
+        print(f"📁 Fichiers streamés dans les buckets MinIO ({args.s3_endpoint}):")
+    else:
+        print(f"📁 Fichiers générés dans le dossier '{args.output_dir}/':")
+    suffix = '.csv' if args.format == 'csv' else f'/ ({args.format})'
+    print(f"   📊 sales_data{suffix} - Données de ventes ({rows['sales_data']} enregistrements)")
+    print(f"   👥 customers_data{suffix} - Données clients ({rows['customers_data']} enregistrements)")
+    print(f"   📢 marketing_campaigns{suffix} - Campagnes marketing ({rows['marketing_campaigns']} enregistrements)")
+    print(f"   🌐 website_traffic{suffix} - Trafic web ({rows['website_traffic']} enregistrements)")
+    print(f"   💰 financial_data{suffix} - Données financières ({rows['financial_data']} enregistrements)")
+    print(f"   🎯 marketing_leads{suffix} - Leads marketing ({rows['marketing_leads']} enregistrements)")
+
     print("\n📋 PROCHAINES ÉTAPES:")
-    print("   1. Uploadez ces CSV dans MinIO (http://localhost:30901)")
-    print("   2. Créez des buckets: raw-data, marketing-data, web-data, financial-data")
+    if args.to_minio:
+        print("   1-2. Données déjà dans MinIO (buckets raw-data, marketing-data, web-data, financial-data)")
+    else:
+        print("   1. Uploadez ces CSV dans MinIO (http://localhost:30901)")
+        print("   2. Créez des buckets: raw-data, marketing-data, web-data, financial-data")
     print("   3. Testez les requêtes Trino dans JupyterHub")
     print("   4. Créez des dashboards Grafana")
-    
+
     print("\n🌐 ACCÈS AUX SERVICES:")
     print("   📦 MinIO: http://localhost:30901 (minioadmin/minioadmin)")
     print("   📓 JupyterHub: http://localhost:30080 (admin/datamesh2024)")
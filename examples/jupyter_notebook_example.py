@@ -45,19 +45,17 @@ print("✅ Connected to Trino")
 # 3. LOAD DATA
 # ============================================================================
 
-# Sales Data
+# Sales Data (precomputed by the mv_customer_lifetime_value materialized view)
 query_sales = """
 SELECT 
-    c.customer_id,
-    c.customer_name,
-    c.country,
-    c.industry,
-    c.company_size,
-    COUNT(o.order_id) as order_count,
-    SUM(o.total_amount) as lifetime_value
-FROM sales.public.customers c
-LEFT JOIN sales.public.orders o ON c.customer_id = o.customer_id
-GROUP BY 1, 2, 3, 4, 5
+    customer_id,
+    customer_name,
+    country,
+    industry,
+    company_size,
+    order_count,
+    lifetime_value
+FROM sales.public.mv_customer_lifetime_value
 """
 
 df_sales = pd.read_sql(query_sales, conn)
@@ -114,6 +112,8 @@ print(df_marketing['lead_source'].value_counts())
 # 5. CROSS-DOMAIN ANALYSIS
 # ============================================================================
 
+# Leads are matched to customers through the dbt identity map
+# (normalized email hash -> lead_id, customer_id): integer-key joins
 query_joined = """
 SELECT 
     l.lead_source,
@@ -121,7 +121,8 @@ SELECT
     COUNT(DISTINCT c.customer_id) as converted_customers,
     SUM(o.total_amount) as total_revenue
 FROM marketing.public.leads l
-LEFT JOIN sales.public.customers c ON LOWER(l.email) = LOWER(c.email)
+LEFT JOIN hive.default_marts.mart_identity_map m ON l.lead_id = m.lead_id
+LEFT JOIN sales.public.customers c ON m.customer_id = c.customer_id
 LEFT JOIN sales.public.orders o ON c.customer_id = o.customer_id
 GROUP BY 1
 ORDER BY total_revenue DESC NULLS LAST
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Espace de clés partagé entre les datasets générés
+
+Les clients (customer_id 1..n_customers) et leur identité (prénom, nom,
+entreprise, email unique) sont calculés une seule fois, sous forme d'un
+tableau compact de codes (3 octets par client). Ventes, clients et leads
+tirent tous leurs clés de cet espace : les jointures ventes → clients et
+leads → clients (sur l'email) ont une sélectivité contrôlée par les taux
+de correspondance, et non plus par le hasard.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from distributions import draw_ids
+
+FIRST_NAMES = np.array(['Alice', 'Bob', 'Carol', 'David', 'Eva', 'Frank', 'Grace', 'Henry',
+                        'Ivy', 'Jack', 'Kate', 'Liam', 'Mia', 'Noah', 'Olivia', 'Paul',
+                        'Quinn', 'Rachel', 'Sam', 'Tina', 'Uma', 'Victor', 'Wendy', 'Xavier', 'Yara', 'Zoe'])
+LAST_NAMES = np.array(['Johnson', 'Smith', 'Davis', 'Wilson', 'Brown', 'Jones', 'Garcia', 'Miller',
+                       'Martinez', 'Anderson', 'Taylor', 'Thomas', 'Hernandez', 'Moore', 'Martin',
+                       'Jackson', 'Thompson', 'White', 'Lopez', 'Lee', 'Gonzalez', 'Harris', 'Clark'])
+COMPANIES = np.array(['TechCorp', 'DataSoft', 'CloudSys', 'InfoTech', 'Digital Solutions', 'ByteWorks',
+                      'CodeCraft', 'DataFlow', 'TechNova', 'CloudBase', 'InfoStream', 'DataCore'])
+
+# Parties d'email précalculées par code
+_FIRST_LOWER = np.char.lower(FIRST_NAMES)
+_LAST_LOWER = np.char.lower(LAST_NAMES)
+_DOMAINS = np.char.add(np.char.replace(np.char.lower(COMPANIES), ' ', ''), '.com')
+
+# Clé de graine réservée à l'espace de clés (distincte des index de datasets)
+_SEED_KEY = 1000
+
+
+class KeySpace:
+    """Clients partagés par tous les datasets d'une génération"""
+
+    def __init__(self, n_customers, seed):
+        self.n_customers = n_customers
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(_SEED_KEY,)))
+        self.codes = np.empty(n_customers, dtype=[('first', 'u1'), ('last', 'u1'), ('company', 'u1')])
+        self.codes['first'] = rng.integers(0, len(FIRST_NAMES), n_customers)
+        self.codes['last'] = rng.integers(0, len(LAST_NAMES), n_customers)
+        self.codes['company'] = rng.integers(0, len(COMPANIES), n_customers)
+
+    def identity(self, customer_ids):
+        """Codes (prénom, nom, entreprise) des clients customer_ids (IDs à partir de 1)"""
+        return self.codes[np.asarray(customer_ids) - 1]
+
+    def emails(self, customer_ids):
+        """Emails des clients : prenom.nom.<id>@entreprise.com, uniques par ID"""
+        codes = self.identity(customer_ids)
+        return build_emails(codes['first'], codes['last'], codes['company'], customer_ids)
+
+    def sample_customer_ids(self, rng, n, match_rate=1.0, spec=None):
+        """Tire n customer_id selon la distribution spec (uniforme par défaut).
+
+        Une fraction 1 - match_rate pointe hors de l'espace (clients orphelins).
+        """
+        ids = draw_ids(rng, n, self.n_customers, spec)
+        if match_rate < 1.0:
+            orphan = rng.random(n) >= match_rate
+            ids[orphan] = self.n_customers + rng.integers(1, self.n_customers + 1, int(orphan.sum()))
+        return ids
+
+
+def build_emails(first_codes, last_codes, company_codes, suffixes):
+    """Assemble des emails prenom.nom.<suffixe>@entreprise.com à partir de codes"""
+    local = np.char.add(np.char.add(_FIRST_LOWER[first_codes], '.'), _LAST_LOWER[last_codes])
+    local = np.char.add(np.char.add(local, '.'), np.asarray(suffixes).astype('U'))
+    return np.char.add(np.char.add(local, '@'), _DOMAINS[company_codes])
+
+
+@lru_cache(maxsize=4)
+def get_key_space(n_customers, seed):
+    """Espace de clés d'une génération, construit une seule fois par processus"""
+    return KeySpace(n_customers, seed)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Accès S3 à MinIO pour les outils du Data Mesh
+
+Client boto3 vers le service minio (API S3, NodePort 30900) et écriture en
+streaming par upload multipart : les données sont découpées en parts
+envoyées en parallèle (plusieurs parts en vol) pendant que la production
+continue, sans copie sur disque local. La mémoire reste bornée à environ
+(parts en vol + 1) × taille de part.
+
+Variables d'environnement : MINIO_ENDPOINT (défaut http://localhost:30900),
+MINIO_ACCESS_KEY / MINIO_SECRET_KEY (défaut minioadmin). Toute API
+compatible S3 convient (MinIO local, moto en mode serveur...).
+"""
+
+import hashlib
+import io
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    import boto3
+    from botocore.config import Config
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:
+    boto3 = None
+
+DEFAULT_ENDPOINT = os.environ.get('MINIO_ENDPOINT', 'http://localhost:30900')
+ACCESS_KEY = os.environ.get('MINIO_ACCESS_KEY', 'minioadmin')
+SECRET_KEY = os.environ.get('MINIO_SECRET_KEY', 'minioadmin')
+
+# S3 impose au moins 5 Mio par part (sauf la dernière)
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_PARTS_IN_FLIGHT = 4
+DEFAULT_RETRIES = 5
+
+
+@lru_cache(maxsize=4)
+def get_client(endpoint=DEFAULT_ENDPOINT, max_pool_connections=10):
+    """Client S3 vers MinIO, créé une seule fois par processus (pool de connexions HTTP réutilisé)"""
+    if boto3 is None:
+        raise RuntimeError("boto3 est requis pour accéder à MinIO: pip install boto3")
+    return boto3.client(
+        's3',
+        endpoint_url=endpoint,
+        aws_access_key_id=ACCESS_KEY,
+        aws_secret_access_key=SECRET_KEY,
+        region_name='us-east-1',
+        config=Config(signature_version='s3v4', max_pool_connections=max_pool_connections,
+                      retries={'max_attempts': 5, 'mode': 'standard'}),
+    )
+
+
+def ensure_bucket(client, bucket):
+    """Crée le bucket s'il n'existe pas"""
+    try:
+        client.head_bucket(Bucket=bucket)
+    except ClientError:
+        client.create_bucket(Bucket=bucket)
+
+
+def delete_keys(client, bucket, keys):
+    """Supprime des objets par requêtes DeleteObjects de 1000 clés ; retourne le nombre supprimé"""
+    keys = list(keys)
+    for start in range(0, len(keys), 1000):
+        batch = [{'Key': key} for key in keys[start:start + 1000]]
+        response = client.delete_objects(Bucket=bucket, Delete={'Objects': batch, 'Quiet': True})
+        if response.get('Errors'):
+            error = response['Errors'][0]
+            raise RuntimeError(f"suppression de {bucket}/{error['Key']} impossible: {error['Message']}")
+    return len(keys)
+
+
+def delete_prefix(client, bucket, prefix):
+    """Supprime tous les objets sous prefix ; retourne le nombre supprimé"""
+    return delete_keys(client, bucket, list_objects(client, bucket, prefix))
+
+
+def list_objects(client, bucket, prefix=''):
+    """Liste paginée (ListObjectsV2, 1000 clés par page) : {clé: (taille, ETag)}, vide si le bucket n'existe pas"""
+    objects = {}
+    try:
+        for page in client.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                objects[obj['Key']] = (obj['Size'], obj['ETag'].strip('"'))
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'NoSuchBucket':
+            raise
+    return objects
+
+
+def head_object(client, bucket, key):
+    """(taille, ETag) de l'objet par HEAD, None s'il n'existe pas"""
+    try:
+        response = client.head_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+            return None
+        raise
+    return response['ContentLength'], response['ETag'].strip('"')
+
+
+def part_md5s(path, part_size):
+    """MD5 (hex) de chaque part de part_size octets d'un fichier"""
+    digests = []
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(part_size)
+            if not chunk and digests:
+                break
+            digests.append(hashlib.md5(chunk).hexdigest())
+            if len(chunk) < part_size:
+                break
+    return digests
+
+
+def expected_etag(md5s, size, part_size):
+    """ETag S3 de l'objet uploadé par upload_file : MD5 du contenu en un seul PUT,
+    MD5 des MD5 de parts suffixé du nombre de parts en multipart"""
+    if size < part_size:
+        return md5s[0]
+    combined = hashlib.md5(b''.join(bytes.fromhex(digest) for digest in md5s)).hexdigest()
+    return f"{combined}-{len(md5s)}"
+
+
+def remote_etag(client, bucket, key):
+    """ETag (sans guillemets) de l'objet, None s'il n'existe pas"""
+    head = head_object(client, bucket, key)
+    return head and head[1]
+
+
+def with_retries(fn, retries=DEFAULT_RETRIES, base_delay=0.5):
+    """Appelle fn() et la relance sur erreur réseau ou serveur (5xx, SlowDown),
+    avec un délai exponentiel aléatoire entre les tentatives"""
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except (BotoCoreError, ClientError) as e:
+            if isinstance(e, ClientError):
+                status = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+                if status < 500 and e.response['Error']['Code'] not in ('SlowDown', 'RequestTimeout'):
+                    raise
+            if attempt == retries:
+                raise
+            time.sleep(base_delay * 2 ** attempt * random.uniform(0.5, 1.0))
+
+
+class UploadCheckpoint:
+    """Points de reprise des uploads multipart, persistés dans un fichier JSON.
+
+    Par objet : upload_id, empreinte du fichier source (taille, mtime, taille
+    de part) et ETag des parts terminées. Le fichier est réécrit de façon
+    atomique à chaque part : un arrêt brutal perd au plus les parts en vol.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self.uploads = json.load(f)
+        except FileNotFoundError:
+            self.uploads = {}
+
+    def get(self, bucket, key):
+        with self._lock:
+            return self.uploads.get(f"{bucket}/{key}")
+
+    def start(self, bucket, key, upload_id, fingerprint):
+        with self._lock:
+            self.uploads[f"{bucket}/{key}"] = {'upload_id': upload_id, 'fingerprint': fingerprint, 'parts': {}}
+            self._save()
+
+    def part_done(self, bucket, key, number, etag):
+        with self._lock:
+            self.uploads[f"{bucket}/{key}"]['parts'][str(number)] = etag
+            self._save()
+
+    def finish(self, bucket, key):
+        with self._lock:
+            self.uploads.pop(f"{bucket}/{key}", None)
+            self._save()
+
+    def _save(self):
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(self.uploads, f, indent=1)
+        os.replace(self.path + '.tmp', self.path)
+
+
+def uploaded_parts(client, bucket, key, upload_id):
+    """Parts déjà présentes côté serveur d'un upload multipart : {numéro: (ETag, taille)}"""
+    parts = {}
+    for page in client.get_paginator('list_parts').paginate(Bucket=bucket, Key=key, UploadId=upload_id):
+        for part in page.get('Parts', []):
+            parts[part['PartNumber']] = (part['ETag'], part['Size'])
+    return parts
+
+
+def resume_upload(client, bucket, key, checkpoint, fingerprint):
+    """Reprend l'upload interrompu de bucket/key s'il porte sur le même fichier.
+
+    Retourne (upload_id, {numéro de part: ETag}) ou (None, {}). Un upload
+    obsolète (fichier modifié depuis) ou expiré côté serveur est abandonné.
+    """
+    entry = checkpoint.get(bucket, key)
+    if entry is None:
+        return None, {}
+    size, _, part_size = fingerprint
+    try:
+        if entry['fingerprint'] == fingerprint:
+            # Une part de taille inattendue (écriture tronquée) est renvoyée
+            return entry['upload_id'], {
+                number: etag
+                for number, (etag, part_bytes) in uploaded_parts(client, bucket, key, entry['upload_id']).items()
+                if part_bytes == min(part_size, size - (number - 1) * part_size)
+            }
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=entry['upload_id'])
+    except ClientError:
+        pass
+    checkpoint.finish(bucket, key)
+    return None, {}
+
+
+def upload_file(client, path, bucket, key, part_size=DEFAULT_PART_SIZE, parts_in_flight=DEFAULT_PARTS_IN_FLIGHT,
+                copy_parts=(), copy_if_match=None, checkpoint=None, retries=DEFAULT_RETRIES):
+    """Upload un fichier local, parts_in_flight parts en parallèle.
+
+    Un fichier plus petit qu'une part part en un seul PUT. En multipart,
+    chaque thread lit sa propre plage du fichier ; les parts dont le numéro
+    est dans copy_parts ne sont pas renvoyées mais copiées côté serveur
+    depuis l'objet existant (UploadPartCopy, conditionnée à son ETag
+    copy_if_match). Chaque requête est relancée avec backoff (retries fois).
+
+    Avec un UploadCheckpoint, l'upload interrompu d'un même fichier reprend
+    à partir des parts manquantes (listées par ListParts) et n'est pas
+    annulé en cas d'échec, pour pouvoir être repris au lancement suivant.
+    Retourne (octets envoyés, ETag de l'objet).
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    if size < part_size:
+        def put():
+            with open(path, 'rb') as f:
+                return client.put_object(Bucket=bucket, Key=key, Body=f.read())
+        return size, with_retries(put, retries)['ETag'].strip('"')
+
+    n_parts = -(-size // part_size)
+    fingerprint = [size, stat.st_mtime_ns, part_size]
+    upload_id, done = resume_upload(client, bucket, key, checkpoint, fingerprint) if checkpoint else (None, {})
+    if upload_id is None:
+        upload_id = with_retries(lambda: client.create_multipart_upload(Bucket=bucket, Key=key), retries)['UploadId']
+        if checkpoint:
+            checkpoint.start(bucket, key, upload_id, fingerprint)
+
+    def send_part(number):
+        start = (number - 1) * part_size
+        end = min(start + part_size, size)
+        if number in copy_parts:
+            copy_source = {'Bucket': bucket, 'Key': key}
+            extra = {'CopySourceIfMatch': f'"{copy_if_match}"'} if copy_if_match else {}
+            response = with_retries(lambda: client.upload_part_copy(
+                Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, CopySource=copy_source,
+                CopySourceRange=f"bytes={start}-{end - 1}", **extra), retries)
+            etag, sent = response['CopyPartResult']['ETag'], 0
+        else:
+            with open(path, 'rb') as f:
+                f.seek(start)
+                data = f.read(end - start)
+            response = with_retries(lambda: client.upload_part(
+                Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=data), retries)
+            etag, sent = response['ETag'], len(data)
+        if checkpoint:
+            checkpoint.part_done(bucket, key, number, etag)
+        return number, etag, sent
+
+    try:
+        with ThreadPoolExecutor(max_workers=parts_in_flight) as pool:
+            results = list(pool.map(send_part, [n for n in range(1, n_parts + 1) if n not in done]))
+        etags = dict(done)
+        etags.update((number, etag) for number, etag, _ in results)
+        response = with_retries(lambda: client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={'Parts': [{'PartNumber': n, 'ETag': etags[n]} for n in range(1, n_parts + 1)]}),
+            retries)
+    except BaseException:
+        if checkpoint is None:
+            client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+    if checkpoint:
+        checkpoint.finish(bucket, key)
+    return sum(sent for _, _, sent in results), response['ETag'].strip('"')
+
+
+class MultipartWriter(io.BufferedIOBase):
+    """Fichier binaire en écriture seule qui streame vers un objet S3.
+
+    Les écritures sont accumulées jusqu'à part_size puis envoyées en part
+    d'upload multipart par un pool de parts_in_flight threads ; au-delà,
+    write() attend la plus ancienne part. Un objet plus petit qu'une part
+    est envoyé en un seul PUT. En cas d'erreur (ou de sortie du bloc with
+    sur exception), l'upload est annulé : aucun objet partiel n'est visible.
+    """
+
+    def __init__(self, client, bucket, key, part_size=DEFAULT_PART_SIZE,
+                 parts_in_flight=DEFAULT_PARTS_IN_FLIGHT):
+        super().__init__()
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"part_size doit être d'au moins {MIN_PART_SIZE} octets")
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.parts_in_flight = parts_in_flight
+        self.upload_id = None
+        self.parts = []
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._pool = None
+        self._written = 0
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._written
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("écriture dans un MultipartWriter fermé")
+        self._buffer += data
+        self._written += len(data)
+        try:
+            while len(self._buffer) >= self.part_size:
+                part = bytes(self._buffer[:self.part_size])
+                del self._buffer[:self.part_size]
+                self._submit(part)
+        except BaseException:
+            self.abort()
+            raise
+        return len(data)
+
+    def _submit(self, data):
+        """Envoie une part en arrière-plan, en limitant le nombre de parts en vol"""
+        if self.upload_id is None:
+            self.upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=self.key)['UploadId']
+            self._pool = ThreadPoolExecutor(max_workers=self.parts_in_flight)
+        while len(self._pending) >= self.parts_in_flight:
+            self.parts.append(self._pending.popleft().result())
+        part_number = len(self.parts) + len(self._pending) + 1
+        self._pending.append(self._pool.submit(self._upload_part, part_number, data))
+
+    def _upload_part(self, part_number, data):
+        response = self.client.upload_part(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                                           PartNumber=part_number, Body=data)
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    def close(self):
+        """Termine l'objet : envoie le reste, attend les parts et valide l'upload"""
+        if self.closed:
+            return
+        try:
+            if self.upload_id is None:
+                self.client.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer))
+            else:
+                if self._buffer:
+                    self._submit(bytes(self._buffer))
+                while self._pending:
+                    self.parts.append(self._pending.popleft().result())
+                self.client.complete_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                                                      MultipartUpload={'Parts': self.parts})
+                self._pool.shutdown()
+        except BaseException:
+            self.abort()
+            raise
+        self._buffer = bytearray()
+        super().close()
+
+    def abort(self):
+        """Abandonne l'upload en cours et libère les parts déjà envoyées"""
+        if self.closed:
+            return
+        for future in self._pending:
+            future.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        if self.upload_id is not None:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+        self._pending.clear()
+        self._buffer = bytearray()
+        super().close()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
@@ -1,22 +1,177 @@
 #!/usr/bin/env python3
 """
 Script pour configurer les schémas Hive et créer les tables pour les CSV
+et pour les fichiers colonnaires (Parquet/ORC) partitionnés par jour
 """
 
+import argparse
+import os
 import subprocess
+import sys
 import time
 
-def run_command(cmd, check=True):
-    """Exécute une commande et retourne le résultat"""
-    print(f"🔨 {cmd}")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    
-    if check and result.returncode != 0:
-        print(f"❌ Erreur: {result.stderr}")
-        return False
-    
-    if result.stdout:
-        print(result.stdout)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'setup'))
+from db_connections import trino_dbapi, trino_query
+
+# Tables colonnaires écrites par generate_test_csvs.py --format parquet|orc.
+# Les fichiers sont rangés sous s3a://<bucket>/<table>/dt=YYYY-MM-DD/ ;
+# 'partition_source' est la colonne dont le jour donne la valeur de dt
+# (None = table non partitionnée).
+LAKE_TABLES = {
+    'sales_data': {
+        'schema': 'raw_data',
+        'bucket': 'raw-data',
+        'partition_source': 'order_date',
+        'columns': [
+            ('order_id', 'VARCHAR'),
+            ('customer_id', 'BIGINT'),
+            ('product_name', 'VARCHAR'),
+            ('category', 'VARCHAR'),
+            ('region', 'VARCHAR'),
+            ('sales_rep', 'VARCHAR'),
+            ('order_date', 'DATE'),
+            ('unit_price', 'DOUBLE'),
+            ('quantity', 'BIGINT'),
+            ('discount', 'DOUBLE'),
+            ('total_amount', 'DOUBLE'),
+            ('status', 'VARCHAR'),
+            ('payment_method', 'VARCHAR'),
+        ],
+    },
+    'customers_data': {
+        'schema': 'raw_data',
+        'bucket': 'raw-data',
+        'partition_source': None,
+        'columns': [
+            ('customer_id', 'BIGINT'),
+            ('first_name', 'VARCHAR'),
+            ('last_name', 'VARCHAR'),
+            ('full_name', 'VARCHAR'),
+            ('email', 'VARCHAR'),
+            ('phone', 'VARCHAR'),
+            ('company', 'VARCHAR'),
+            ('industry', 'VARCHAR'),
+            ('country', 'VARCHAR'),
+            ('company_size', 'VARCHAR'),
+            ('created_date', 'DATE'),
+            ('is_active', 'BOOLEAN'),
+        ],
+    },
+    'marketing_campaigns': {
+        'schema': 'marketing_data',
+        'bucket': 'marketing-data',
+        'partition_source': None,
+        'columns': [
+            ('campaign_id', 'VARCHAR'),
+            ('campaign_name', 'VARCHAR'),
+            ('channel', 'VARCHAR'),
+            ('status', 'VARCHAR'),
+            ('start_date', 'DATE'),
+            ('end_date', 'DATE'),
+            ('budget', 'DOUBLE'),
+            ('impressions', 'BIGINT'),
+            ('clicks', 'BIGINT'),
+            ('conversions', 'BIGINT'),
+            ('ctr', 'DOUBLE'),
+            ('conversion_rate', 'DOUBLE'),
+            ('cost_per_click', 'DOUBLE'),
+            ('roi', 'DOUBLE'),
+        ],
+    },
+    'website_traffic': {
+        'schema': 'web_data',
+        'bucket': 'web-data',
+        'partition_source': 'timestamp',
+        'columns': [
+            ('session_id', 'VARCHAR'),
+            ('timestamp', 'TIMESTAMP'),
+            ('page', 'VARCHAR'),
+            ('source', 'VARCHAR'),
+            ('device', 'VARCHAR'),
+            ('country', 'VARCHAR'),
+            ('session_duration', 'BIGINT'),
+            ('is_bounce', 'BOOLEAN'),
+            ('page_views', 'BIGINT'),
+        ],
+    },
+    'financial_data': {
+        'schema': 'financial_data',
+        'bucket': 'financial-data',
+        'partition_source': 'date',
+        'columns': [
+            ('date', 'DATE'),
+            ('account', 'VARCHAR'),
+            ('category', 'VARCHAR'),
+            ('amount', 'DOUBLE'),
+            ('currency', 'VARCHAR'),
+            ('department', 'VARCHAR'),
+        ],
+    },
+    'marketing_leads': {
+        'schema': 'marketing_data',
+        'bucket': 'marketing-data',
+        'partition_source': 'created_date',
+        'columns': [
+            ('lead_id', 'VARCHAR'),
+            ('first_name', 'VARCHAR'),
+            ('last_name', 'VARCHAR'),
+            ('email', 'VARCHAR'),
+            ('company', 'VARCHAR'),
+            ('lead_source', 'VARCHAR'),
+            ('lead_stage', 'VARCHAR'),
+            ('campaign_id', 'VARCHAR'),
+            ('created_date', 'DATE'),
+        ],
+    },
+}
+
+# Client Trino du coordinateur, appelé par kubectl exec quand le client Python trino manque
+TRINO_CLI = "kubectl exec -n data-platform deployment/trino-coordinator -- trino"
+
+
+# Erreurs Trino tolérées avec check=False : l'objet (schéma, table, partition) existe déjà
+ALREADY_EXISTS_ERRORS = ('already exists', 'already registered')
+
+
+def trino_error(sql, error, check):
+    """Signale sur stderr l'échec d'une requête Trino.
+
+    Avec check=False, une erreur « existe déjà » est ignorée sans message ;
+    toute autre erreur est écrite avec sa requête. Retourne False si
+    l'erreur n'est pas ignorée.
+    """
+    if not check and any(marker in str(error) for marker in ALREADY_EXISTS_ERRORS):
+        return True
+    print(f"❌ Erreur sur {' '.join(sql.split())[:200]}: {str(error).strip()}", file=sys.stderr)
+    return False
+
+
+def run_trino(sql, check=False):
+    """Exécute une requête SQL sur le coordinateur Trino.
+
+    Passe par la session HTTP partagée de db_connections : pas de kubectl
+    exec ni de démarrage du CLI (JVM) par requête. Sans le client Python
+    trino, retombe sur le CLI du coordinateur. Retourne False en cas
+    d'échec ; check=False ne tolère que les erreurs « existe déjà »
+    (DDL et CALL rejoués).
+    """
+    if trino_dbapi is None:
+        cmd = f"{TRINO_CLI} --execute \"{sql}\""
+        print(f"🔨 {cmd}")
+        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        if result.returncode != 0:
+            return trino_error(sql, result.stderr, check)
+        if result.stdout:
+            print(result.stdout)
+        return True
+
+    print(f"🔨 {' '.join(sql.split())[:120]}")
+    try:
+        _, rows = trino_query(sql)
+    except Exception as e:
+        return trino_error(sql, e, check)
+    for row in rows:
+        print(", ".join(f'"{value}"' for value in row))
     return True
 
 def create_hive_schemas():
@@ -27,8 +182,7 @@ def create_hive_schemas():
     
     for schema in schemas:
         print(f"   Création du schéma: {schema}")
-        cmd = f"kubectl exec -n data-platform deployment/trino-coordinator -- trino --execute \"CREATE SCHEMA IF NOT EXISTS hive.{schema}\""
-        run_command(cmd, check=False)
+        run_trino(f"CREATE SCHEMA IF NOT EXISTS hive.{schema}")
 
 def create_hive_tables():
     """Crée les tables Hive pour les CSV"""
@@ -59,8 +213,7 @@ def create_hive_tables():
     )
     """
     
-    cmd = f"kubectl exec -n data-platform deployment/trino-coordinator -- trino --execute \"{sales_table}\""
-    run_command(cmd, check=False)
+    run_trino(sales_table)
     
     # Table customers_data
     print("   Création de la table customers_data...")
@@ -86,8 +239,7 @@ def create_hive_tables():
     )
     """
     
-    cmd = f"kubectl exec -n data-platform deployment/trino-coordinator -- trino --execute \"{customers_table}\""
-    run_command(cmd, check=False)
+    run_trino(customers_table)
     
     # Table marketing_campaigns
     print("   Création de la table marketing_campaigns...")
@@ -115,8 +267,30 @@ def create_hive_tables():
     )
     """
     
-    cmd = f"kubectl exec -n data-platform deployment/trino-coordinator -- trino --execute \"{marketing_table}\""
-    run_command(cmd, check=False)
+    run_trino(marketing_table)
+    
+    # Table marketing_leads
+    print("   Création de la table marketing_leads...")
+    leads_table = """
+    CREATE TABLE IF NOT EXISTS hive.marketing_data.marketing_leads_csv (
+        lead_id VARCHAR,
+        first_name VARCHAR,
+        last_name VARCHAR,
+        email VARCHAR,
+        company VARCHAR,
+        lead_source VARCHAR,
+        lead_stage VARCHAR,
+        campaign_id VARCHAR,
+        created_date VARCHAR
+    )
+    WITH (
+        external_location = 's3a://marketing-data/marketing_leads.csv',
+        format = 'CSV',
+        skip_header_line_count = 1
+    )
+    """
+    
+    run_trino(leads_table)
     
     # Table website_traffic
     print("   Création de la table website_traffic...")
@@ -139,8 +313,7 @@ def create_hive_tables():
     )
     """
     
-    cmd = f"kubectl exec -n data-platform deployment/trino-coordinator -- trino --execute \"{traffic_table}\""
-    run_command(cmd, check=False)
+    run_trino(traffic_table)
     
     # Table financial_data
     print("   Création de la table financial_data...")
@@ -160,8 +333,75 @@ def create_hive_tables():
     )
     """
     
-    cmd = f"kubectl exec -n data-platform deployment/trino-coordinator -- trino --execute \"{financial_table}\""
-    run_command(cmd, check=False)
+    run_trino(financial_table)
+
+def columnar_table_ddl(table, file_format='PARQUET'):
+    """Construit le CREATE TABLE d'une table colonnaire de LAKE_TABLES"""
+    spec = LAKE_TABLES[table]
+    columns = [f'{name} {sql_type}' for name, sql_type in spec['columns']]
+    properties = [
+        f"external_location = 's3a://{spec['bucket']}/{table}/'",
+        f"format = '{file_format}'",
+    ]
+    if spec['partition_source']:
+        # La colonne de partition doit être la dernière de la table
+        columns.append('dt VARCHAR')
+        properties.append("partitioned_by = ARRAY['dt']")
+
+    return (
+        f"CREATE TABLE IF NOT EXISTS hive.{spec['schema']}.{table} (\n"
+        + ",\n".join(f"        {column}" for column in columns)
+        + "\n    )\n    WITH (\n"
+        + ",\n".join(f"        {prop}" for prop in properties)
+        + "\n    )"
+    )
+
+
+def create_columnar_tables(file_format='PARQUET'):
+    """Crée les tables Hive colonnaires partitionnées par jour (dt=YYYY-MM-DD)"""
+    print(f"\n🗂️  Création des tables colonnaires ({file_format})...")
+
+    for table, spec in LAKE_TABLES.items():
+        print(f"   Création de la table {spec['schema']}.{table}...")
+        run_trino(columnar_table_ddl(table, file_format))
+
+        if spec['partition_source']:
+            # Découvrir les partitions dt= déjà présentes dans MinIO
+            run_trino(f"CALL hive.system.sync_partition_metadata('{spec['schema']}', '{table}', 'ADD')")
+
+def register_partitions(table, days, batch_size=100):
+    """Déclare au metastore les partitions dt= qui viennent d'être écrites.
+
+    Un CALL register_partition par jour, sans relister tout le préfixe de
+    la table comme sync_partition_metadata ; une partition déjà connue est
+    ignorée, toute autre erreur est écrite sur stderr. Nécessite
+    hive.allow-register-partition-procedure=true. Retourne le nombre de
+    partitions dont l'enregistrement a échoué.
+    """
+    spec = LAKE_TABLES[table]
+    if not spec['partition_source'] or not days:
+        return 0
+
+    print(f"   Enregistrement de {len(days)} partition(s) de {spec['schema']}.{table}...")
+    calls = [f"CALL hive.system.register_partition('{spec['schema']}', '{table}', ARRAY['dt'], ARRAY['{day}'])"
+             for day in sorted(days)]
+    failed = 0
+    if trino_dbapi is not None:
+        # Une seule session pour tous les CALL
+        failed = sum(not run_trino(call) for call in calls)
+    else:
+        for start in range(0, len(calls), batch_size):
+            statements = '; '.join(calls[start:start + batch_size])
+            cmd = f"{TRINO_CLI} --ignore-errors --execute \"{statements}\""
+            print(f"🔨 {cmd[:200]}")
+            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            # --ignore-errors enchaîne les CALL et écrit sur stderr l'erreur de chaque CALL en échec
+            for line in result.stderr.splitlines():
+                if line.strip() and not trino_error(statements, line, check=False):
+                    failed += 1
+    if failed:
+        print(f"⚠️  {spec['schema']}.{table}: {failed} erreur(s) d'enregistrement de partition", file=sys.stderr)
+    return failed
 
 def test_tables():
     """Teste l'accès aux tables créées"""
@@ -177,27 +417,38 @@ def test_tables():
     
     for description, query in test_queries:
         print(f"\n   {description}:")
-        cmd = f"kubectl exec -n data-platform deployment/trino-coordinator -- trino --execute \"{query}\""
-        run_command(cmd, check=False)
+        run_trino(query)
+
+def parse_args():
+    """Analyse les arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Configure les schémas et tables Hive")
+    parser.add_argument('--format', choices=['parquet', 'orc'], default='parquet',
+                        help="Format des tables colonnaires (défaut: parquet)")
+    return parser.parse_args()
 
 def main():
     """Fonction principale"""
+    args = parse_args()
+
     print("🚀 CONFIGURATION DES SCHÉMAS HIVE")
     print("=" * 50)
     
     # Créer les schémas
     create_hive_schemas()
     
-    # Attendre un peu
-    print("\n⏳ Attente de la propagation des schémas...")
-    time.sleep(5)
+    # Attendre un peu (inutile avec la session partagée : chaque requête est terminée à son retour)
+    if trino_dbapi is None:
+        print("\n⏳ Attente de la propagation des schémas...")
+        time.sleep(5)
     
     # Créer les tables
     create_hive_tables()
+    create_columnar_tables(args.format.upper())
     
     # Attendre un peu
-    print("\n⏳ Attente de la création des tables...")
-    time.sleep(10)
+    if trino_dbapi is None:
+        print("\n⏳ Attente de la création des tables...")
+        time.sleep(10)
     
     # Tester les tables
     test_tables()
@@ -208,6 +459,7 @@ def main():
     print("   SELECT * FROM hive.raw_data.sales_data_csv LIMIT 5;")
     print("   SELECT * FROM hive.raw_data.customers_data_csv LIMIT 5;")
     print("   SELECT * FROM hive.marketing_data.marketing_campaigns_csv LIMIT 5;")
+    print("   SELECT COUNT(*) FROM hive.raw_data.sales_data WHERE dt = '2024-06-01';")
     
     print("\n📋 Schémas créés:")
     print("   📊 hive.raw_data - Données de ventes et clients")
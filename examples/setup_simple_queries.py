@@ -3,20 +3,7 @@
 Script pour configurer des requêtes simples avec les données existantes
 """
 
-import subprocess
-
-def run_command(cmd, check=True):
-    """Exécute une commande et retourne le résultat"""
-    print(f"🔨 {cmd}")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    
-    if check and result.returncode != 0:
-        print(f"❌ Erreur: {result.stderr}")
-        return False
-    
-    if result.stdout:
-        print(result.stdout)
-    return True
+from setup_hive_schemas import run_trino
 
 def test_existing_data():
     """Teste les données existantes dans PostgreSQL"""
@@ -24,18 +11,15 @@ def test_existing_data():
     
     # Test des données Sales
     print("\n📊 Données Sales (PostgreSQL):")
-    cmd = "kubectl exec -n data-platform deployment/trino-coordinator -- trino --execute \"SELECT * FROM sales.public.customers LIMIT 3\""
-    run_command(cmd, check=False)
+    run_trino("SELECT * FROM sales.public.customers LIMIT 3")
     
     # Test des données Marketing
     print("\n📢 Données Marketing (PostgreSQL):")
-    cmd = "kubectl exec -n data-platform deployment/trino-coordinator -- trino --execute \"SELECT * FROM marketing.public.campaigns LIMIT 3\""
-    run_command(cmd, check=False)
+    run_trino("SELECT * FROM marketing.public.campaigns LIMIT 3")
     
     # Test des données DBT transformées
     print("\n🔄 Données DBT transformées:")
-    cmd = "kubectl exec -n data-platform deployment/trino-coordinator -- trino --execute \"SELECT * FROM hive.analytics_analytics_analytics.sales_customers LIMIT 3\""
-    run_command(cmd, check=False)
+    run_trino("SELECT * FROM hive.analytics_analytics_analytics.sales_customers LIMIT 3")
 
 def create_sample_queries():
     """Crée des exemples de requêtes pour JupyterHub"""
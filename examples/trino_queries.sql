@@ -42,6 +42,11 @@ ORDER BY total_conversions DESC;
 -- 2. CROSS-DOMAIN QUERIES - The Power of Data Mesh!
 -- ----------------------------------------------------------------------------
 
+-- Leads are matched to customers through the dbt identity map (normalized
+-- email hash -> lead_id, customer_id), refreshed incrementally with:
+--   dbt run --select mart_identity_emails mart_identity_map
+-- The joins then run on integer keys that Trino pushes down to PostgreSQL
+
 -- Lead-to-Customer Journey Analysis
 SELECT 
     l.lead_source,
@@ -51,7 +56,8 @@ SELECT
     SUM(o.total_amount) as total_revenue,
     ROUND(SUM(o.total_amount) / NULLIF(COUNT(DISTINCT c.customer_id), 0), 2) as avg_revenue_per_customer
 FROM marketing.public.leads l
-LEFT JOIN sales.public.customers c ON LOWER(TRIM(l.email)) = LOWER(TRIM(c.email))
+LEFT JOIN hive.default_marts.mart_identity_map m ON l.lead_id = m.lead_id
+LEFT JOIN sales.public.customers c ON m.customer_id = c.customer_id
 LEFT JOIN sales.public.orders o ON c.customer_id = o.customer_id
 GROUP BY l.lead_source
 ORDER BY total_revenue DESC NULLS LAST;
@@ -67,7 +73,8 @@ SELECT
     ROUND((SUM(o.total_amount) - c.budget) / NULLIF(c.budget, 0) * 100, 2) as roi_percent
 FROM marketing.public.campaigns c
 LEFT JOIN marketing.public.leads l ON c.campaign_id = l.campaign_id
-LEFT JOIN sales.public.customers cust ON LOWER(TRIM(l.email)) = LOWER(TRIM(cust.email))
+LEFT JOIN hive.default_marts.mart_identity_map m ON l.lead_id = m.lead_id
+LEFT JOIN sales.public.customers cust ON m.customer_id = cust.customer_id
 LEFT JOIN sales.public.orders o ON cust.customer_id = o.customer_id
 GROUP BY 1, 2, 3
 ORDER BY attributed_revenue DESC NULLS LAST;
@@ -96,11 +103,11 @@ WITH customer_segments AS (
 ),
 lead_attribution AS (
     SELECT 
-        c.customer_id,
+        m.customer_id,
         l.lead_source,
         l.campaign_id
-    FROM sales.public.customers c
-    JOIN marketing.public.leads l ON LOWER(TRIM(c.email)) = LOWER(TRIM(l.email))
+    FROM hive.default_marts.mart_identity_map m
+    JOIN marketing.public.leads l ON m.lead_id = l.lead_id
 )
 SELECT 
     cs.segment,
@@ -212,9 +219,9 @@ customer_cohorts AS (
     FROM first_order fo
     JOIN sales.public.orders o ON fo.customer_id = o.customer_id
     LEFT JOIN (
-        SELECT c.customer_id, l.lead_source
-        FROM sales.public.customers c
-        JOIN marketing.public.leads l ON LOWER(TRIM(c.email)) = LOWER(TRIM(l.email))
+        SELECT m.customer_id, l.lead_source
+        FROM hive.default_marts.mart_identity_map m
+        JOIN marketing.public.leads l ON m.lead_id = l.lead_id
     ) la ON fo.customer_id = la.customer_id
     WHERE o.order_date <= fo.first_order_date + INTERVAL '90' DAY
     GROUP BY 1, 2
@@ -228,6 +235,25 @@ SELECT
 FROM customer_cohorts
 ORDER BY cohort_month DESC, total_revenue DESC;
 
+-- ----------------------------------------------------------------------------
+-- 7. DATA LAKE - Generated test data (examples/generate_test_csvs.py)
+-- ----------------------------------------------------------------------------
+
+-- Lead-to-Order Funnel on the lake tables
+-- Leads, customers and orders share one key space: --lead-match-rate sets the
+-- share of leads whose email matches a customer, so the join fan-out is known
+SELECT 
+    l.lead_source,
+    COUNT(DISTINCT l.lead_id) as total_leads,
+    COUNT(DISTINCT c.customer_id) as matched_customers,
+    COUNT(s.order_id) as orders,
+    ROUND(SUM(s.total_amount), 2) as revenue
+FROM hive.marketing_data.marketing_leads_csv l
+LEFT JOIN hive.raw_data.customers_data_csv c ON l.email = c.email
+LEFT JOIN hive.raw_data.sales_data_csv s ON c.customer_id = s.customer_id
+GROUP BY l.lead_source
+ORDER BY revenue DESC NULLS LAST;
+
 -- ============================================================================
 -- HOW TO USE IN JUPYTERHUB
 -- ============================================================================
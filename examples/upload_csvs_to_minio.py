@@ -1,113 +1,401 @@
 #!/usr/bin/env python3
 """
 Script pour uploader automatiquement les CSV de test vers MinIO
+
+Les fichiers sont envoyés par l'API S3 du service minio (et non plus par
+kubectl cp dans le pod) : un pool de connexions HTTP partagé, plusieurs
+fichiers en parallèle et, pour chaque fichier, un upload multipart avec
+plusieurs parts en vol. Les CSV <dataset>.csv et les dossiers partitionnés
+<dataset>/dt=YYYY-MM-DD/ produits par generate_test_csvs.py sont rangés
+dans le bucket du dataset (LAKE_TABLES), sous les clés lues par les tables
+Hive.
+
+Un manifeste local (.upload_manifest.json dans le dossier source) garde,
+par objet, taille, mtime, MD5 de chaque part et ETag distant. Un fichier
+dont l'objet distant a déjà l'ETag attendu est ignoré ; pour un gros
+fichier modifié, seules les parts qui ont changé sont renvoyées, les autres
+sont copiées côté serveur depuis l'objet existant (UploadPartCopy).
+
+Les uploads multipart sont repris après interruption : l'upload_id et les
+parts terminées sont notés dans .upload_checkpoint.json, et un nouveau
+lancement repart de la première part manquante. Chaque part est relancée
+avec backoff exponentiel (--retries) sans recommencer le fichier.
+
+Avec --convert, les CSV passent d'abord par csv_to_parquet.py : c'est le
+Parquet typé et compressé (dossier --lake-dir) qui est uploadé, lu ensuite
+par les tables créées avec setup_hive_schemas.py --format parquet.
+
+La vérification (--verify-only pour la lancer seule) liste les buckets par
+ListObjectsV2 paginé et, avec --head, interroge chaque objet par HEAD
+concurrents ; tailles et ETag sont comparés au manifeste (--report).
+
+    python examples/upload_csvs_to_minio.py --part-size 32 --concurrency 8
 """
 
-import subprocess
+import argparse
+import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from minio_s3 import (DEFAULT_ENDPOINT, DEFAULT_PART_SIZE, DEFAULT_PARTS_IN_FLIGHT, DEFAULT_RETRIES, MIN_PART_SIZE,
+                      UploadCheckpoint, boto3, ensure_bucket, expected_etag, get_client, head_object,
+                      list_objects, part_md5s, remote_etag, upload_file)
+from setup_hive_schemas import LAKE_TABLES, register_partitions
+from csv_to_parquet import convert_all
+
+BUCKETS = ['raw-data', 'marketing-data', 'web-data', 'financial-data', 'test-data']
+MANIFEST_FILENAME = '.upload_manifest.json'
+CHECKPOINT_FILENAME = '.upload_checkpoint.json'
+# Le manifeste est réécrit tous les N fichiers ou toutes les T secondes, et en fin d'upload
+MANIFEST_SAVE_FILES = 500
+MANIFEST_SAVE_SECONDS = 10
 
-def run_command(cmd, check=True):
-    """Exécute une commande et retourne le résultat"""
-    print(f"🔨 {cmd}")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    
-    if check and result.returncode != 0:
-        print(f"❌ Erreur: {result.stderr}")
-        return False
-    
-    if result.stdout:
-        print(result.stdout)
-    return True
-
-def create_buckets():
+
+def create_buckets(client):
     """Crée les buckets nécessaires dans MinIO"""
     print("📦 Création des buckets MinIO...")
-    
-    buckets = ['raw-data', 'marketing-data', 'web-data', 'financial-data', 'test-data']
-    
-    for bucket in buckets:
+
+    for bucket in BUCKETS:
         print(f"   Création du bucket: {bucket}")
-        # Créer le bucket en utilisant kubectl exec
-        cmd = f"kubectl exec -n data-platform deployment/minio -- mkdir -p /data/{bucket}"
-        run_command(cmd, check=False)
-
-def upload_csvs():
-    """Upload les CSV vers MinIO"""
-    print("\n📤 Upload des CSV vers MinIO...")
-    
-    csv_files = [
-        ('sales_data.csv', 'raw-data'),
-        ('customers_data.csv', 'raw-data'),
-        ('marketing_campaigns.csv', 'marketing-data'),
-        ('website_traffic.csv', 'web-data'),
-        ('financial_data.csv', 'financial-data')
-    ]
-    
-    for csv_file, bucket in csv_files:
-        if os.path.exists(f"examples/{csv_file}"):
-            print(f"   Upload de {csv_file} vers {bucket}...")
-            cmd = f"kubectl cp examples/{csv_file} data-platform/minio-0:/data/{bucket}/{csv_file}"
-            if run_command(cmd, check=False):
-                print(f"   ✅ {csv_file} uploadé avec succès")
-            else:
-                print(f"   ⚠️  Échec de l'upload de {csv_file}")
-        else:
-            print(f"   ❌ Fichier {csv_file} non trouvé")
+        ensure_bucket(client, bucket)
+
+
+def collect_files(source_dir):
+    """Liste les fichiers à uploader : (chemin local, bucket, clé, taille)"""
+    files = []
+    for table, spec in LAKE_TABLES.items():
+        csv_path = os.path.join(source_dir, f"{table}.csv")
+        if os.path.isfile(csv_path):
+            files.append((csv_path, spec['bucket'], f"{table}.csv", os.path.getsize(csv_path)))
+
+        # Dossier partitionné <table>/dt=YYYY-MM-DD/part-*.<format>
+        table_dir = os.path.join(source_dir, table)
+        for root, _, names in sorted(os.walk(table_dir)):
+            for filename in sorted(names):
+                path = os.path.join(root, filename)
+                key = os.path.relpath(path, source_dir).replace(os.sep, '/')
+                files.append((path, spec['bucket'], key, os.path.getsize(path)))
+    return files
+
+
+def load_manifest(source_dir):
+    """Charge le manifeste des objets uploadés (vide s'il n'existe pas)"""
+    try:
+        with open(os.path.join(source_dir, MANIFEST_FILENAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(source_dir, manifest):
+    """Enregistre le manifeste de façon atomique"""
+    path = os.path.join(source_dir, MANIFEST_FILENAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def sync_file(client, path, bucket, key, part_size, concurrency, entry, checkpoint, retries):
+    """Met l'objet bucket/key à jour depuis path en n'envoyant que ce qui a changé.
+
+    entry est l'entrée de manifeste du dernier upload (ou None). Retourne
+    (nouvelle entrée, octets envoyés, parts copiées côté serveur) ; None
+    comme octets envoyés si l'objet distant était déjà à jour.
+    """
+    stat = os.stat(path)
+    # Taille et mtime inchangés : les MD5 du manifeste sont réutilisés sans relire le fichier
+    if entry and (entry['size'], entry['mtime_ns'], entry['part_size']) == (stat.st_size, stat.st_mtime_ns, part_size):
+        md5s = entry['md5s']
+    else:
+        md5s = part_md5s(path, part_size)
+    etag = expected_etag(md5s, stat.st_size, part_size)
+    new_entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'part_size': part_size,
+                 'md5s': md5s, 'etag': etag}
+
+    current = remote_etag(client, bucket, key)
+    if current == etag:
+        return new_entry, None, 0
+
+    # L'objet distant est celui du dernier upload : ses parts identiques sont réutilisables
+    copy_parts = set()
+    if entry and current is not None and current == entry['etag'] and entry['part_size'] == part_size \
+            and stat.st_size >= part_size and '-' in current:
+        copy_parts = {number for number, (old, new) in enumerate(zip(entry['md5s'], md5s), start=1) if old == new}
+    if checkpoint.get(bucket, key):
+        print(f"   🔁 {bucket}/{key}: reprise de l'upload interrompu")
+    sent, new_entry['etag'] = upload_file(client, path, bucket, key, part_size, concurrency,
+                                          copy_parts, copy_if_match=current, checkpoint=checkpoint, retries=retries)
+    return new_entry, sent, len(copy_parts)
+
+
+def upload_csvs(client, files, part_size, concurrency, parallel_files, source_dir, retries=DEFAULT_RETRIES):
+    """Upload vers MinIO, en parallèle, les fichiers modifiés depuis le dernier upload.
+
+    Retourne (octets envoyés, secondes, clés effectivement uploadées).
+    """
+    print(f"\n📤 Upload de {len(files)} fichier(s) vers MinIO "
+          f"(parts de {part_size // (1024 * 1024)} Mo, {concurrency} parts en vol, "
+          f"{parallel_files} fichiers en parallèle)...")
+
+    manifest = load_manifest(source_dir)
+    manifest_lock = threading.Lock()
+    # Fichiers synchronisés depuis la dernière écriture du manifeste, et date de cette écriture
+    unsaved = {'files': 0, 'at': time.time()}
+    checkpoint = UploadCheckpoint(os.path.join(source_dir, CHECKPOINT_FILENAME))
+
+    def upload(path, bucket, key):
+        started = time.time()
+        entry, sent, copied = sync_file(client, path, bucket, key, part_size, concurrency,
+                                        manifest.get(f"{bucket}/{key}"), checkpoint, retries)
+        # Réécrire le manifeste à chaque fichier rendrait l'upload quadratique : écriture par lots.
+        # Une interruption ne perd que les entrées du dernier lot, revérifiées par ETag à la reprise
+        with manifest_lock:
+            manifest[f"{bucket}/{key}"] = entry
+            unsaved['files'] += 1
+            if unsaved['files'] >= MANIFEST_SAVE_FILES or time.time() - unsaved['at'] >= MANIFEST_SAVE_SECONDS:
+                save_manifest(source_dir, manifest)
+                unsaved.update(files=0, at=time.time())
+        return sent, copied, time.time() - started
+
+    started = time.time()
+    total_bytes, skipped, failures, uploaded = 0, 0, 0, []
+    try:
+        with ThreadPoolExecutor(max_workers=parallel_files) as pool:
+            futures = {pool.submit(upload, path, bucket, key): (bucket, key) for path, bucket, key, _ in files}
+            for future in as_completed(futures):
+                bucket, key = futures[future]
+                try:
+                    sent, copied, elapsed = future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"   ⚠️  Échec de l'upload de {bucket}/{key}: {e}")
+                    continue
+                if sent is None:
+                    skipped += 1
+                    continue
+                total_bytes += sent
+                uploaded.append(key)
+                reused = f", {copied} part(s) inchangée(s) copiée(s) côté serveur" if copied else ""
+                print(f"   ✅ {bucket}/{key}: {sent / 1024 / 1024:.1f} Mo en {elapsed:.2f}s "
+                      f"({sent / 1024 / 1024 / max(elapsed, 1e-6):.1f} Mo/s{reused})")
+    finally:
+        with manifest_lock:
+            save_manifest(source_dir, manifest)
+
+    elapsed = time.time() - started
+    if skipped:
+        print(f"   ⏭️  {skipped} fichier(s) inchangé(s) ignoré(s)")
+    print(f"\n📈 Total: {total_bytes / 1024 / 1024:.1f} Mo en {elapsed:.2f}s "
+          f"({total_bytes / 1024 / 1024 / max(elapsed, 1e-6):.1f} Mo/s agrégés)")
+    if failures:
+        print(f"   ⚠️  {failures} fichier(s) en échec")
+    return total_bytes, elapsed, uploaded
 
-def verify_upload():
-    """Vérifie que les fichiers ont été uploadés"""
+
+def register_new_partitions(keys):
+    """Déclare au metastore les partitions dt= des fichiers colonnaires qui viennent d'être uploadés"""
+    days = {}
+    for key in keys:
+        table, _, rest = key.partition('/')
+        directory = rest.split('/')[0]
+        if table in LAKE_TABLES and directory.startswith('dt=') and key.endswith(('.parquet', '.orc')):
+            days.setdefault(table, set()).add(directory[len('dt='):])
+    if days:
+        print("\n🗂️  Enregistrement des nouvelles partitions Hive...")
+    for table, table_days in days.items():
+        register_partitions(table, table_days)
+
+
+def verify_upload(client, manifest, workers=16, head=False, report_path=None):
+    """Vérifie par l'API S3 que les objets du manifeste sont dans MinIO.
+
+    Les buckets sont listés en parallèle (ListObjectsV2 paginé, 1000 clés
+    par requête) ; avec head, chaque objet attendu est en plus interrogé
+    par des HEAD concurrents. Tailles et ETag (MD5 des parts) sont comparés
+    au manifeste. Retourne le rapport, écrit en JSON dans report_path.
+    """
     print("\n🔍 Vérification de l'upload...")
-    
-    cmd = "kubectl exec -n data-platform deployment/minio -- find /data -name '*.csv' -type f"
-    run_command(cmd, check=False)
+    started = time.time()
+
+    expected = {}
+    for name, entry in manifest.items():
+        bucket, key = name.split('/', 1)
+        expected.setdefault(bucket, {})[key] = (entry['size'], entry['etag'])
+    buckets = sorted(set(expected) | {spec['bucket'] for spec in LAKE_TABLES.values()})
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        listings = dict(zip(buckets, pool.map(lambda bucket: list_objects(client, bucket), buckets)))
+        if head:
+            targets = [(bucket, key) for bucket, keys in expected.items() for key in keys]
+            heads = dict(zip(targets, pool.map(lambda target: head_object(client, *target), targets)))
+
+    report = {'buckets': {}, 'problems': []}
+    for bucket in buckets:
+        listing = listings[bucket]
+        counts = {'ok': 0, 'missing': 0, 'size_mismatch': 0, 'etag_mismatch': 0, 'unexpected': 0}
+        for key, (size, etag) in sorted(expected.get(bucket, {}).items()):
+            actual = heads[(bucket, key)] if head else listing.get(key)
+            if actual is None:
+                status = 'missing'
+            elif actual[0] != size:
+                status = 'size_mismatch'
+            elif actual[1] != etag:
+                status = 'etag_mismatch'
+            else:
+                status = 'ok'
+            counts[status] += 1
+            if status != 'ok':
+                report['problems'].append({'bucket': bucket, 'key': key, 'status': status,
+                                           'expected': [size, etag], 'actual': actual})
+        # Objets absents du manifeste dans un dossier de dataset uploadé (anciens part-* par exemple)
+        uploaded_dirs = {key.split('/')[0] for key in expected.get(bucket, {}) if '/' in key}
+        for key in sorted(listing):
+            if key.split('/')[0] in uploaded_dirs and '/' in key and key not in expected[bucket]:
+                counts['unexpected'] += 1
+                report['problems'].append({'bucket': bucket, 'key': key, 'status': 'unexpected',
+                                           'expected': None, 'actual': listing[key]})
+        n_bytes = sum(size for size, _ in listing.values())
+        report['buckets'][bucket] = dict(counts, objects=len(listing), bytes=n_bytes)
+        print(f"   {bucket}: {len(listing)} objet(s), {n_bytes / 1024 / 1024:.1f} Mo — "
+              f"{counts['ok']} ok, {counts['missing']} manquant(s), "
+              f"{counts['size_mismatch'] + counts['etag_mismatch']} différent(s), "
+              f"{counts['unexpected']} hors manifeste")
+
+    report['elapsed_s'] = round(time.time() - started, 3)
+    report['problems'].sort(key=lambda problem: problem['status'] == 'unexpected')
+    for problem in report['problems'][:10]:
+        print(f"   ⚠️  {problem['bucket']}/{problem['key']}: {problem['status']}")
+    if len(report['problems']) > 10:
+        print(f"   ... et {len(report['problems']) - 10} autre(s)")
+    print(f"   {'✅' if not report['problems'] else '⚠️ '} Vérification en {report['elapsed_s']:.2f}s "
+          f"({'HEAD + ' if head else ''}ListObjectsV2, {len(manifest)} objet(s) attendu(s))")
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"   📄 Rapport: {report_path}")
+    return report
+
+
+def parse_args():
+    """Options de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Upload des CSV de test vers MinIO par l'API S3")
+    parser.add_argument('--source-dir', default='examples',
+                        help="Dossier des fichiers générés (défaut: examples)")
+    parser.add_argument('--endpoint', default=DEFAULT_ENDPOINT,
+                        help=f"Endpoint S3 de MinIO (défaut: {DEFAULT_ENDPOINT})")
+    parser.add_argument('--part-size', type=int, default=DEFAULT_PART_SIZE // (1024 * 1024),
+                        help=f"Taille des parts en Mo, minimum {MIN_PART_SIZE // (1024 * 1024)} "
+                             f"(défaut: {DEFAULT_PART_SIZE // (1024 * 1024)})")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_PARTS_IN_FLIGHT,
+                        help=f"Parts envoyées en parallèle par fichier (défaut: {DEFAULT_PARTS_IN_FLIGHT})")
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help=f"Tentatives supplémentaires par part en cas d'erreur (défaut: {DEFAULT_RETRIES})")
+    parser.add_argument('--parallel-files', type=int, default=2,
+                        help="Fichiers uploadés en parallèle (défaut: 2)")
+    parser.add_argument('--convert', action='store_true',
+                        help="Convertit les CSV en Parquet partitionné avant l'upload (c'est le Parquet qui est uploadé)")
+    parser.add_argument('--lake-dir', help="Dossier du Parquet converti (défaut: <source-dir>/lake)")
+    parser.add_argument('--compression', choices=['snappy', 'zstd'], default='zstd',
+                        help="Compression du Parquet converti (défaut: zstd)")
+    parser.add_argument('--no-register', action='store_true',
+                        help="Ne pas enregistrer les nouvelles partitions dt= dans le metastore Hive")
+    parser.add_argument('--verify-only', action='store_true',
+                        help="Vérifie les objets du manifeste dans MinIO sans rien uploader")
+    parser.add_argument('--head', action='store_true',
+                        help="Vérifie aussi chaque objet par HEAD (en plus du listing)")
+    parser.add_argument('--verify-workers', type=int, default=16,
+                        help="Requêtes de vérification concurrentes (défaut: 16)")
+    parser.add_argument('--report', help="Écrit le rapport de vérification en JSON dans ce fichier")
+    args = parser.parse_args()
+
+    if args.part_size * 1024 * 1024 < MIN_PART_SIZE:
+        parser.error(f"--part-size doit valoir au moins {MIN_PART_SIZE // (1024 * 1024)} Mo")
+    if args.concurrency < 1 or args.parallel_files < 1:
+        parser.error("--concurrency et --parallel-files doivent valoir au moins 1")
+    if args.lake_dir is None:
+        args.lake_dir = os.path.join(args.source_dir, 'lake')
+    return args
+
 
 def main():
     """Fonction principale"""
+    args = parse_args()
+
     print("🚀 UPLOAD DES CSV VERS MINIO")
     print("=" * 50)
-    
+
+    if boto3 is None:
+        print("❌ boto3 est requis: pip install boto3")
+        return
+
+    if args.convert:
+        # Étape de transformation : le Parquet remplace les CSV pour la suite (upload, manifeste)
+        if not args.verify_only and not convert_all(args.source_dir, args.lake_dir, args.compression):
+            print(f"❌ Aucun CSV à convertir dans {args.source_dir}/")
+            return
+        args.source_dir = args.lake_dir
+
+    if args.verify_only:
+        client = get_client(args.endpoint, args.verify_workers)
+        manifest = load_manifest(args.source_dir)
+        if not manifest:
+            print(f"❌ Aucun manifeste dans {args.source_dir}/: rien à vérifier")
+            return
+        verify_upload(client, manifest, args.verify_workers, args.head, args.report)
+        return
+
     # Vérifier que les CSV existent
-    csv_files = ['sales_data.csv', 'customers_data.csv', 'marketing_campaigns.csv', 
-                 'website_traffic.csv', 'financial_data.csv']
-    
-    missing_files = []
-    for csv_file in csv_files:
-        if not os.path.exists(f"examples/{csv_file}"):
-            missing_files.append(csv_file)
-    
-    if missing_files:
-        print("❌ Fichiers CSV manquants:")
-        for file in missing_files:
-            print(f"   - {file}")
+    files = collect_files(args.source_dir)
+    uploaded_tables = {key.split('/')[0].removesuffix('.csv') for _, _, key, _ in files}
+    missing_tables = [table for table in LAKE_TABLES if table not in uploaded_tables]
+
+    if not files:
+        print(f"❌ Aucun fichier généré dans {args.source_dir}/")
         print("\n💡 Exécutez d'abord: python examples/generate_test_csvs.py")
         return
-    
+    if missing_tables:
+        print("⚠️  Datasets manquants (ignorés):")
+        for table in missing_tables:
+            print(f"   - {table}")
+
+    # Un seul client : son pool de connexions sert tous les fichiers et toutes les parts
+    client = get_client(args.endpoint, max(args.concurrency * args.parallel_files, args.verify_workers))
+
     # Créer les buckets
-    create_buckets()
-    
+    create_buckets(client)
+
     # Upload les CSV
-    upload_csvs()
-    
+    _, _, uploaded = upload_csvs(client, files, args.part_size * 1024 * 1024, args.concurrency,
+                                 args.parallel_files, args.source_dir, args.retries)
+
+    # Déclarer au metastore les partitions qui viennent d'arriver
+    if not args.no_register:
+        register_new_partitions(uploaded)
+
     # Vérifier l'upload
-    verify_upload()
-    
+    verify_upload(client, load_manifest(args.source_dir), args.verify_workers, args.head, args.report)
+
     print("\n✅ UPLOAD TERMINÉ!")
     print("=" * 50)
     print("🌐 Vérifiez dans MinIO Console:")
     print("   http://localhost:30901/browser/datalake")
     print("   Login: minioadmin / minioadmin")
-    
+
     print("\n📋 BUCKETS CRÉÉS:")
     print("   📊 raw-data/ - Données de ventes et clients")
-    print("   📢 marketing-data/ - Campagnes marketing")
+    print("   📢 marketing-data/ - Campagnes et leads marketing")
     print("   🌐 web-data/ - Trafic web")
     print("   💰 financial-data/ - Données financières")
-    
+
+    suffix = '' if args.convert else '_csv'
     print("\n🔍 REQUÊTES TRINO POUR TESTER:")
-    print("   SELECT * FROM hive.raw_data.sales_data_csv LIMIT 5;")
-    print("   SELECT * FROM hive.raw_data.customers_data_csv LIMIT 5;")
-    print("   SELECT * FROM hive.marketing_data.marketing_campaigns_csv LIMIT 5;")
+    if args.convert:
+        print("   (après: python examples/setup_hive_schemas.py --format parquet)")
+    print(f"   SELECT * FROM hive.raw_data.sales_data{suffix} LIMIT 5;")
+    print(f"   SELECT * FROM hive.raw_data.customers_data{suffix} LIMIT 5;")
+    print(f"   SELECT * FROM hive.marketing_data.marketing_campaigns{suffix} LIMIT 5;")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+DataMeesh - Bulk Sample Data Generators
+Vectorized row generators for the Sales and Marketing domain tables
+
+Each generator builds a chunk of rows [start, start + n) of one table with
+NumPy and returns it as a DataFrame whose columns match the table. IDs are
+explicit (1..N), so foreign keys are drawn arithmetically from the parent
+table's ID range instead of being looked up in the database. Chunks are
+seeded from (seed, table, start): the same scale and seed always produce
+the same data, whatever the chunk size.
+
+The same tables can also be generated inside PostgreSQL (insert_sql):
+one INSERT ... SELECT over generate_series per table, with the same
+vocabularies and ID arithmetic, so no row crosses the network.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Rows per table at --scale 1; each table scales linearly
+BASE_ROWS = {
+    'customers': 10_000,
+    'products': 200,
+    'orders': 100_000,
+    'order_items': 250_000,
+    'campaigns': 100,
+    'leads': 50_000,
+    'campaign_metrics': 9_000,
+    'website_traffic': 100_000,
+}
+
+# Small reference tables keep a fixed size
+FIXED_ROWS = {'products', 'campaigns'}
+
+BASE_DATE = np.datetime64('2024-01-01T00:00:00', 's')
+DAYS = 365
+
+COUNTRIES = np.array(['USA', 'UK', 'Germany', 'France', 'Australia', 'Canada', 'Japan', 'Brazil'])
+REGIONS_BY_COUNTRY = np.array(['North America', 'Europe', 'Europe', 'Europe', 'APAC', 'North America',
+                               'APAC', 'LATAM'])
+INDUSTRIES = np.array(['Technology', 'Manufacturing', 'Analytics', 'Retail', 'Logistics', 'Healthcare',
+                       'Finance', 'Energy', 'Consulting', 'Education', 'Insurance'])
+COMPANY_SIZES = np.array(['Small', 'Medium', 'Large', 'Enterprise'])
+COMPANY_WORDS = np.array(['Acme', 'Global', 'Smart', 'Data', 'Digital', 'Alpha', 'Beta', 'Gamma', 'Delta',
+                          'Epsilon', 'Future', 'Zeta', 'Theta', 'Iota', 'Nova', 'Apex'])
+COMPANY_SUFFIXES = np.array(['Corporation', 'Tech Solutions', 'Systems', 'Inc', 'Dynamics', 'Retailers',
+                             'Logistics', 'Healthcare', 'Finance', 'Energy', 'Consulting', 'Group'])
+PRODUCT_CATEGORIES = np.array(['Software', 'Service', 'Hardware', 'Support'])
+PRODUCT_WORDS = np.array(['Analytics Platform', 'Integration Suite', 'Cloud Storage', 'BI Dashboard',
+                          'ML Toolkit', 'API Gateway', 'Monitoring System', 'Visualization Pro',
+                          'Security Suite', 'Customer Platform'])
+ORDER_STATUSES = np.array(['Completed', 'Pending', 'Shipped', 'Cancelled'])
+PAYMENT_METHODS = np.array(['Credit Card', 'Wire Transfer', 'PayPal', 'Invoice'])
+FIRST_NAMES = np.array(['Alice', 'Bob', 'Carol', 'David', 'Eva', 'Frank', 'Grace', 'Henry', 'Ivy', 'Jack',
+                        'Kate', 'Liam', 'Mia', 'Noah', 'Olivia', 'Paul', 'Quinn', 'Rachel', 'Sam', 'Tina'])
+LAST_NAMES = np.array(['Johnson', 'Smith', 'Davis', 'Wilson', 'Brown', 'Jones', 'Garcia', 'Miller',
+                       'Martinez', 'Anderson', 'Taylor', 'Thomas', 'Moore', 'Martin', 'Lee', 'White'])
+JOB_TITLES = np.array(['CEO', 'CTO', 'VP Engineering', 'Director of Analytics', 'Data Scientist'])
+LEAD_SOURCES = np.array(['Website', 'Referral', 'Campaign', 'Partner'])
+LEAD_STAGES = np.array(['New', 'Qualified', 'Contacted', 'Converted', 'Lost'])
+CAMPAIGN_TYPES = np.array(['Awareness', 'Acquisition', 'Retention', 'Upsell'])
+CAMPAIGN_STATUSES = np.array(['Active', 'Completed', 'Paused', 'Planned'])
+CHANNELS = np.array(['Email', 'Social Media', 'Webinar', 'Partner', 'Content', 'Event', 'Display', 'Search'])
+AUDIENCES = np.array(['Enterprise', 'SMB', 'Partners', 'All', 'Leads', 'Website Visitors'])
+REFERRAL_SOURCES = np.array(['Google', 'LinkedIn', 'Direct', 'Twitter'])
+
+TABLE_INDEX = {table: i for i, table in enumerate(BASE_ROWS)}
+
+
+def scaled_rows(scale):
+    """Row count of every table at the given scale"""
+    return {table: base if table in FIXED_ROWS else max(1, int(round(base * scale)))
+            for table, base in BASE_ROWS.items()}
+
+
+def chunk_rng(seed, table, start):
+    """Random generator of one chunk, derived from its position only"""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(TABLE_INDEX[table], start)))
+
+
+def join(*parts):
+    """Element-wise string concatenation of arrays and scalars"""
+    result = np.asarray(parts[0]).astype(str)
+    for part in parts[1:]:
+        result = np.char.add(result, np.asarray(part).astype(str))
+    return result
+
+
+def random_times(rng, n, days=DAYS):
+    """n timestamps spread over the sample year"""
+    return BASE_DATE + rng.integers(0, days * 86400, n).astype('timedelta64[s]')
+
+
+def money(values):
+    """Round to cents"""
+    return np.round(values, 2)
+
+
+def gen_customers(rng, ids, rows):
+    n = len(ids)
+    created = random_times(rng, n)
+    return pd.DataFrame({
+        'customer_id': ids,
+        'customer_name': join(COMPANY_WORDS[ids % len(COMPANY_WORDS)], ' ',
+                              COMPANY_SUFFIXES[(ids // len(COMPANY_WORDS)) % len(COMPANY_SUFFIXES)], ' ', ids),
+        'email': join('contact', ids, '@customer', ids % 97, '.com'),
+        'phone': join('+1-555-', np.char.zfill((ids % 10000).astype(str), 4)),
+        # Country is a function of the ID so orders can derive the region without a lookup
+        'country': COUNTRIES[ids % len(COUNTRIES)],
+        'industry': INDUSTRIES[rng.integers(0, len(INDUSTRIES), n)],
+        'company_size': COMPANY_SIZES[rng.integers(0, len(COMPANY_SIZES), n)],
+        'created_at': created,
+        'updated_at': created,
+    })
+
+
+def gen_products(rng, ids, rows):
+    n = len(ids)
+    return pd.DataFrame({
+        'product_id': ids,
+        'product_name': join(PRODUCT_WORDS[ids % len(PRODUCT_WORDS)], ' v', ids),
+        'category': PRODUCT_CATEGORIES[rng.integers(0, len(PRODUCT_CATEGORIES), n)],
+        'price': money(rng.uniform(99, 59999, n)),
+        'stock_quantity': rng.integers(10, 1000, n),
+        'description': join('Sample product ', ids),
+    })
+
+
+def gen_orders(rng, ids, rows):
+    n = len(ids)
+    customer_id = rng.integers(1, rows['customers'] + 1, n)
+    return pd.DataFrame({
+        'order_id': ids,
+        'customer_id': customer_id,
+        'order_date': random_times(rng, n),
+        'order_status': ORDER_STATUSES[rng.choice(len(ORDER_STATUSES), n, p=[0.7, 0.15, 0.1, 0.05])],
+        'total_amount': money(rng.uniform(100, 100000, n)),
+        'payment_method': PAYMENT_METHODS[rng.integers(0, len(PAYMENT_METHODS), n)],
+        'sales_rep': join('Sales Rep ', rng.integers(1, 21, n)),
+        'region': REGIONS_BY_COUNTRY[customer_id % len(COUNTRIES)],
+    })
+
+
+def gen_order_items(rng, ids, rows):
+    n = len(ids)
+    # Items spread evenly over orders: order_item i belongs to order (i - 1) % n_orders + 1
+    order_id = (ids - 1) % rows['orders'] + 1
+    return pd.DataFrame({
+        'order_item_id': ids,
+        'order_id': order_id,
+        'product_id': rng.integers(1, rows['products'] + 1, n),
+        'quantity': rng.integers(1, 6, n),
+        'unit_price': money(rng.uniform(99, 59999, n)),
+        'discount': money(rng.choice([0.0, 0.05, 0.1, 0.15, 0.2], n)),
+        # Explicit, on the sample clock: the --incremental watermark of order_items must
+        # not default to the load time. Items of an order share one time, by order ID
+        'created_at': BASE_DATE + ((order_id - 1) * (DAYS * 86400) // rows['orders']).astype('timedelta64[s]'),
+    })
+
+
+def gen_campaigns(rng, ids, rows):
+    n = len(ids)
+    start = BASE_DATE.astype('datetime64[D]') + rng.integers(0, DAYS - 30, n)
+    return pd.DataFrame({
+        'campaign_id': ids,
+        'campaign_name': join(CHANNELS[ids % len(CHANNELS)], ' Campaign ', ids),
+        'campaign_type': CAMPAIGN_TYPES[rng.integers(0, len(CAMPAIGN_TYPES), n)],
+        'start_date': start,
+        'end_date': start + rng.integers(14, 120, n),
+        'budget': money(rng.uniform(5000, 150000, n)),
+        'status': CAMPAIGN_STATUSES[rng.integers(0, len(CAMPAIGN_STATUSES), n)],
+        'channel': CHANNELS[ids % len(CHANNELS)],
+        'target_audience': AUDIENCES[rng.integers(0, len(AUDIENCES), n)],
+    })
+
+
+def gen_leads(rng, ids, rows):
+    n = len(ids)
+    first = FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), n)]
+    last = LAST_NAMES[rng.integers(0, len(LAST_NAMES), n)]
+    return pd.DataFrame({
+        'lead_id': ids,
+        'first_name': first,
+        'last_name': last,
+        'email': join(np.char.lower(first), '.', np.char.lower(last), '.', ids, '@company', ids % 50, '.com'),
+        'phone': join('+1-555-', np.char.zfill((ids % 10000).astype(str), 4)),
+        'company': join('Company ', ids % 500),
+        'job_title': JOB_TITLES[rng.integers(0, len(JOB_TITLES), n)],
+        'lead_source': LEAD_SOURCES[rng.integers(0, len(LEAD_SOURCES), n)],
+        'lead_stage': LEAD_STAGES[rng.integers(0, len(LEAD_STAGES), n)],
+        'campaign_id': rng.integers(1, rows['campaigns'] + 1, n),
+        'created_at': random_times(rng, n),
+    })
+
+
+def gen_campaign_metrics(rng, ids, rows):
+    n = len(ids)
+    impressions = rng.integers(1000, 50000, n)
+    clicks = (impressions * rng.uniform(0.005, 0.08, n)).astype(np.int64)
+    conversions = (clicks * rng.uniform(0.01, 0.2, n)).astype(np.int64)
+    cost = money(clicks * rng.uniform(0.5, 5.0, n))
+    return pd.DataFrame({
+        'metric_id': ids,
+        # One row per (campaign, day): metric i is day (i - 1) // n_campaigns of campaign (i - 1) % n_campaigns + 1
+        'campaign_id': (ids - 1) % rows['campaigns'] + 1,
+        'metric_date': BASE_DATE.astype('datetime64[D]') + ((ids - 1) // rows['campaigns']) % DAYS,
+        'impressions': impressions,
+        'clicks': clicks,
+        'conversions': conversions,
+        'cost': cost,
+        'revenue': money(conversions * rng.uniform(50, 500, n)),
+    })
+
+
+def gen_website_traffic(rng, ids, rows):
+    n = len(ids)
+    page_views = rng.integers(100, 1100, n)
+    return pd.DataFrame({
+        'traffic_id': ids,
+        'traffic_date': BASE_DATE.astype('datetime64[D]') + rng.integers(0, DAYS, n),
+        'page_url': join('/page', rng.integers(1, 51, n)),
+        'page_views': page_views,
+        'unique_visitors': (page_views * rng.uniform(0.3, 0.9, n)).astype(np.int64),
+        'bounce_rate': money(rng.uniform(20, 70, n)),
+        'avg_time_on_page': rng.integers(30, 330, n),
+        'referral_source': REFERRAL_SOURCES[rng.integers(0, len(REFERRAL_SOURCES), n)],
+    })
+
+
+GENERATORS = {
+    'customers': gen_customers,
+    'products': gen_products,
+    'orders': gen_orders,
+    'order_items': gen_order_items,
+    'campaigns': gen_campaigns,
+    'leads': gen_leads,
+    'campaign_metrics': gen_campaign_metrics,
+    'website_traffic': gen_website_traffic,
+}
+
+
+def generate_chunks(table, rows, seed=42, chunk_size=100_000):
+    """Yield the rows of a table as DataFrames of at most chunk_size rows"""
+    for start in range(0, rows[table], chunk_size):
+        ids = np.arange(start + 1, min(start + chunk_size, rows[table]) + 1)
+        yield GENERATORS[table](chunk_rng(seed, table, start), ids, rows)
+
+
+def generate_delta(table, rows, first_id, n_rows, column, start, days, seed=42, chunk_size=100_000):
+    """Yield n_rows new rows of a table as DataFrames, IDs from first_id.
+
+    The watermark column is stamped within [start, start + days): the rows
+    of an incremental load. Foreign keys range over rows, the parents'
+    current ID counts, so they may point at rows of the same delta.
+    """
+    start = np.datetime64(start, 's')
+    for offset in range(0, n_rows, chunk_size):
+        ids = np.arange(first_id + offset, first_id + min(offset + chunk_size, n_rows))
+        rng = chunk_rng(seed, table, int(ids[0]))
+        df = GENERATORS[table](rng, ids, rows)
+        df[column] = start + rng.integers(0, days * 86400, len(ids)).astype('timedelta64[s]')
+        yield df
+
+
+# --- Server-side generation (INSERT ... SELECT FROM generate_series) ---
+
+
+def sql_pick(values, index=None):
+    """SQL expression picking one of values, at random or at the 0-based index expression"""
+    items = ', '.join("'" + str(v).replace("'", "''") + "'" if isinstance(v, str) else repr(v)
+                      for v in np.asarray(values).tolist())
+    if index is None:
+        index = f"floor(random() * {len(values)})::int"
+    return f"(ARRAY[{items}])[1 + {index}]"
+
+
+def sql_int(low, high):
+    """Random integer in [low, high)"""
+    return f"({low} + floor(random() * {high - low})::int)"
+
+
+def sql_money(low, high):
+    """Random amount in [low, high), rounded to cents"""
+    return f"round(({low} + random() * {high - low})::numeric, 2)"
+
+
+SQL_TIME = f"(TIMESTAMP '{str(BASE_DATE).replace('T', ' ')}' + floor(random() * {DAYS * 86400}) * INTERVAL '1 second')"
+SQL_DAY = f"DATE '{BASE_DATE.astype('datetime64[D]')}'"
+
+
+def sql_customers(rows):
+    return f"""
+INSERT INTO customers (customer_id, customer_name, email, phone, country, industry, company_size,
+                       created_at, updated_at)
+SELECT i,
+       {sql_pick(COMPANY_WORDS, f'i % {len(COMPANY_WORDS)}')} || ' '
+           || {sql_pick(COMPANY_SUFFIXES, f'(i / {len(COMPANY_WORDS)}) % {len(COMPANY_SUFFIXES)}')} || ' ' || i,
+       'contact' || i || '@customer' || i % 97 || '.com',
+       '+1-555-' || lpad((i % 10000)::text, 4, '0'),
+       {sql_pick(COUNTRIES, f'i % {len(COUNTRIES)}')},
+       {sql_pick(INDUSTRIES)},
+       {sql_pick(COMPANY_SIZES)},
+       created, created
+FROM (SELECT i, {SQL_TIME} AS created FROM generate_series(1, {rows['customers']}) AS g(i)) s"""
+
+
+def sql_products(rows):
+    return f"""
+INSERT INTO products (product_id, product_name, category, price, stock_quantity, description)
+SELECT i,
+       {sql_pick(PRODUCT_WORDS, f'i % {len(PRODUCT_WORDS)}')} || ' v' || i,
+       {sql_pick(PRODUCT_CATEGORIES)},
+       {sql_money(99, 59999)},
+       {sql_int(10, 1000)},
+       'Sample product ' || i
+FROM generate_series(1, {rows['products']}) AS g(i)"""
+
+
+def sql_orders(rows):
+    return f"""
+INSERT INTO orders (order_id, customer_id, order_date, order_status, total_amount, payment_method,
+                    sales_rep, region)
+SELECT i,
+       customer_id,
+       {SQL_TIME},
+       CASE WHEN r < 0.7 THEN 'Completed' WHEN r < 0.85 THEN 'Pending'
+            WHEN r < 0.95 THEN 'Shipped' ELSE 'Cancelled' END,
+       {sql_money(100, 100000)},
+       {sql_pick(PAYMENT_METHODS)},
+       'Sales Rep ' || {sql_int(1, 21)},
+       {sql_pick(REGIONS_BY_COUNTRY, f'customer_id % {len(COUNTRIES)}')}
+FROM (SELECT i, {sql_int(1, rows['customers'] + 1)} AS customer_id, random() AS r
+      FROM generate_series(1, {rows['orders']}) AS g(i)) s"""
+
+
+def sql_order_items(rows):
+    return f"""
+INSERT INTO order_items (order_item_id, order_id, product_id, quantity, unit_price, discount, created_at)
+SELECT i,
+       (i - 1) % {rows['orders']} + 1,
+       {sql_int(1, rows['products'] + 1)},
+       {sql_int(1, 6)},
+       {sql_money(99, 59999)},
+       {sql_pick([0.0, 0.05, 0.1, 0.15, 0.2])},
+       TIMESTAMP '{str(BASE_DATE).replace('T', ' ')}'
+           + ((i - 1) % {rows['orders']})::bigint * {DAYS * 86400} / {rows['orders']} * INTERVAL '1 second'
+FROM generate_series(1, {rows['order_items']}) AS g(i)"""
+
+
+def sql_campaigns(rows):
+    return f"""
+INSERT INTO campaigns (campaign_id, campaign_name, campaign_type, start_date, end_date, budget, status,
+                       channel, target_audience)
+SELECT i,
+       {sql_pick(CHANNELS, f'i % {len(CHANNELS)}')} || ' Campaign ' || i,
+       {sql_pick(CAMPAIGN_TYPES)},
+       start_date,
+       start_date + {sql_int(14, 120)},
+       {sql_money(5000, 150000)},
+       {sql_pick(CAMPAIGN_STATUSES)},
+       {sql_pick(CHANNELS, f'i % {len(CHANNELS)}')},
+       {sql_pick(AUDIENCES)}
+FROM (SELECT i, {SQL_DAY} + {sql_int(0, DAYS - 30)} AS start_date
+      FROM generate_series(1, {rows['campaigns']}) AS g(i)) s"""
+
+
+def sql_leads(rows):
+    return f"""
+INSERT INTO leads (lead_id, first_name, last_name, email, phone, company, job_title, lead_source,
+                   lead_stage, campaign_id, created_at)
+SELECT i, first_name, last_name,
+       lower(first_name) || '.' || lower(last_name) || '.' || i || '@company' || i % 50 || '.com',
+       '+1-555-' || lpad((i % 10000)::text, 4, '0'),
+       'Company ' || i % 500,
+       {sql_pick(JOB_TITLES)},
+       {sql_pick(LEAD_SOURCES)},
+       {sql_pick(LEAD_STAGES)},
+       {sql_int(1, rows['campaigns'] + 1)},
+       {SQL_TIME}
+FROM (SELECT i, {sql_pick(FIRST_NAMES)} AS first_name, {sql_pick(LAST_NAMES)} AS last_name
+      FROM generate_series(1, {rows['leads']}) AS g(i)) s"""
+
+
+def sql_campaign_metrics(rows):
+    return f"""
+INSERT INTO campaign_metrics (metric_id, campaign_id, metric_date, impressions, clicks, conversions,
+                              cost, revenue)
+SELECT i,
+       (i - 1) % {rows['campaigns']} + 1,
+       {SQL_DAY} + ((i - 1) / {rows['campaigns']}) % {DAYS},
+       impressions, clicks, conversions,
+       round((clicks * (0.5 + random() * 4.5))::numeric, 2),
+       round((conversions * (50 + random() * 450))::numeric, 2)
+FROM (SELECT i, impressions, clicks, floor(clicks * (0.01 + random() * 0.19))::int AS conversions
+      FROM (SELECT i, impressions, floor(impressions * (0.005 + random() * 0.075))::int AS clicks
+            FROM (SELECT i, {sql_int(1000, 50000)} AS impressions
+                  FROM generate_series(1, {rows['campaign_metrics']}) AS g(i)) a) b) c"""
+
+
+def sql_website_traffic(rows):
+    return f"""
+INSERT INTO website_traffic (traffic_id, traffic_date, page_url, page_views, unique_visitors, bounce_rate,
+                             avg_time_on_page, referral_source)
+SELECT i,
+       {SQL_DAY} + {sql_int(0, DAYS)},
+       '/page' || {sql_int(1, 51)},
+       page_views,
+       floor(page_views * (0.3 + random() * 0.6))::int,
+       {sql_money(20, 70)},
+       {sql_int(30, 330)},
+       {sql_pick(REFERRAL_SOURCES)}
+FROM (SELECT i, {sql_int(100, 1100)} AS page_views FROM generate_series(1, {rows['website_traffic']}) AS g(i)) s"""
+
+
+SQL_GENERATORS = {
+    'customers': sql_customers,
+    'products': sql_products,
+    'orders': sql_orders,
+    'order_items': sql_order_items,
+    'campaigns': sql_campaigns,
+    'leads': sql_leads,
+    'campaign_metrics': sql_campaign_metrics,
+    'website_traffic': sql_website_traffic,
+}
+
+
+def insert_sql(table, rows, seed=42):
+    """Statements generating a whole table server-side.
+
+    setseed makes random() reproducible for a given seed and table; foreign
+    keys are drawn arithmetically from the parents' 1..N ID ranges, never
+    by sorting or sampling the parent tables.
+    """
+    # setseed takes a value in [-1, 1]
+    return [f"SELECT setseed({(seed * len(BASE_ROWS) + TABLE_INDEX[table]) % 2000 / 1000 - 1})",
+            SQL_GENERATORS[table](rows)]
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+DataMeesh - Domain Database Schema
+Table definitions of the Sales and Marketing databases
+
+Tables are described once as specs (columns, primary key, unique columns,
+foreign keys) and rendered either as complete CREATE TABLE statements or,
+for bulk loads, as bare tables whose indexes and constraints are added
+after the data is in. Foreign key columns and the expressions listed under
+'indexes' get secondary indexes: they serve the cross-domain joins. Tables
+with a 'partition_by' column can also be created range-partitioned by
+month on that column. Materialized views hold the rollups dashboards read.
+"""
+
+from datetime import date
+
+# Columns in table order; constraints are kept apart so they can be deferred
+TABLES = {
+    'customers': {
+        'columns': {
+            'customer_id': 'SERIAL',
+            'customer_name': 'VARCHAR(255) NOT NULL',
+            'email': 'VARCHAR(255) NOT NULL',
+            'phone': 'VARCHAR(50)',
+            'country': 'VARCHAR(100)',
+            'industry': 'VARCHAR(100)',
+            'company_size': 'VARCHAR(50)',
+            'created_at': 'TIMESTAMP DEFAULT NOW()',
+            'updated_at': 'TIMESTAMP DEFAULT NOW()',
+        },
+        'primary_key': 'customer_id',
+        'unique': ['email'],
+        'foreign_keys': {},
+        # Customers and leads are matched on the normalized email
+        'indexes': {'email_norm': 'LOWER(TRIM(email))'},
+    },
+    'products': {
+        'columns': {
+            'product_id': 'SERIAL',
+            'product_name': 'VARCHAR(255) NOT NULL',
+            'category': 'VARCHAR(100)',
+            'price': 'NUMERIC(10,2)',
+            'stock_quantity': 'INTEGER',
+            'description': 'TEXT',
+            'created_at': 'TIMESTAMP DEFAULT NOW()',
+        },
+        'primary_key': 'product_id',
+        'unique': ['product_name'],
+        'foreign_keys': {},
+    },
+    'orders': {
+        'columns': {
+            'order_id': 'SERIAL',
+            'customer_id': 'INTEGER',
+            'order_date': 'TIMESTAMP',
+            'order_status': 'VARCHAR(50)',
+            'total_amount': 'NUMERIC(10,2)',
+            'payment_method': 'VARCHAR(50)',
+            'sales_rep': 'VARCHAR(100)',
+            'region': 'VARCHAR(100)',
+            'created_at': 'TIMESTAMP DEFAULT NOW()',
+        },
+        'primary_key': 'order_id',
+        'unique': [],
+        'foreign_keys': {'customer_id': 'customers'},
+        'partition_by': 'order_date',
+    },
+    'order_items': {
+        'columns': {
+            'order_item_id': 'SERIAL',
+            'order_id': 'INTEGER',
+            'product_id': 'INTEGER',
+            'quantity': 'INTEGER',
+            'unit_price': 'NUMERIC(10,2)',
+            'discount': 'NUMERIC(5,2)',
+            'created_at': 'TIMESTAMP DEFAULT NOW()',
+        },
+        'primary_key': 'order_item_id',
+        'unique': [],
+        'foreign_keys': {'order_id': 'orders', 'product_id': 'products'},
+    },
+    'campaigns': {
+        'columns': {
+            'campaign_id': 'SERIAL',
+            'campaign_name': 'VARCHAR(255) NOT NULL',
+            'campaign_type': 'VARCHAR(100)',
+            'start_date': 'DATE',
+            'end_date': 'DATE',
+            'budget': 'NUMERIC(12,2)',
+            'status': 'VARCHAR(50)',
+            'channel': 'VARCHAR(100)',
+            'target_audience': 'VARCHAR(255)',
+            'created_at': 'TIMESTAMP DEFAULT NOW()',
+            'updated_at': 'TIMESTAMP DEFAULT NOW()',
+        },
+        'primary_key': 'campaign_id',
+        'unique': [],
+        'foreign_keys': {},
+    },
+    'leads': {
+        'columns': {
+            'lead_id': 'SERIAL',
+            'first_name': 'VARCHAR(255)',
+            'last_name': 'VARCHAR(255)',
+            'email': 'VARCHAR(255)',
+            'phone': 'VARCHAR(50)',
+            'company': 'VARCHAR(255)',
+            'job_title': 'VARCHAR(100)',
+            'lead_source': 'VARCHAR(100)',
+            'lead_stage': 'VARCHAR(50)',
+            'campaign_id': 'INTEGER',
+            'created_at': 'TIMESTAMP DEFAULT NOW()',
+        },
+        'primary_key': 'lead_id',
+        'unique': [],
+        'foreign_keys': {'campaign_id': 'campaigns'},
+        'indexes': {'email_norm': 'LOWER(TRIM(email))'},
+    },
+    'campaign_metrics': {
+        'columns': {
+            'metric_id': 'SERIAL',
+            'campaign_id': 'INTEGER',
+            'metric_date': 'DATE',
+            'impressions': 'INTEGER',
+            'clicks': 'INTEGER',
+            'conversions': 'INTEGER',
+            'cost': 'NUMERIC(10,2)',
+            'revenue': 'NUMERIC(10,2)',
+            'created_at': 'TIMESTAMP DEFAULT NOW()',
+        },
+        'primary_key': 'metric_id',
+        'unique': [],
+        'foreign_keys': {'campaign_id': 'campaigns'},
+        'partition_by': 'metric_date',
+    },
+    'website_traffic': {
+        'columns': {
+            'traffic_id': 'SERIAL',
+            'traffic_date': 'DATE',
+            'page_url': 'VARCHAR(500)',
+            'page_views': 'INTEGER',
+            'unique_visitors': 'INTEGER',
+            'bounce_rate': 'NUMERIC(5,2)',
+            'avg_time_on_page': 'INTEGER',
+            'referral_source': 'VARCHAR(100)',
+            'created_at': 'TIMESTAMP DEFAULT NOW()',
+        },
+        'primary_key': 'traffic_id',
+        'unique': [],
+        'foreign_keys': {},
+        'partition_by': 'traffic_date',
+    },
+}
+
+# A table is loaded once all the tables it references are
+TABLE_DEPENDENCIES = {table: sorted(set(spec['foreign_keys'].values()))
+                      for table, spec in TABLES.items() if spec['foreign_keys']}
+
+# Rollups precomputed in each domain database; the unique key lets
+# REFRESH MATERIALIZED VIEW CONCURRENTLY swap rows without blocking readers
+MATERIALIZED_VIEWS = {
+    'mv_customer_lifetime_value': {
+        'tables': ['customers', 'orders'],
+        'unique': ['customer_id'],
+        'query': """
+SELECT
+    c.customer_id,
+    c.customer_name,
+    c.country,
+    c.industry,
+    c.company_size,
+    COUNT(o.order_id) AS order_count,
+    COALESCE(SUM(o.total_amount), 0) AS lifetime_value,
+    ROUND(AVG(o.total_amount), 2) AS avg_order_value,
+    MIN(o.order_date) AS first_order_date,
+    MAX(o.order_date) AS last_order_date
+FROM customers c
+LEFT JOIN orders o ON o.customer_id = c.customer_id
+GROUP BY c.customer_id, c.customer_name, c.country, c.industry, c.company_size""",
+    },
+    'mv_country_revenue': {
+        'tables': ['customers', 'orders'],
+        'unique': ['country', 'month'],
+        'query': """
+SELECT
+    COALESCE(c.country, 'Unknown') AS country,
+    DATE_TRUNC('month', o.order_date)::date AS month,
+    COUNT(*) AS order_count,
+    COUNT(DISTINCT o.customer_id) AS customer_count,
+    SUM(o.total_amount) AS revenue
+FROM orders o
+JOIN customers c ON c.customer_id = o.customer_id
+WHERE o.order_date IS NOT NULL
+GROUP BY 1, 2""",
+    },
+    'mv_campaign_performance': {
+        'tables': ['campaigns', 'campaign_metrics', 'leads'],
+        'unique': ['campaign_id'],
+        'query': """
+SELECT
+    c.campaign_id,
+    c.campaign_name,
+    c.channel,
+    c.status,
+    COALESCE(m.impressions, 0) AS impressions,
+    COALESCE(m.clicks, 0) AS clicks,
+    COALESCE(m.conversions, 0) AS conversions,
+    COALESCE(m.cost, 0) AS cost,
+    COALESCE(m.revenue, 0) AS revenue,
+    ROUND(m.clicks * 100.0 / NULLIF(m.impressions, 0), 2) AS ctr_percent,
+    ROUND(m.conversions * 100.0 / NULLIF(m.clicks, 0), 2) AS conversion_rate_percent,
+    COALESCE(l.lead_count, 0) AS lead_count
+FROM campaigns c
+LEFT JOIN (
+    SELECT campaign_id, SUM(impressions) AS impressions, SUM(clicks) AS clicks,
+           SUM(conversions) AS conversions, SUM(cost) AS cost, SUM(revenue) AS revenue
+    FROM campaign_metrics
+    GROUP BY campaign_id
+) m ON m.campaign_id = c.campaign_id
+LEFT JOIN (
+    SELECT campaign_id, COUNT(*) AS lead_count
+    FROM leads
+    GROUP BY campaign_id
+) l ON l.campaign_id = c.campaign_id""",
+    },
+}
+
+
+def is_partitioned(table, partitioned):
+    """True if the table is range-partitioned when partitioning is enabled"""
+    return partitioned and 'partition_by' in TABLES[table]
+
+
+def primary_key_columns(table, partitioned=False):
+    """Primary key columns; the key of a partitioned table must include its partition column"""
+    spec = TABLES[table]
+    if is_partitioned(table, partitioned):
+        return [spec['primary_key'], spec['partition_by']]
+    return [spec['primary_key']]
+
+
+def foreign_keys(table, partitioned=False):
+    """{column: parent} of a table's foreign keys.
+
+    A partitioned parent has no unique key on its ID alone, so foreign keys
+    to it are dropped when partitioning is enabled.
+    """
+    return {column: parent for column, parent in TABLES[table]['foreign_keys'].items()
+            if not is_partitioned(parent, partitioned)}
+
+
+def create_table_sql(table, constraints=True, partitioned=False):
+    """CREATE TABLE statement, with inline constraints or bare for bulk loads"""
+    spec = TABLES[table]
+    by_month = is_partitioned(table, partitioned)
+    references = foreign_keys(table, partitioned)
+    lines = []
+    for column, definition in spec['columns'].items():
+        if constraints and column == spec['primary_key'] and not by_month:
+            definition += " PRIMARY KEY"
+        elif constraints and column in spec['unique']:
+            definition += " UNIQUE"
+        elif constraints and column in references:
+            parent = references[column]
+            definition += f" REFERENCES {parent}({TABLES[parent]['primary_key']})"
+        lines.append(f"    {column} {definition}")
+    if constraints and by_month:
+        lines.append(f"    PRIMARY KEY ({', '.join(primary_key_columns(table, partitioned))})")
+    partitioning = f" PARTITION BY RANGE ({spec['partition_by']})" if by_month else ""
+    return f"CREATE TABLE IF NOT EXISTS {table} (\n" + ",\n".join(lines) + f"\n){partitioning};\n"
+
+
+def create_tables_sql(tables, constraints=True, partitioned=False):
+    """CREATE TABLE statements of several tables, parents first"""
+    return "\n".join(create_table_sql(table, constraints, partitioned) for table in tables)
+
+
+def next_month(month):
+    """First day of the month following a month's first day"""
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def month_starts(start, end):
+    """First days of the months from start's month to end's month included"""
+    month = date(start.year, start.month, 1)
+    while month <= end:
+        yield month
+        month = next_month(month)
+
+
+def partition_name(table, month):
+    """Name of the monthly partition of a table"""
+    return f"{table}_{month:%Y_%m}"
+
+
+def partitions_sql(table, start, end):
+    """CREATE statements of the monthly partitions covering start..end"""
+    return [f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month}') TO ('{next_month(month)}');"
+            for month in month_starts(start, end)]
+
+
+def index_definitions(table):
+    """{index name: indexed column or expression} of a table's secondary indexes.
+
+    Every foreign key column is indexed, including the ones whose constraint
+    partitioning drops: the joins on them remain.
+    """
+    spec = TABLES[table]
+    indexes = {f"{table}_{column}_idx": column for column in spec['foreign_keys']}
+    indexes.update({f"{table}_{name}_idx": expression for name, expression in spec.get('indexes', {}).items()})
+    return indexes
+
+
+def index_builds(table):
+    """Secondary indexes of a table: [(name, statements)]"""
+    builds = []
+    for name, expression in index_definitions(table).items():
+        key = expression if expression.isidentifier() else f"({expression})"
+        builds.append((name, [f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({key})"]))
+    return builds
+
+
+def create_indexes_sql(tables):
+    """CREATE INDEX statements of several tables"""
+    return "".join(f"{statement};\n" for table in tables for _, statements in index_builds(table)
+                   for statement in statements)
+
+
+def key_builds(table, partitioned=False):
+    """Deferred primary key and unique constraints of a table.
+
+    Returns [(name, statements)]: each unique index is built on its own
+    (several can build on one table at once), then attached as a constraint
+    under the name PostgreSQL would have given it inline. A partitioned
+    table cannot attach an index as a constraint: its key is added directly,
+    which builds the index of every partition.
+    """
+    spec = TABLES[table]
+    if is_partitioned(table, partitioned):
+        return [(f"{table}_pkey", [
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey "
+            f"PRIMARY KEY ({', '.join(primary_key_columns(table, partitioned))})",
+        ])]
+    builds = [(f"{table}_pkey", [
+        f"CREATE UNIQUE INDEX {table}_pkey ON {table} ({spec['primary_key']})",
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY USING INDEX {table}_pkey",
+    ])]
+    for column in spec['unique']:
+        builds.append((f"{table}_{column}_key", [
+            f"CREATE UNIQUE INDEX {table}_{column}_key ON {table} ({column})",
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_{column}_key UNIQUE USING INDEX {table}_{column}_key",
+        ]))
+    return builds
+
+
+def foreign_key_builds(table, partitioned=False):
+    """Deferred foreign keys of a table: [(name, parent, statements)].
+
+    Added NOT VALID (a short lock) then validated, which only takes a
+    SHARE UPDATE EXCLUSIVE lock so validations of several tables overlap.
+    Partitioned tables do not accept NOT VALID foreign keys: theirs are
+    added and checked in one statement.
+    """
+    builds = []
+    for column, parent in foreign_keys(table, partitioned).items():
+        name = f"{table}_{column}_fkey"
+        add = (f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+               f"REFERENCES {parent}({TABLES[parent]['primary_key']})")
+        if is_partitioned(table, partitioned):
+            builds.append((name, parent, [add]))
+        else:
+            builds.append((name, parent, [f"{add} NOT VALID", f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}"]))
+    return builds
+
+
+def views_of(tables):
+    """Materialized views computed from the given tables only"""
+    return [view for view, spec in MATERIALIZED_VIEWS.items() if set(spec['tables']) <= set(tables)]
+
+
+def materialized_view_sql(view):
+    """CREATE statements of a materialized view, left unpopulated, and of its unique index"""
+    spec = MATERIALIZED_VIEWS[view]
+    return [
+        f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view} AS{spec['query']}\nWITH NO DATA",
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {view}_key ON {view} ({', '.join(spec['unique'])})",
+    ]
+
+
+def create_views_sql(tables):
+    """Script creating and populating the materialized views of several tables"""
+    return "".join(f"{statement};\n" for view in views_of(tables)
+                   for statement in materialized_view_sql(view) + [f"REFRESH MATERIALIZED VIEW {view}"])
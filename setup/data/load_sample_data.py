@@ -2,11 +2,77 @@
 """
 DataMeesh - Sample Data Loader
 Loads realistic sample data into Sales and Marketing databases
+
+    python setup/data/load_sample_data.py                # demo rows via psql
+    python setup/data/load_sample_data.py --bulk --scale 10
+    python setup/data/load_sample_data.py --bulk --server-side --scale 100
+    python setup/data/load_sample_data.py --incremental --csv orders=orders_delta.csv
+    python setup/data/load_sample_data.py --bulk --partitioned
+    python setup/data/load_sample_data.py --maintain-partitions --detach-before 2024-07
+    python setup/data/load_sample_data.py --verify-indexes
+    python setup/data/load_sample_data.py --refresh-views      # e.g. from cron every 15 minutes
 """
 
+import argparse
+import csv
+import io
+import json
+import os
+import re
 import subprocess
 import sys
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+
+from domain_schema import (TABLE_DEPENDENCIES, TABLES, create_indexes_sql, create_tables_sql, create_views_sql,
+                           foreign_key_builds, index_builds, is_partitioned, key_builds, materialized_view_sql,
+                           month_starts, next_month, partition_name, partitions_sql, primary_key_columns,
+                           views_of)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_connections import DATABASES, pg_connection, pg_execute, psycopg2
+
+try:
+    import bulk_generators
+except ImportError:  # numpy/pandas missing: only the bulk mode needs them
+    bulk_generators = None
+
+# Domain databases; tables are listed in load order (parents before children)
+DOMAINS = {
+    'sales': {**DATABASES['sales'], 'tables': ['customers', 'products', 'orders', 'order_items']},
+    'marketing': {**DATABASES['marketing'], 'tables': ['campaigns', 'leads', 'campaign_metrics', 'website_traffic']},
+}
+
+# Tables refreshed by --incremental and the column their high-water mark follows
+INCREMENTAL_TABLES = {
+    'orders': 'order_date',
+    'order_items': 'created_at',
+    'leads': 'created_at',
+    'campaign_metrics': 'metric_date',
+}
+
+# Predicates the federated joins send to each database: Trino's dynamic
+# filters push the join keys down as IN lists; the normalized email match
+# also runs natively in PostgreSQL
+INDEX_PROBES = [
+    ('sales', 'orders', 'customer_id'),
+    ('sales', 'order_items', 'order_id'),
+    ('sales', 'customers', 'LOWER(TRIM(email))'),
+    ('marketing', 'leads', 'campaign_id'),
+    ('marketing', 'leads', 'LOWER(TRIM(email))'),
+]
+
+# First month of the sample data: monthly partitions are created from there on
+PARTITIONS_START = date(2024, 1, 1)
+
+WATERMARKS_SQL = """
+CREATE TABLE IF NOT EXISTS etl_watermarks (
+    table_name VARCHAR(100) PRIMARY KEY,
+    watermark TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+"""
 
 def run_command(cmd, check=True):
     """Run command"""
@@ -24,29 +90,702 @@ def print_header(text):
     print(f"  {text}")
     print(f"{'=' * 70}\n")
 
-def execute_sql(namespace, pod_name, database, user, sql_commands):
-    """Execute SQL commands in PostgreSQL pod"""
+def execute_sql(domain, pod_name, sql_commands):
+    """Execute SQL commands in a domain database.
+
+    Statements run over a pooled session; without psycopg2 the script is
+    copied into the pod and run with psql -f.
+    """
+    spec = DOMAINS[domain]
+    database = spec['database']
     print(f"📊 Executing SQL in {database}...")
     
+    if psycopg2 is not None:
+        try:
+            errors = pg_execute(domain, sql_commands)
+        except (psycopg2.Error, RuntimeError, OSError) as e:
+            print(f"❌ Cannot connect to {database}: {e}")
+            return False
+        for statement, error in errors:
+            print(f"⚠️  {statement.splitlines()[0]}... failed: {error.splitlines()[0]}")
+        print(f"✅ Data loaded into {database}")
+        return True
+    
     # Create temp SQL file
     sql_file = f"/tmp/datamesh_{database}.sql"
     with open(sql_file, "w") as f:
         f.write(sql_commands)
     
     # Copy SQL file to pod
-    copy_cmd = f"kubectl cp {sql_file} {namespace}/{pod_name}:{sql_file}"
+    copy_cmd = f"kubectl cp {sql_file} {spec['namespace']}/{pod_name}:{sql_file}"
     if not run_command(copy_cmd):
         return False
     
     # Execute SQL
-    exec_cmd = f"kubectl exec -n {namespace} {pod_name} -- psql -U {user} -d {database} -f {sql_file}"
+    exec_cmd = f"kubectl exec -n {spec['namespace']} {pod_name} -- psql -U {spec['user']} -d {database} -f {sql_file}"
     if not run_command(exec_cmd):
         return False
     
     print(f"✅ Data loaded into {database}")
     return True
 
+class ChunkStream(io.RawIOBase):
+    """Readable file object over an iterator of byte chunks, fed to COPY FROM STDIN"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.current = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.current:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            self.current = memoryview(chunk)
+        n = min(len(buffer), len(self.current))
+        buffer[:n] = self.current[:n]
+        self.current = self.current[n:]
+        return n
+
+def frames_csv(frames):
+    """Column names and CSV byte chunks of an iterator of DataFrames"""
+    frames = iter(frames)
+    first = next(frames)
+
+    def encoded():
+        yield first.to_csv(index=False, header=False).encode()
+        for df in frames:
+            yield df.to_csv(index=False, header=False).encode()
+
+    return list(first.columns), encoded()
+
+def csv_delta(path, column, watermark, batch_rows=50_000):
+    """Column names and CSV byte chunks of the rows of a CSV file at or past the watermark.
+
+    Rows are filtered while the file streams, so only the delta is sent.
+    """
+    f = open(path, newline='')
+    reader = csv.reader(f)
+    columns = next(reader)
+    index = columns.index(column)
+
+    def chunks():
+        with f:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator='\n')
+            for n, row in enumerate(r for r in reader
+                                    if watermark is None or (r[index] and datetime.fromisoformat(r[index]) >= watermark)):
+                writer.writerow(row)
+                if (n + 1) % batch_rows == 0:
+                    yield buffer.getvalue().encode()
+                    buffer.seek(0)
+                    buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode()
+
+    return columns, chunks()
+
+def copy_stream(conn, table, columns, stream, header=False):
+    """COPY a CSV stream into table; returns the number of rows copied"""
+    sql = (f"COPY {table} ({', '.join(columns)}) FROM STDIN "
+           f"WITH (FORMAT csv{', HEADER true' if header else ''})")
+    with conn.cursor() as cur:
+        cur.copy_expert(sql, stream, size=1024 * 1024)
+        return cur.rowcount
+
+def reset_sequences(conn, tables):
+    """Move SERIAL sequences past the explicit IDs written by COPY"""
+    with conn.cursor() as cur:
+        for table in tables:
+            key = TABLES[table]['primary_key']
+            cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', '{key}'), "
+                        f"COALESCE((SELECT MAX({key}) FROM {table}), 0) + 1, false)")
+
+def months_ahead(day, months):
+    """First day of the month `months` months after day's month"""
+    month = day.replace(day=1)
+    for _ in range(months):
+        month = next_month(month)
+    return month
+
+def partition_statements(tables, partitioned, future_months):
+    """CREATE statements of the monthly partitions of the partitioned tables among tables,
+    from the first sample month to future_months past the current one"""
+    end = months_ahead(date.today(), future_months)
+    return [statement for table in tables if is_partitioned(table, partitioned)
+            for statement in partitions_sql(table, PARTITIONS_START, end)]
+
+def partitioned_tables(cur, tables):
+    """Tables among tables that are partitioned in the database"""
+    cur.execute("SELECT relname FROM pg_class WHERE relkind = 'p' AND relname = ANY(%s) "
+                "AND pg_table_is_visible(oid)", (list(tables),))
+    found = {row[0] for row in cur.fetchall()}
+    return [table for table in tables if table in found]
+
+def list_partitions(cur, table):
+    """{partition name: first day of its month} of a table's monthly partitions"""
+    cur.execute("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = %s::regclass", (table,))
+    partitions = {}
+    for (name,) in cur.fetchall():
+        match = re.fullmatch(rf"{table}_(\d{{4}})_(\d{{2}})", name)
+        if match:
+            partitions[name] = date(int(match.group(1)), int(match.group(2)), 1)
+    return partitions
+
+def create_partitions(cur, table, start, end):
+    """Create the missing monthly partitions of table from start's month to end's; returns their names"""
+    existing = list_partitions(cur, table)
+    for statement in partitions_sql(table, start, end):
+        cur.execute(statement)
+    return [partition_name(table, month) for month in month_starts(start, end)
+            if partition_name(table, month) not in existing]
+
+def prepare_domain(domain, dsn, partitioned=False, future_months=3):
+    """Recreate the tables of a domain bare: no keys, unique or foreign key constraints.
+
+    Loading into unindexed tables skips index maintenance and FK checks per
+    row; build_constraints adds them once the data is in. Partitioned tables
+    get their monthly partitions up front: COPY routes each row to its month.
+    """
+    spec = DOMAINS[domain]
+    with pg_connection(domain, dsn) as conn, conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {', '.join(spec['tables'])} CASCADE")
+        cur.execute(create_tables_sql(spec['tables'], constraints=False, partitioned=partitioned))
+        for statement in partition_statements(spec['tables'], partitioned, future_months):
+            cur.execute(statement)
+        # Reloaded tables start over: --incremental reads their watermark from the data again
+        cur.execute(WATERMARKS_SQL)
+        cur.execute("DELETE FROM etl_watermarks WHERE table_name = ANY(%s)", (spec['tables'],))
+
+def load_table(domain, table, dsn, csv_path, rows, seed, chunk_size, server_side=False):
+    """COPY one table over a pooled session; returns (rows, seconds).
+
+    With server_side, generated tables are built by PostgreSQL itself with
+    INSERT ... SELECT FROM generate_series instead of being streamed.
+    Runs in a worker process: tables of both domains load concurrently.
+    """
+    started = time.time()
+    with pg_connection(domain, dsn) as conn:
+        if csv_path:
+            with open(csv_path, 'rb') as f:
+                columns = f.readline().decode().strip().split(',')
+                f.seek(0)
+                n_rows = copy_stream(conn, table, columns, f, header=True)
+        elif server_side:
+            with conn.cursor() as cur:
+                for statement in bulk_generators.insert_sql(table, rows, seed):
+                    cur.execute(statement)
+                n_rows = cur.rowcount
+        else:
+            columns, chunks = frames_csv(bulk_generators.generate_chunks(table, rows, seed, chunk_size))
+            n_rows = copy_stream(conn, table, columns, ChunkStream(chunks))
+        reset_sequences(conn, [table])
+    return n_rows, time.time() - started
+
+def read_watermark(cur, table):
+    """Stored high-water mark of a table, else the latest value of its watermark column"""
+    cur.execute("SELECT watermark FROM etl_watermarks WHERE table_name = %s", (table,))
+    found = cur.fetchone()
+    if found:
+        return found[0]
+    cur.execute(f"SELECT MAX({INCREMENTAL_TABLES[table]})::timestamp FROM {table}")
+    return cur.fetchone()[0]
+
+def upsert_table(domain, table, dsn, csv_path, rows, days, seed, chunk_size, future_months=3):
+    """Merge the rows past a table's watermark in one transaction.
+
+    The delta (CSV rows at or past the watermark, or --days of generated
+    rows after it) is COPYed into a temporary table, which is never
+    WAL-logged, then applied with a single INSERT ... ON CONFLICT DO UPDATE.
+    Unchanged rows are not rewritten. The watermark moves in the same
+    transaction as the data. On a partitioned table, the months the delta
+    reaches get their partitions first, and rows are matched on the key
+    including the partition column. Returns (staged, inserted, updated,
+    watermark, seconds).
+    """
+    started = time.time()
+    column = INCREMENTAL_TABLES[table]
+    stage = f"stage_{table}"
+    with pg_connection(domain, dsn) as conn, conn.cursor() as cur:
+        partitioned = bool(partitioned_tables(cur, [table]))
+        keys = primary_key_columns(table, partitioned)
+        key = ', '.join(keys)
+        watermark = read_watermark(cur, table)
+        if csv_path:
+            columns, chunks = csv_delta(csv_path, column, watermark)
+            if set(keys) - set(columns):
+                raise ValueError(f"{csv_path}: the {key} column(s) are required to merge into {table}")
+        else:
+            # rows holds the scaled table sizes: a day is a 365th of the sample year
+            n_rows = max(1, round(rows[table] * days / bulk_generators.DAYS))
+            # Generated foreign keys range over 1..MAX(id) of the parents, which the
+            # bulk and incremental generators keep contiguous
+            rows = dict(rows)
+            for parent in [table] + TABLE_DEPENDENCIES.get(table, []):
+                cur.execute(f"SELECT COALESCE(MAX({TABLES[parent]['primary_key']}), 0) FROM {parent}")
+                rows[parent] = cur.fetchone()[0]
+            start = watermark.date() + timedelta(days=1) if watermark else datetime(2024, 1, 1)
+            columns, chunks = frames_csv(bulk_generators.generate_delta(
+                table, rows, rows[table] + 1, n_rows, column, start, days, seed, chunk_size))
+
+        cur.execute(f"CREATE TEMP TABLE {stage} (LIKE {table}) ON COMMIT DROP")
+        staged = copy_stream(conn, stage, columns, ChunkStream(chunks))
+
+        if partitioned:
+            cur.execute(f"SELECT MIN({column})::date, MAX({column})::date FROM {stage}")
+            first, last = cur.fetchone()
+            ahead = months_ahead(date.today(), future_months)
+            create_partitions(cur, table, first or ahead, max(last or ahead, ahead))
+
+        names = ', '.join(columns)
+        updates = [c for c in columns if c not in keys]
+        cur.execute(f"""
+            WITH merged AS (
+                INSERT INTO {table} AS t ({names})
+                SELECT DISTINCT ON ({key}) {names} FROM {stage} ORDER BY {key}, {column} DESC
+                ON CONFLICT ({key}) DO UPDATE SET {', '.join(f'{c} = EXCLUDED.{c}' for c in updates)}
+                WHERE ({', '.join(f't.{c}' for c in updates)}) IS DISTINCT FROM
+                      ({', '.join(f'EXCLUDED.{c}' for c in updates)})
+                RETURNING {key}
+            )
+            -- The join reads the table as it was before the merge: a row without a match was inserted
+            SELECT COUNT(*) FILTER (WHERE before.{keys[0]} IS NULL), COUNT(before.{keys[0]})
+            FROM merged LEFT JOIN {table} AS before USING ({key})
+        """)
+        inserted, updated = cur.fetchone()
+
+        cur.execute(f"SELECT MAX({column})::timestamp FROM {stage}")
+        latest = cur.fetchone()[0]
+        if latest is not None and (watermark is None or latest > watermark):
+            watermark = latest
+            cur.execute("INSERT INTO etl_watermarks (table_name, watermark) VALUES (%s, %s) "
+                        "ON CONFLICT (table_name) DO UPDATE SET watermark = EXCLUDED.watermark, "
+                        "updated_at = NOW()", (table, watermark))
+        reset_sequences(conn, [table])
+    return staged, inserted, updated, watermark, time.time() - started
+
+def run_statements(domain, dsn, statements, maintenance_work_mem):
+    """Run DDL statements in autocommit on a pooled session; returns seconds"""
+    started = time.time()
+    with pg_connection(domain, dsn, autocommit=True) as conn, conn.cursor() as cur:
+        cur.execute("SET maintenance_work_mem = %s", (maintenance_work_mem,))
+        for statement in statements:
+            cur.execute(statement)
+    return time.time() - started
+
+def build_constraints(dsns, workers, maintenance_work_mem, partitioned=False):
+    """Build keys and secondary indexes, then foreign keys, then ANALYZE every table, in parallel.
+
+    Indexes of all tables build concurrently; a foreign key waits for the
+    keys of its table and of the referenced table; ANALYZE waits for
+    everything on its table, so expression indexes get their statistics.
+    Returns {task: seconds}.
+    """
+    statements, dependencies = {}, {}
+    for domain, spec in DOMAINS.items():
+        for table in spec['tables']:
+            keys = [(domain, name) for name, _ in key_builds(table, partitioned)]
+            statements.update(zip(keys, (sql for _, sql in key_builds(table, partitioned))))
+            indexes = [(domain, name) for name, _ in index_builds(table)]
+            statements.update(zip(indexes, (sql for _, sql in index_builds(table))))
+            fks = []
+            for name, parent, sql in foreign_key_builds(table, partitioned):
+                statements[(domain, name)] = sql
+                dependencies[(domain, name)] = keys + [(domain, n) for n, _ in key_builds(parent, partitioned)]
+                fks.append((domain, name))
+            statements[(domain, f"analyze {table}")] = [f"ANALYZE {table}"]
+            dependencies[(domain, f"analyze {table}")] = keys + indexes + fks
+
+    stats = {}
+
+    def report(task, elapsed):
+        stats[task] = elapsed
+        print(f"   ✅ {DOMAINS[task[0]]['database']}: {task[1]} ({elapsed:.2f}s)")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        run_dag(list(statements), dependencies,
+                lambda task: executor.submit(run_statements, task[0], dsns[task[0]], statements[task],
+                                             maintenance_work_mem),
+                report)
+    return stats
+
+def refresh_views(domain, dsn):
+    """Create the missing materialized views of a domain and refresh them all.
+
+    A populated view is refreshed CONCURRENTLY: readers keep the previous
+    rows until the new ones are swapped in. Returns {view: (concurrently, seconds)}.
+    """
+    results = {}
+    with pg_connection(domain, dsn, autocommit=True) as conn, conn.cursor() as cur:
+        for view in views_of(DOMAINS[domain]['tables']):
+            for statement in materialized_view_sql(view):
+                cur.execute(statement)
+            cur.execute("SELECT relispopulated FROM pg_class WHERE oid = %s::regclass", (view,))
+            concurrently = cur.fetchone()[0]
+            started = time.time()
+            cur.execute(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}{view}")
+            results[view] = (concurrently, time.time() - started)
+    return results
+
+def print_refreshes(domain, results):
+    """One line per refreshed materialized view"""
+    for view, (concurrently, elapsed) in results.items():
+        print(f"   ✅ {DOMAINS[domain]['database']}.{view}: "
+              f"{'refreshed concurrently' if concurrently else 'built'} in {elapsed:.2f}s")
+
+def run_dag(tasks, dependencies, submit, on_done=None):
+    """Submit each task as soon as all its dependencies are done.
+
+    submit(task) returns a future; concurrency is bounded by the executor
+    behind it. on_done(task, result) runs before any dependent is submitted.
+    Returns {task: result}; the first failure is raised.
+    """
+    results, pending, running = {}, list(tasks), {}
+    while pending or running:
+        for task in [t for t in pending if all(d in results for d in dependencies.get(t, []))]:
+            pending.remove(task)
+            running[submit(task)] = task
+        if not running:
+            raise RuntimeError(f"Dependency cycle between {pending}")
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            task = running.pop(future)
+            results[task] = future.result()
+            if on_done:
+                on_done(task, results[task])
+    return results
+
+def longest_chain(stats, dependencies):
+    """Duration of the slowest dependency chain: the lower bound of the wall-clock time"""
+    finish = {}
+
+    def chain(table):
+        if table not in finish:
+            finish[table] = stats[table][1] + max((chain(d) for d in dependencies.get(table, [])), default=0)
+        return finish[table]
+
+    return max(chain(table) for table in stats)
+
+def parse_csv_paths(values):
+    """TABLE=PATH pairs of --csv"""
+    known = {table for spec in DOMAINS.values() for table in spec['tables']}
+    paths = {}
+    for value in values:
+        table, _, path = value.partition('=')
+        if table not in known or not path:
+            raise SystemExit(f"❌ Invalid --csv {value!r}: expected TABLE=PATH with TABLE in {sorted(known)}")
+        paths[table] = path
+    return paths
+
+def bulk_main(args):
+    """Bulk mode: stream generated or CSV rows with COPY FROM STDIN"""
+    print_header(f"📦 DataMeesh - Bulk Loader "
+                 f"({'server-side generate_series' if args.server_side else 'COPY FROM STDIN'}"
+                 f"{', monthly partitions' if args.partitioned else ''})")
+
+    if psycopg2 is None:
+        print("❌ psycopg2 is required for --bulk: pip install psycopg2-binary")
+        return 1
+    csv_paths = parse_csv_paths(args.csv)
+    generated = [t for spec in DOMAINS.values() for t in spec['tables'] if t not in csv_paths]
+    if generated and bulk_generators is None:
+        print("❌ numpy and pandas are required to generate data: pip install numpy pandas")
+        return 1
+
+    rows = bulk_generators.scaled_rows(args.scale) if bulk_generators else {}
+    dsns = {domain: getattr(args, f"{domain}_dsn") for domain in DOMAINS}
+    domain_of = {table: domain for domain, spec in DOMAINS.items() for table in spec['tables']}
+    started = time.time()
+    stats = {}
+    try:
+        # Opens the port-forwards (if any) before the workers start: they share them
+        for domain in DOMAINS:
+            prepare_domain(domain, dsns[domain], args.partitioned, args.future_months)
+
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            def submit(table):
+                domain = domain_of[table]
+                return executor.submit(load_table, domain, table, dsns[domain], csv_paths.get(table),
+                                       dict(rows), args.seed, args.chunk_size, args.server_side)
+
+            def report(table, result):
+                n_rows, elapsed = stats[table] = result
+                # Generated children draw their foreign keys from 1..n_rows
+                rows[table] = n_rows
+                print(f"   ✅ {DOMAINS[domain_of[table]]['database']}.{table}: {n_rows:,} rows in "
+                      f"{elapsed:.2f}s ({n_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+            print(f"🚀 Loading {len(domain_of)} tables with {args.workers} worker(s)...")
+            run_dag(list(domain_of), TABLE_DEPENDENCIES, submit, report)
+            loaded = time.time()
+
+            print(f"\n🔧 Building keys and constraints (maintenance_work_mem={args.maintenance_work_mem})...")
+            build_constraints(dsns, args.workers, args.maintenance_work_mem, args.partitioned)
+            indexed = time.time()
+
+        print("\n📈 Building materialized views...")
+        for domain in DOMAINS:
+            print_refreshes(domain, refresh_views(domain, dsns[domain]))
+    except (psycopg2.Error, RuntimeError, OSError) as e:
+        print(f"❌ Bulk load failed: {e}")
+        return 1
+    elapsed = time.time() - started
+
+    total = sum(n for n, _ in stats.values())
+    print_header("✅ Bulk Loading Complete")
+    print(f"📊 {total:,} rows in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+    print(f"   Load: {loaded - started:.2f}s (sum of table loads: {sum(t for _, t in stats.values()):.2f}s, "
+          f"longest dependency chain: {longest_chain(stats, TABLE_DEPENDENCIES):.2f}s)")
+    print(f"   Keys, constraints and ANALYZE: {indexed - loaded:.2f}s")
+    print(f"   Materialized views: {started + elapsed - indexed:.2f}s")
+    return 0
+
+def incremental_main(args):
+    """Incremental mode: merge the rows past each table's watermark"""
+    print_header("🔄 DataMeesh - Incremental Loader (watermark + upsert)")
+
+    if psycopg2 is None:
+        print("❌ psycopg2 is required for --incremental: pip install psycopg2-binary")
+        return 1
+    csv_paths = parse_csv_paths(args.csv)
+    if set(csv_paths) - set(INCREMENTAL_TABLES):
+        print(f"❌ --incremental only refreshes {', '.join(INCREMENTAL_TABLES)}")
+        return 1
+    if set(INCREMENTAL_TABLES) - set(csv_paths) and bulk_generators is None:
+        print("❌ numpy and pandas are required to generate data: pip install numpy pandas")
+        return 1
+
+    rows = bulk_generators.scaled_rows(args.scale) if bulk_generators else {}
+    dsns = {domain: getattr(args, f"{domain}_dsn") for domain in DOMAINS}
+    domain_of = {table: domain for domain, spec in DOMAINS.items() for table in spec['tables']
+                 if table in INCREMENTAL_TABLES}
+    dependencies = {table: [d for d in TABLE_DEPENDENCIES.get(table, []) if d in domain_of] for table in domain_of}
+    started = time.time()
+    try:
+        for domain in DOMAINS:
+            pg_execute(domain, WATERMARKS_SQL, dsns[domain])
+
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            def submit(table):
+                domain = domain_of[table]
+                return executor.submit(upsert_table, domain, table, dsns[domain], csv_paths.get(table),
+                                       rows, args.days, args.seed, args.chunk_size, args.future_months)
+
+            def report(table, result):
+                staged, inserted, updated, watermark, elapsed = result
+                print(f"   ✅ {DOMAINS[domain_of[table]]['database']}.{table}: {staged:,} staged, "
+                      f"{inserted:,} inserted, {updated:,} updated in {elapsed:.2f}s "
+                      f"(watermark {watermark})")
+
+            run_dag(list(domain_of), dependencies, submit, report)
+
+        print("\n📈 Refreshing materialized views...")
+        for domain in DOMAINS:
+            print_refreshes(domain, refresh_views(domain, dsns[domain]))
+    except (psycopg2.Error, RuntimeError, OSError, ValueError) as e:
+        print(f"❌ Incremental load failed: {e}")
+        return 1
+
+    print(f"\n✅ Incremental load complete in {time.time() - started:.2f}s")
+    return 0
+
+def maintain_partitions(domain, dsn, future_months, detach_before=None):
+    """Create the upcoming monthly partitions of a domain's partitioned tables
+    and detach the ones whose month is before detach_before.
+
+    Detached partitions stay as standalone tables, renamed <name>_detached so
+    the month can be partitioned again: old data leaves the hot table
+    without a DELETE, and can be archived or dropped later.
+    DETACH ... CONCURRENTLY (PostgreSQL 14+) does not block queries on the
+    table. Returns {table: (created, detached)}.
+    """
+    results = {}
+    with pg_connection(domain, dsn, autocommit=True) as conn, conn.cursor() as cur:
+        for table in partitioned_tables(cur, DOMAINS[domain]['tables']):
+            created = create_partitions(cur, table, date.today(), months_ahead(date.today(), future_months))
+            detached = []
+            if detach_before:
+                for name, month in sorted(list_partitions(cur, table).items(), key=lambda item: item[1]):
+                    if month < detach_before:
+                        cur.execute(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY")
+                        cur.execute(f"ALTER TABLE {name} RENAME TO {name}_detached")
+                        detached.append(name)
+            results[table] = (created, detached)
+    return results
+
+def partitions_main(args):
+    """Partition maintenance mode: create future partitions, detach old ones"""
+    print_header("🗓️  DataMeesh - Partition Maintenance")
+
+    if psycopg2 is None:
+        print("❌ psycopg2 is required for --maintain-partitions: pip install psycopg2-binary")
+        return 1
+    try:
+        for domain in DOMAINS:
+            results = maintain_partitions(domain, getattr(args, f"{domain}_dsn"), args.future_months,
+                                          args.detach_before)
+            if not results:
+                print(f"   ⚠️  {DOMAINS[domain]['database']}: no partitioned table (load with --partitioned)")
+            for table, (created, detached) in results.items():
+                print(f"   ✅ {DOMAINS[domain]['database']}.{table}: {len(created)} partition(s) created"
+                      f"{' (' + ', '.join(created) + ')' if created else ''}, {len(detached)} detached"
+                      f"{' (' + ', '.join(detached) + ')' if detached else ''}")
+    except (psycopg2.Error, RuntimeError, OSError) as e:
+        print(f"❌ Partition maintenance failed: {e}")
+        return 1
+    return 0
+
+def plan_indexes(plan):
+    """Names of the indexes an EXPLAIN (FORMAT JSON) plan node and its children scan"""
+    names = {plan['Index Name']} if 'Index Name' in plan else set()
+    for child in plan.get('Plans', []):
+        names |= plan_indexes(child)
+    return names
+
+def explain_probe(cur, table, expression, values, indexes=True):
+    """EXPLAIN ANALYZE the pushed-down predicate; returns (indexes scanned, milliseconds)"""
+    cur.execute("SET enable_indexscan = %s; SET enable_bitmapscan = %s", (indexes, indexes))
+    cur.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) SELECT * FROM {table} WHERE {expression} = ANY(%s)", (values,))
+    result = cur.fetchone()[0]
+    result = json.loads(result) if isinstance(result, str) else result
+    return plan_indexes(result[0]['Plan']), result[0]['Execution Time']
+
+def sample_values(cur, table, expression, n_values):
+    """Up to n_values values of expression read from a sample of the table's pages.
+
+    TABLESAMPLE SYSTEM reads a percentage of the pages instead of scanning
+    and sorting the whole table; the percentage grows only while the sample
+    is too small, as on the demo tables.
+    """
+    for percent in (0.1, 1, 10, 100):
+        cur.execute(f"SELECT {expression} FROM {table} TABLESAMPLE SYSTEM (%s) LIMIT %s", (percent, n_values))
+        values = [row[0] for row in cur.fetchall()]
+        if len(values) == n_values:
+            break
+    return values
+
+def verify_indexes(dsns, n_values=20):
+    """Check that each INDEX_PROBES predicate scans an index, against a sequential scan.
+
+    Probes n_values keys sampled from the table. Returns
+    [(domain, table, expression, indexes, index ms, seq scan ms)].
+    """
+    results = []
+    for domain, table, expression in INDEX_PROBES:
+        with pg_connection(domain, dsns[domain]) as conn, conn.cursor() as cur:
+            values = sample_values(cur, table, expression, n_values)
+            explain_probe(cur, table, expression, values)  # warm the cache for both plans
+            indexes, index_ms = explain_probe(cur, table, expression, values)
+            _, seq_ms = explain_probe(cur, table, expression, values, indexes=False)
+            conn.rollback()
+        results.append((domain, table, expression, indexes, index_ms, seq_ms))
+    return results
+
+def verify_main(args):
+    """Index verification mode: EXPLAIN the pushed-down join predicates"""
+    print_header("🔍 DataMeesh - Index Verification (EXPLAIN ANALYZE)")
+
+    if psycopg2 is None:
+        print("❌ psycopg2 is required for --verify-indexes: pip install psycopg2-binary")
+        return 1
+    dsns = {domain: getattr(args, f"{domain}_dsn") for domain in DOMAINS}
+    try:
+        results = verify_indexes(dsns)
+    except (psycopg2.Error, RuntimeError, OSError) as e:
+        print(f"❌ Index verification failed: {e}")
+        return 1
+
+    missing = 0
+    for domain, table, expression, indexes, index_ms, seq_ms in results:
+        where = f"{DOMAINS[domain]['database']}.{table} WHERE {expression} IN (...)"
+        if indexes:
+            print(f"   ✅ {where}: {', '.join(sorted(indexes)[:2])}{', ...' if len(indexes) > 2 else ''} "
+                  f"{index_ms:.2f} ms (sequential scan: {seq_ms:.2f} ms)")
+        else:
+            missing += 1
+            print(f"   ❌ {where}: sequential scan, {index_ms:.2f} ms (load the schema to create its index)")
+    return 1 if missing else 0
+
+def views_main(args):
+    """View refresh mode: refresh the materialized views of both databases"""
+    print_header("📈 DataMeesh - Materialized View Refresh")
+
+    if psycopg2 is None:
+        print("❌ psycopg2 is required for --refresh-views: pip install psycopg2-binary")
+        return 1
+    try:
+        for domain in DOMAINS:
+            print_refreshes(domain, refresh_views(domain, getattr(args, f"{domain}_dsn")))
+    except (psycopg2.Error, RuntimeError, OSError) as e:
+        print(f"❌ Materialized view refresh failed: {e}")
+        return 1
+    return 0
+
+def parse_month(value):
+    """YYYY-MM argument as the first day of the month"""
+    try:
+        return datetime.strptime(value, '%Y-%m').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}")
+
+def parse_args():
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Load sample data into the Sales and Marketing databases")
+    parser.add_argument('--bulk', action='store_true',
+                        help="Stream large generated (or --csv) datasets with COPY FROM STDIN")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Merge only the rows past each table's watermark into "
+                             f"{', '.join(INCREMENTAL_TABLES)}")
+    parser.add_argument('--days', type=int, default=1,
+                        help="Days of new rows generated after the watermark by --incremental (default: 1)")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Bulk row count multiplier (1 = 100k orders, 250k order items, 50k leads)")
+    parser.add_argument('--server-side', action='store_true',
+                        help="Generate bulk rows inside PostgreSQL with generate_series instead of streaming them")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed of the generated data (default: 42)")
+    parser.add_argument('--chunk-size', type=int, default=100_000,
+                        help="Rows generated per COPY chunk (default: 100000)")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="Tables loaded concurrently across both databases (default: 4)")
+    parser.add_argument('--maintenance-work-mem', default='512MB',
+                        help="maintenance_work_mem of the index and constraint builds (default: 512MB)")
+    parser.add_argument('--csv', action='append', default=[], metavar='TABLE=PATH',
+                        help="Load TABLE from a CSV file with a header row instead of generating it (repeatable)")
+    parser.add_argument('--partitioned', action='store_true',
+                        help="Create orders, campaign_metrics and website_traffic range-partitioned by month")
+    parser.add_argument('--future-months', type=int, default=3,
+                        help="Months of partitions created ahead of the current one (default: 3)")
+    parser.add_argument('--maintain-partitions', action='store_true',
+                        help="Create the upcoming partitions of the partitioned tables (schedule it monthly)")
+    parser.add_argument('--detach-before', type=parse_month, metavar='YYYY-MM',
+                        help="With --maintain-partitions, detach the partitions of the months before this one")
+    parser.add_argument('--verify-indexes', action='store_true',
+                        help="EXPLAIN ANALYZE the join predicates pushed down by Trino and check they use an index")
+    parser.add_argument('--refresh-views', action='store_true',
+                        help="Refresh the materialized rollups of both databases (run it on a schedule)")
+    parser.add_argument('--sales-dsn',
+                        help="libpq DSN of sales_db (default: kubectl port-forward to sales-postgres)")
+    parser.add_argument('--marketing-dsn',
+                        help="libpq DSN of marketing_db (default: kubectl port-forward to marketing-postgres)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    if args.bulk:
+        return bulk_main(args)
+    if args.incremental:
+        return incremental_main(args)
+    if args.maintain_partitions:
+        return partitions_main(args)
+    if args.verify_indexes:
+        return verify_main(args)
+    if args.refresh_views:
+        return views_main(args)
+    
     print_header("📦 DataMeesh - Sample Data Loader")
     
     # 1. Check prerequisites
@@ -92,59 +831,13 @@ def main():
     # 2. Create Sales tables
     print_header("Step 2/4: Creating Sales Domain Tables")
     
-    sales_create_sql = """
--- Sales Domain Table Creation
-
--- Customers table
-CREATE TABLE IF NOT EXISTS customers (
-    customer_id SERIAL PRIMARY KEY,
-    customer_name VARCHAR(255) NOT NULL,
-    email VARCHAR(255) UNIQUE NOT NULL,
-    phone VARCHAR(50),
-    country VARCHAR(100),
-    industry VARCHAR(100),
-    company_size VARCHAR(50),
-    created_at TIMESTAMP DEFAULT NOW(),
-    updated_at TIMESTAMP DEFAULT NOW()
-);
-
--- Products table
-CREATE TABLE IF NOT EXISTS products (
-    product_id SERIAL PRIMARY KEY,
-    product_name VARCHAR(255) UNIQUE NOT NULL,
-    category VARCHAR(100),
-    price NUMERIC(10,2),
-    stock_quantity INTEGER,
-    description TEXT,
-    created_at TIMESTAMP DEFAULT NOW()
-);
-
--- Orders table
-CREATE TABLE IF NOT EXISTS orders (
-    order_id SERIAL PRIMARY KEY,
-    customer_id INTEGER REFERENCES customers(customer_id),
-    order_date TIMESTAMP,
-    order_status VARCHAR(50),
-    total_amount NUMERIC(10,2),
-    payment_method VARCHAR(50),
-    sales_rep VARCHAR(100),
-    region VARCHAR(100),
-    created_at TIMESTAMP DEFAULT NOW()
-);
-
--- Order Items table
-CREATE TABLE IF NOT EXISTS order_items (
-    order_item_id SERIAL PRIMARY KEY,
-    order_id INTEGER REFERENCES orders(order_id),
-    product_id INTEGER REFERENCES products(product_id),
-    quantity INTEGER,
-    unit_price NUMERIC(10,2),
-    discount NUMERIC(5,2),
-    created_at TIMESTAMP DEFAULT NOW()
-);
-"""
+    sales_create_sql = ("-- Sales Domain Table Creation\n\n"
+                        + create_tables_sql(DOMAINS['sales']['tables'], partitioned=args.partitioned) + "\n"
+                        + create_indexes_sql(DOMAINS['sales']['tables']) + "\n"
+                        + "\n".join(partition_statements(DOMAINS['sales']['tables'], args.partitioned,
+                                                         args.future_months)) + "\n")
     
-    if not execute_sql("sales-domain", sales_pod, "sales_db", "sales_user", sales_create_sql):
+    if not execute_sql("sales", sales_pod, sales_create_sql):
         print("❌ Failed to create Sales tables")
         return 1
     
@@ -227,74 +920,24 @@ CROSS JOIN LATERAL (
 ON CONFLICT DO NOTHING;
 """
     
-    if not execute_sql("sales-domain", sales_pod, "sales_db", "sales_user", sales_sql):
+    if not execute_sql("sales", sales_pod, sales_sql):
         print("❌ Failed to load Sales data")
         return 1
     
+    if not execute_sql("sales", sales_pod, create_views_sql(DOMAINS['sales']['tables'])):
+        print("❌ Failed to build Sales materialized views")
+        return 1
+    
     # 4. Create Marketing tables
     print_header("Step 4/5: Creating Marketing Domain Tables")
     
-    marketing_create_sql = """
--- Marketing Domain Table Creation
-
--- Campaigns table
-CREATE TABLE IF NOT EXISTS campaigns (
-    campaign_id SERIAL PRIMARY KEY,
-    campaign_name VARCHAR(255) NOT NULL,
-    campaign_type VARCHAR(100),
-    start_date DATE,
-    end_date DATE,
-    budget NUMERIC(12,2),
-    status VARCHAR(50),
-    channel VARCHAR(100),
-    target_audience VARCHAR(255),
-    created_at TIMESTAMP DEFAULT NOW(),
-    updated_at TIMESTAMP DEFAULT NOW()
-);
-
--- Leads table
-CREATE TABLE IF NOT EXISTS leads (
-    lead_id SERIAL PRIMARY KEY,
-    first_name VARCHAR(255),
-    last_name VARCHAR(255),
-    email VARCHAR(255),
-    phone VARCHAR(50),
-    company VARCHAR(255),
-    job_title VARCHAR(100),
-    lead_source VARCHAR(100),
-    lead_stage VARCHAR(50),
-    campaign_id INTEGER REFERENCES campaigns(campaign_id),
-    created_at TIMESTAMP DEFAULT NOW()
-);
-
--- Campaign Metrics table
-CREATE TABLE IF NOT EXISTS campaign_metrics (
-    metric_id SERIAL PRIMARY KEY,
-    campaign_id INTEGER REFERENCES campaigns(campaign_id),
-    metric_date DATE,
-    impressions INTEGER,
-    clicks INTEGER,
-    conversions INTEGER,
-    cost NUMERIC(10,2),
-    revenue NUMERIC(10,2),
-    created_at TIMESTAMP DEFAULT NOW()
-);
-
--- Website Traffic table
-CREATE TABLE IF NOT EXISTS website_traffic (
-    traffic_id SERIAL PRIMARY KEY,
-    traffic_date DATE,
-    page_url VARCHAR(500),
-    page_views INTEGER,
-    unique_visitors INTEGER,
-    bounce_rate NUMERIC(5,2),
-    avg_time_on_page INTEGER,
-    referral_source VARCHAR(100),
-    created_at TIMESTAMP DEFAULT NOW()
-);
-"""
+    marketing_create_sql = ("-- Marketing Domain Table Creation\n\n"
+                            + create_tables_sql(DOMAINS['marketing']['tables'], partitioned=args.partitioned) + "\n"
+                            + create_indexes_sql(DOMAINS['marketing']['tables']) + "\n"
+                            + "\n".join(partition_statements(DOMAINS['marketing']['tables'], args.partitioned,
+                                                             args.future_months)) + "\n")
     
-    if not execute_sql("marketing-domain", marketing_pod, "marketing_db", "marketing_user", marketing_create_sql):
+    if not execute_sql("marketing", marketing_pod, marketing_create_sql):
         print("❌ Failed to create Marketing tables")
         return 1
     
@@ -384,10 +1027,14 @@ FROM generate_series(1, 50) gs
 ON CONFLICT DO NOTHING;
 """
     
-    if not execute_sql("marketing-domain", marketing_pod, "marketing_db", "marketing_user", marketing_sql):
+    if not execute_sql("marketing", marketing_pod, marketing_sql):
         print("❌ Failed to load Marketing data")
         return 1
     
+    if not execute_sql("marketing", marketing_pod, create_views_sql(DOMAINS['marketing']['tables'])):
+        print("❌ Failed to build Marketing materialized views")
+        return 1
+    
     # Summary
     print_header("✅ Sample Data Loading Complete")
     
@@ -398,6 +1045,7 @@ ON CONFLICT DO NOTHING;
     print("    • 10 Products")
     print("    • 20 Orders")
     print("    • 40+ Order Items")
+    print("    📈 Views: mv_customer_lifetime_value, mv_country_revenue")
     print()
     print("  Marketing Domain:")
     print("    ✅ Tables created: campaigns, leads, campaign_metrics, website_traffic")
@@ -405,6 +1053,7 @@ ON CONFLICT DO NOTHING;
     print("    • 15 Leads")
     print("    • 8 Campaign Metrics")
     print("    • 50 Website Traffic Records")
+    print("    📈 Views: mv_campaign_performance")
     print()
     
     print("📖 Next Steps:")
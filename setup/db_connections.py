@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+DataMeesh - Shared Database Connections
+Pooled PostgreSQL and Trino sessions for the setup and example scripts
+
+Inside the cluster, the domain databases are reached by their service DNS
+names. From a workstation, one kubectl port-forward per PostgreSQL service
+is opened on first use and shared by every connection of the process and
+of its worker processes. Trino is reached over HTTP: its service inside
+the cluster, its NodePort outside. Sessions stay open and are reused from
+one statement to the next instead of paying a kubectl exec, a CLI start
+and a new session per statement.
+"""
+
+import atexit
+import os
+import socket
+import subprocess
+import time
+from contextlib import contextmanager
+
+try:
+    import psycopg2
+    from psycopg2 import pool as pg_pool
+except ImportError:
+    psycopg2 = None
+
+try:
+    from trino import dbapi as trino_dbapi
+except ImportError:
+    trino_dbapi = None
+
+DB_PASSWORD = os.environ.get('DATAMESH_DB_PASSWORD', 'SuperSecurePass123!')
+IN_CLUSTER = 'KUBERNETES_SERVICE_HOST' in os.environ
+
+# Domain databases and the local port of their port-forward
+DATABASES = {
+    'sales': {
+        'namespace': 'sales-domain',
+        'service': 'sales-postgres',
+        'database': 'sales_db',
+        'user': 'sales_user',
+        'local_port': 15432,
+    },
+    'marketing': {
+        'namespace': 'marketing-domain',
+        'service': 'marketing-postgres',
+        'database': 'marketing_db',
+        'user': 'marketing_user',
+        'local_port': 15433,
+    },
+}
+
+TRINO_HOST = os.environ.get('TRINO_HOST',
+                            'trino-coordinator.data-platform.svc.cluster.local' if IN_CLUSTER else 'localhost')
+TRINO_PORT = int(os.environ.get('TRINO_PORT', '8080' if IN_CLUSTER else '30808'))
+TRINO_USER = os.environ.get('TRINO_USER', 'admin')
+
+_forwards = []
+_pools = {}
+_trino = {}
+
+
+def port_open(port):
+    """True if something accepts connections on localhost:port"""
+    try:
+        socket.create_connection(("localhost", port), timeout=1).close()
+        return True
+    except OSError:
+        return False
+
+
+def port_forward(namespace, service, local_port, remote_port=5432, timeout=30):
+    """Forward local_port to a Kubernetes service until the process exits.
+
+    Does nothing if the port already answers, e.g. when a parent process
+    opened the forward.
+    """
+    if port_open(local_port):
+        return
+    proc = subprocess.Popen(
+        ["kubectl", "port-forward", "-n", namespace, f"svc/{service}", f"{local_port}:{remote_port}"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    _forwards.append((os.getpid(), proc))
+    deadline = time.time() + timeout
+    while not port_open(local_port):
+        if proc.poll() is not None:
+            raise RuntimeError(f"port-forward to {namespace}/{service} failed: "
+                               f"{proc.stderr.read().decode().strip()}")
+        if time.time() > deadline:
+            raise RuntimeError(f"port-forward to {namespace}/{service} timed out")
+        time.sleep(0.2)
+
+
+def connection_params(domain, dsn=None):
+    """psycopg2.connect() arguments of a domain database"""
+    if dsn:
+        return {'dsn': dsn}
+    spec = DATABASES[domain]
+    if IN_CLUSTER:
+        host, port = f"{spec['service']}.{spec['namespace']}.svc.cluster.local", 5432
+    else:
+        port_forward(spec['namespace'], spec['service'], spec['local_port'])
+        host, port = "localhost", spec['local_port']
+    return {'host': host, 'port': port, 'dbname': spec['database'], 'user': spec['user'],
+            'password': DB_PASSWORD}
+
+
+def pg_pool_for(domain, dsn=None, maxconn=32):
+    """Connection pool of a domain database, one per process"""
+    key = (domain, dsn)
+    pid, pool = _pools.get(key, (None, None))
+    # A forked worker must not share its parent's sockets
+    if pid != os.getpid():
+        pool = pg_pool.ThreadedConnectionPool(1, maxconn, **connection_params(domain, dsn))
+        _pools[key] = (os.getpid(), pool)
+    return pool
+
+
+@contextmanager
+def pg_connection(domain, dsn=None, autocommit=False):
+    """Borrow a pooled session; commits on success, rolls back on error"""
+    pool = pg_pool_for(domain, dsn)
+    conn = pool.getconn()
+    try:
+        conn.autocommit = autocommit
+        yield conn
+        if not autocommit:
+            conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
+
+
+def split_sql(script):
+    """Statements of a SQL script, split on semicolons ending a line"""
+    statements = []
+    for chunk in script.replace('\r\n', '\n').split(';\n'):
+        lines = [line for line in chunk.strip().rstrip(';').splitlines() if not line.strip().startswith('--')]
+        if ''.join(lines).strip():
+            statements.append('\n'.join(lines))
+    return statements
+
+
+def pg_execute(domain, script, dsn=None):
+    """Run a SQL script statement by statement on one pooled session.
+
+    Like psql -f, a failing statement is reported and the script goes on.
+    Returns [(statement, error message)].
+    """
+    errors = []
+    with pg_connection(domain, dsn, autocommit=True) as conn:
+        with conn.cursor() as cur:
+            for statement in split_sql(script):
+                try:
+                    cur.execute(statement)
+                except psycopg2.Error as e:
+                    errors.append((statement, str(e).strip()))
+    return errors
+
+
+def trino_connection():
+    """Shared Trino session of this process"""
+    conn = _trino.get(os.getpid())
+    if conn is None:
+        conn = _trino[os.getpid()] = trino_dbapi.connect(host=TRINO_HOST, port=TRINO_PORT, user=TRINO_USER)
+    return conn
+
+
+def trino_query(sql):
+    """Run one statement on the shared Trino session; returns (column names, rows)"""
+    cur = trino_connection().cursor()
+    try:
+        cur.execute(sql)
+        rows = cur.fetchall()
+        return [column[0] for column in cur.description or []], rows
+    finally:
+        cur.close()
+
+
+def close_all():
+    """Close the pools and sessions of this process and stop its port-forwards"""
+    for key, (pid, pool) in list(_pools.items()):
+        if pid == os.getpid():
+            pool.closeall()
+            del _pools[key]
+    conn = _trino.pop(os.getpid(), None)
+    if conn is not None:
+        conn.close()
+    for pid, proc in list(_forwards):
+        if pid == os.getpid():
+            proc.terminate()
+            proc.wait()
+            _forwards.remove((pid, proc))
+
+
+atexit.register(close_all)
@@ -0,0 +1,65 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='append',
+        on_schema_change='fail',
+        properties={'format': "'PARQUET'"},
+        tags=['cross_domain', 'marts', 'identity']
+    )
+}}
+
+-- ============================================================================
+-- Cross-Domain Mart: Identity Emails
+-- One row per customer and per lead with the hash of its normalized email
+-- ============================================================================
+
+-- Each run only reads the records past the highest ID already hashed: the
+-- literal ID bound is pushed down to PostgreSQL and served by the primary key.
+-- Email changes of existing records need a --full-refresh.
+{%- set last_ids = {'sales': 0, 'marketing': 0} %}
+{%- if is_incremental() and execute %}
+    {%- for row in run_query('select domain, max(record_id) from ' ~ this ~ ' group by domain') %}
+        {%- do last_ids.update({row[0]: row[1]}) %}
+    {%- endfor %}
+{%- endif %}
+
+with sales_customers as (
+    select
+        cast('sales' as varchar) as domain,
+        customer_id as record_id,
+        lower(trim(email)) as email,
+        cast(created_at as timestamp(3)) as created_at
+    from {{ source('sales', 'customers') }}
+    where customer_id > {{ last_ids['sales'] }}
+),
+
+marketing_leads as (
+    select
+        cast('marketing' as varchar) as domain,
+        lead_id as record_id,
+        lower(trim(email)) as email,
+        cast(created_at as timestamp(3)) as created_at
+    from {{ source('marketing', 'leads') }}
+    where lead_id > {{ last_ids['marketing'] }}
+),
+
+hashed as (
+    select
+        domain,
+        record_id,
+        -- 64-bit hash: integer join key, and no email kept in the analytics layer
+        from_big_endian_64(xxhash64(to_utf8(email))) as email_hash,
+        created_at,
+        
+        -- Metadata (Hive tables store timestamps without time zone)
+        cast(current_timestamp as timestamp(3)) as _dbt_loaded_at
+        
+    from (
+        select * from sales_customers
+        union all
+        select * from marketing_leads
+    )
+    where email is not null and email <> ''
+)
+
+select * from hashed
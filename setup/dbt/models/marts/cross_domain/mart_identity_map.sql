@@ -0,0 +1,59 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='append',
+        on_schema_change='fail',
+        properties={'format': "'PARQUET'"},
+        tags=['cross_domain', 'marts', 'identity']
+    )
+}}
+
+-- ============================================================================
+-- Cross-Domain Mart: Identity Map
+-- Lead to customer matches on the normalized email, as integer keys
+-- ============================================================================
+
+-- Attribution queries join leads -> lead_id -> customer_id -> orders on integer
+-- keys instead of LOWER(TRIM(email)) across two catalogs. Each run only adds the
+-- matches where the lead or the customer was hashed after the latest hashing
+-- batch already mapped (_source_loaded_at), so a skipped or failed map run
+-- leaves no batch behind.
+
+with identity_emails as (
+    select * from {{ ref('mart_identity_emails') }}
+),
+
+customers as (
+    select email_hash, record_id as customer_id, created_at, _dbt_loaded_at
+    from identity_emails
+    where domain = 'sales'
+),
+
+leads as (
+    select email_hash, record_id as lead_id, created_at, _dbt_loaded_at
+    from identity_emails
+    where domain = 'marketing'
+),
+
+matches as (
+    select
+        l.email_hash,
+        c.customer_id,
+        l.lead_id,
+        l.created_at as lead_created_at,
+        c.created_at as customer_created_at,
+        
+        -- Metadata
+        greatest(l._dbt_loaded_at, c._dbt_loaded_at) as _source_loaded_at,
+        cast(current_timestamp as timestamp(3)) as _dbt_loaded_at
+        
+    from leads l
+    join customers c on l.email_hash = c.email_hash
+    
+    {% if is_incremental() %}
+        where greatest(l._dbt_loaded_at, c._dbt_loaded_at) >
+              (select coalesce(max(_source_loaded_at), timestamp '1970-01-01 00:00:00') from {{ this }})
+    {% endif %}
+)
+
+select * from matches
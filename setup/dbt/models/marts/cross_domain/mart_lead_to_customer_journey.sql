@@ -32,7 +32,11 @@ sales_orders as (
     select * from {{ ref('stg_sales__orders') }}
 ),
 
--- Match leads to customers by email
+identity_map as (
+    select lead_id, customer_id from {{ ref('mart_identity_map') }}
+),
+
+-- Match leads to customers through the identity map (normalized email)
 lead_customer_match as (
     select
         l.lead_id,
@@ -66,7 +70,8 @@ lead_customer_match as (
         current_timestamp as _dbt_loaded_at
         
     from marketing_leads l
-    left join sales_customers c on l.email = c.email
+    left join identity_map m on l.lead_id = m.lead_id
+    left join sales_customers c on m.customer_id = c.customer_id
 ),
 
 -- Add order data for converted customers